@@ -1,20 +1,357 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, has_request_context, g, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import bisect
+import click
 import pandas as pd
+import numpy as np
+import datetime
+import decimal
+import gzip
+import hashlib
+import json
+import math
 import os
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple, Optional
 from dotenv import load_dotenv
 load_dotenv()
 from supabase import create_client, Client
 from sqlalchemy import create_engine
 
+try:
+    import orjson  # Optional fast path for JSON responses
+except ImportError:
+    orjson = None
+
+try:
+    import brotli  # Optional, preferred over gzip when the client accepts it
+except ImportError:
+    brotli = None
+
 app = Flask(__name__, static_folder="static")
 
+
+# ─── JSON SERIALIZATION ─────────────────────────────────────────────────────
+# Stat values are rounded where they are produced (rates to 3 places, ERA/WHIP
+# to 2, per-game, innings and WAR to 1, counts as ints), so the serializer only
+# has to encode. orjson is used when installed, otherwise a compact stdlib dump.
+
+RATE_DECIMALS = 3
+ERA_DECIMALS = 2
+PER_GAME_DECIMALS = 1
+
+
+def _json_default(value):
+    """Encode NumPy, Decimal and date values the JSON encoders don't know about"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class StatsJSONProvider(DefaultJSONProvider):
+    """JSON provider that prefers orjson and natively handles NumPy values"""
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(
+                obj, default=_json_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            ).decode()
+
+        kwargs.setdefault("default", _json_default)
+        kwargs.setdefault("separators", (",", ":"))
+        kwargs.setdefault("ensure_ascii", False)
+        return json.dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None or self._app.debug or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        data = orjson.dumps(
+            obj, default=_json_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE,
+        )
+        return self._app.response_class(data, mimetype=self.mimetype)
+
+
+app.json = StatsJSONProvider(app)
+
+
+# Responses smaller than this aren't worth compressing
+COMPRESS_MIN_BYTES = 1024
+
+
+@app.after_request
+def compress_response(response):
+    """Negotiate brotli/gzip compression for larger JSON responses"""
+    if (
+        response.direct_passthrough
+        or response.status_code < 200
+        or response.status_code >= 300
+        or response.mimetype != "application/json"
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        response.set_data(brotli.compress(data, quality=5))
+        response.headers["Content-Encoding"] = "br"
+    elif accepted["gzip"]:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        return response
+
+    # Strong ETags are per representation, so tag the encoded variant
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{response.headers['Content-Encoding']}", weak)
+
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def to_columnar(records):
+    """Convert a list of same-shaped dicts to a column header plus parallel arrays"""
+    if not records:
+        return {"columns": [], "data": []}
+
+    columns = list(records[0])
+    return {
+        "columns": columns,
+        "data": [[record.get(col) for record in records] for col in columns],
+    }
+
+
+def format_stat_table(records):
+    """Season tables as row dicts, or columnar when the request asks for format=columnar"""
+    if has_request_context() and request.args.get("format", "").lower() == "columnar":
+        return to_columnar(records)
+    return records
+
+
+# ─── HTTP CACHING ───────────────────────────────────────────────────────────
+# Lahman data changes once a year, so responses are keyed on a fingerprint of
+# the loaded dataset. ETags look like "<digest>" or "<digest>.h" (historical),
+# plus "-gzip"/"-br" once compressed; the digest alone decides a 304, which is
+# answered before any handler (and so any DB work) runs. Only a response for
+# an explicitly requested, closed season is historical; everything else (a
+# career line, all-time splits, a matchup) can grow with the next data load,
+# so it is cached briefly and revalidated against its ETag.
+
+CACHEABLE_ENDPOINTS = {
+    "get_player",
+    "get_player_with_two_way",
+    "get_player_with_disambiguation",
+    "get_team_stats",
+    "get_team_roster",
+    "get_team_splits",
+    "get_team_streaks",
+    "get_standings",
+    "get_team_analytics_table",
+    "get_award_leaders",
+    "get_award_winners",
+    "versus",
+    "team_h2h",
+    "search_players_enhanced",
+}
+
+HISTORICAL_CACHE_CONTROL = "public, max-age=31536000"  # a year; the ETag changes with the data
+CURRENT_CACHE_CONTROL = "public, max-age=300"  # short; a 304 against the ETag is cheap
+LIVE_CACHE_CONTROL = "public, max-age=60"  # live/combined lines move with every ingest pass
+
+# Tables the app serves and the column that tracks how far each one reaches
+DATASET_TABLES = [
+    ("lahman_people", None),
+    ("lahman_batting", "yearid"),
+    ("lahman_pitching", "yearid"),
+    ("lahman_fielding", "yearid"),
+    ("lahman_teams", "yearid"),
+    ("lahman_seriespost", "yearid"),
+    ("lahman_awardsplayers", "yearid"),
+    ("lahman_allstarfull", "yearid"),
+    ("jeffbagwell_war", "year_ID"),
+    ("retrosheet_teamstats", "date"),
+    ("retrosheet_matchups", "yearid"),
+]
+
+_dataset_version = None
+
+
+def get_dataset_version():
+    """Fingerprint of the loaded data from row counts and max years (computed once)"""
+    global _dataset_version
+    from sqlalchemy import text
+
+    if _dataset_version is not None:
+        return _dataset_version or None
+
+    # Explicit override, e.g. when the data is versioned by the import job
+    version = os.environ.get("DATASET_VERSION")
+
+    if not version:
+        parts = []
+        try:
+            with db_engine.connect() as conn:
+                for table, max_col in DATASET_TABLES:
+                    max_expr = f"MAX({max_col})" if max_col else "NULL"
+                    try:
+                        count, max_value = conn.execute(
+                            text(f"SELECT COUNT(*), {max_expr} FROM {table}")
+                        ).fetchone()
+                        parts.append(f"{table}:{count}:{max_value}")
+                    except Exception:
+                        conn.rollback()
+                        parts.append(f"{table}:missing")
+        except Exception as e:
+            print(f"get_dataset_version error: {e}")
+            _dataset_version = ""  # Don't retry every request; caching stays off
+            return None
+
+        # Deploys can change response shapes, so the code version is part of the key
+        parts.append(os.environ.get("RENDER_GIT_COMMIT", ""))
+        version = hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+
+    _dataset_version = version
+    return version
+
+
+def current_season():
+    """The season still in progress (its results can change)"""
+    return datetime.date.today().year
+
+
+def note_requested_season(year):
+    """Record the last season a request explicitly asked for, for its Cache-Control lifetime"""
+    if has_request_context() and year is not None:
+        g.requested_season = max(int(year), g.get("requested_season", int(year)))
+
+
+def _request_digest():
+    """Digest of the dataset version plus the request path and query"""
+    version = get_dataset_version()
+    if version is None:
+        return None
+
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.args.items(multi=True)))
+    key = f"{version}|{request.path}|{query}"
+    if request.args.get("mode", "").lower() in LIVE_MODES:
+        key += f"|live{_live_version}"  # live lines change between dataset versions
+    return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+
+@app.before_request
+def answer_not_modified():
+    """Return 304 for a matching If-None-Match before the handler does any DB work"""
+    if request.method != "GET" or request.endpoint not in CACHEABLE_ENDPOINTS:
+        return None
+
+    digest = _request_digest()
+    if digest is None:
+        return None
+    g.etag_digest = digest
+
+    for tag in request.if_none_match.as_set():
+        if tag.split("-", 1)[0].split(".", 1)[0] == digest:
+            response = app.response_class(status=304)
+            response.set_etag(tag)
+            response.headers["Cache-Control"] = (
+                HISTORICAL_CACHE_CONTROL if tag.split("-", 1)[0].endswith(".h")
+                else LIVE_CACHE_CONTROL if request.args.get("mode", "").lower() in LIVE_MODES
+                else CURRENT_CACHE_CONTROL
+            )
+            return response
+
+    return None
+
+
+@app.after_request
+def add_cache_headers(response):
+    """Attach the ETag and a Cache-Control lifetime to successful cacheable responses"""
+    digest = g.get("etag_digest")
+    if digest is None or response.status_code != 200:
+        return response
+
+    requested = g.get("requested_season")
+    historical = requested is not None and requested < current_season()
+
+    response.set_etag(f"{digest}.h" if historical else digest)
+    if request.args.get("mode", "").lower() in LIVE_MODES:
+        response.headers["Cache-Control"] = LIVE_CACHE_CONTROL
+    else:
+        response.headers["Cache-Control"] = HISTORICAL_CACHE_CONTROL if historical else CURRENT_CACHE_CONTROL
+    return response
+
+
+# ─── BACKGROUND TASKS ───────────────────────────────────────────────────────
+# Startup work (plan checks, warm-ups, pollers) runs in daemon threads started
+# with the server: on the first request a worker handles, or by `python app.py`.
+# Importing the module, as every `flask --app app <command>` does, starts
+# nothing, so CLI commands don't open connections they don't need.
+
+_background_tasks = []
+_background_started = False
+_background_lock = threading.Lock()
+
+
+def background_task(enabled):
+    """Register a function to run in a daemon thread once the server starts (when enabled)"""
+    def register(target):
+        if enabled:
+            _background_tasks.append(target)
+        return target
+    return register
+
+
+def start_background_tasks():
+    """Start the registered background threads (once per process)"""
+    global _background_started
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+    for target in _background_tasks:
+        threading.Thread(target=target, daemon=True).start()
+
+
+@app.before_request
+def start_background_tasks_with_server():
+    if not _background_started:
+        start_background_tasks()
+
+
 SUPABASE_URL = os.environ.get('SUPABASE_URL')
 SUPABASE_KEY = os.environ.get('SUPABASE_KEY')
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Not needed when running from the embedded local database
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
 
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
+# "postgres" (DATABASE_URL) or an embedded read-only file: "sqlite" / "duckdb"
+DATA_BACKEND = os.environ.get('DATA_BACKEND', 'postgres').lower()
+LOCAL_DB_PATH = os.environ.get('LOCAL_DB_PATH', 'data/lahman.sqlite')
+
 CORS(app, resources={
     r"/*": {
         "origins": [ "https://schipperstatlines.onrender.com", "https://website-a7a.pages.dev", "http://127.0.0.1:5501", "http://localhost:5501", "http://127.0.0.1:5500", "http://localhost:5500", "https://noahschipper.net"],
@@ -23,6 +360,20 @@ CORS(app, resources={
 
 def get_db_engine():
     """Create SQLAlchemy engine for database connections"""
+    if DATA_BACKEND == 'sqlite':
+        # Bundled file, opened read-only; every query runs in-process
+        return create_engine(
+            f"sqlite:///file:{os.path.abspath(LOCAL_DB_PATH)}?mode=ro&uri=true",
+            connect_args={"check_same_thread": False},
+        )
+
+    if DATA_BACKEND == 'duckdb':
+        # Needs the duckdb-engine dialect installed
+        return create_engine(
+            f"duckdb:///{os.path.abspath(LOCAL_DB_PATH)}",
+            connect_args={"read_only": True},
+        )
+
     database_url = os.getenv('DATABASE_URL')
     
     if not database_url:
@@ -31,9 +382,23 @@ def get_db_engine():
     if database_url.startswith('postgres://'):
         database_url = database_url.replace('postgres://', 'postgresql://', 1)
     
+    # Server-side prepared statements need psycopg 3 (psycopg2 always sends plain
+    # SQL). Transaction-mode poolers such as Supabase's on port 6543 can't keep
+    # them, so they stay off there unless PG_PREPARE_THRESHOLD is set explicitly.
+    connect_args = {}
+    prepare_threshold = os.getenv('PG_PREPARE_THRESHOLD', 'off' if ':6543/' in database_url else '1')
+    if database_url.startswith('postgresql://') and prepare_threshold.isdigit():
+        try:
+            import psycopg  # noqa: F401
+            database_url = database_url.replace('postgresql://', 'postgresql+psycopg://', 1)
+            connect_args["prepare_threshold"] = int(prepare_threshold)
+        except ImportError:
+            pass
+
     # Create engine with connection pooling
     engine = create_engine(
         database_url,
+        connect_args=connect_args,
         pool_pre_ping=True,   # Verify connections before use
         pool_recycle=300,      # Recycle connections every 5 minutes
         echo=False             # Set to True for SQL debugging
@@ -48,6 +413,364 @@ def get_supabase_client():
     return supabase
 
 
+# ─── QUERY REGISTRY ─────────────────────────────────────────────────────────
+# Every statement on the request path, compiled once per process. List
+# parameters are written as `col = ANY(:ids)` so each query has one shape (and
+# one cached plan) however many ids are passed; on Postgres the list binds as an
+# array, elsewhere it is rewritten to an expanding `IN` bind.
+
+QUERIES = {
+    # Players
+    "player_name": """
+        SELECT namefirst, namelast FROM lahman_people WHERE playerid = :playerid
+    """,
+    "people_names": """
+        SELECT playerid, namefirst, namelast, namegiven, debut, finalgame, birthyear
+        FROM lahman_people
+    """,
+    "search_players": """
+        SELECT DISTINCT 
+            p.namefirst,
+            p.namelast,
+            p.playerid,
+            p.debut,
+            p.finalgame,
+            p.birthyear,
+            CASE 
+                WHEN LOWER(p.namefirst || ' ' || p.namelast) LIKE :exact_match THEN 1
+                WHEN LOWER(p.namelast) LIKE :exact_match THEN 2
+                WHEN LOWER(p.namefirst) LIKE :exact_match THEN 3
+                ELSE 4
+            END as priority,
+            (SELECT pos FROM lahman_fielding f 
+             WHERE f.playerid = p.playerid
+             GROUP BY pos 
+             ORDER BY SUM(g) DESC 
+             LIMIT 1) as primary_pos
+        FROM lahman_people p
+        WHERE (
+            LOWER(p.namefirst || ' ' || p.namelast) LIKE :search_term
+            OR LOWER(p.namelast) LIKE :search_term
+            OR LOWER(p.namefirst) LIKE :search_term
+        )
+        AND p.birthyear IS NOT NULL
+        AND (
+            EXISTS (SELECT 1 FROM lahman_batting b WHERE b.playerid = p.playerid)
+            OR EXISTS (SELECT 1 FROM lahman_pitching pt WHERE pt.playerid = p.playerid)
+        )
+        ORDER BY priority, p.debut DESC NULLS LAST, p.namelast, p.namefirst
+        LIMIT 15
+    """,
+    "people_many": """
+        SELECT playerid, namefirst, namelast FROM lahman_people WHERE playerid = ANY(:playerids)
+    """,
+    "all_playerids": """
+        SELECT playerid FROM lahman_people ORDER BY playerid
+    """,
+    "pitching_summary": """
+        SELECT COUNT(*) as pitch_seasons, SUM(g) as total_games_pitched, SUM(gs) as total_starts
+        FROM lahman_pitching WHERE playerid = :playerid
+    """,
+    "batting_summary": """
+        SELECT COUNT(*) as bat_seasons, SUM(g) as total_games_batted, SUM(ab) as total_at_bats
+        FROM lahman_batting WHERE playerid = :playerid
+    """,
+    "pitcher_stats": """
+        SELECT yearid, teamid, w, l, g, gs, cg, sho, sv, ipouts, h, er, hr, bb, so, era
+        FROM lahman_pitching WHERE playerid = :playerid
+        ORDER BY yearid DESC
+    """,
+    "hitter_stats": """
+        SELECT yearid, teamid, g, ab, h, hr, rbi, sb, bb, hbp, sf, sh, "2b", "3b"
+        FROM lahman_batting WHERE playerid = :playerid
+        ORDER BY yearid DESC
+    """,
+    "batting_seasons": """
+        SELECT yearid, ab, h, bb, hbp, sf, "2b", "3b", hr
+        FROM lahman_batting 
+        WHERE playerid = :playerid
+        ORDER BY yearid
+    """,
+    "pitcher_stats_many": """
+        SELECT playerid, yearid, teamid, w, l, g, gs, cg, sho, sv, ipouts, h, er, hr, bb, so, era
+        FROM lahman_pitching WHERE playerid = ANY(:playerids)
+        ORDER BY playerid, yearid DESC
+    """,
+    "hitter_stats_many": """
+        SELECT playerid, yearid, teamid, g, ab, h, hr, rbi, sb, bb, hbp, sf, sh, "2b", "3b"
+        FROM lahman_batting WHERE playerid = ANY(:playerids)
+        ORDER BY playerid, yearid DESC
+    """,
+    "career_war": """
+        SELECT SUM(WAR162) as career_war 
+        FROM jeffbagwell_war 
+        WHERE key_bbref = :playerid
+    """,
+    "season_war": """
+        SELECT year_ID AS yearid, WAR162 as war
+        FROM jeffbagwell_war 
+        WHERE key_bbref = :playerid
+        ORDER BY year_ID DESC
+    """,
+    "season_war_many": """
+        SELECT key_bbref AS playerid, year_ID AS yearid, WAR162 AS war
+        FROM jeffbagwell_war WHERE key_bbref = ANY(:playerids)
+        ORDER BY year_ID DESC
+    """,
+    "league_average": """
+        SELECT 
+            SUM(h + bb + hbp) * 1.0 / NULLIF(SUM(ab + bb + hbp + sf), 0) as lg_obp,
+            (SUM(h - "2b" - "3b" - hr) + 2 * SUM("2b") + 3 * SUM("3b") + 4 * SUM(hr)) * 1.0 / NULLIF(SUM(ab), 0) as lg_slg
+        FROM lahman_batting
+        WHERE yearid = :year
+    """,
+    "league_averages": """
+        SELECT yearid,
+            SUM(h + bb + hbp) * 1.0 / NULLIF(SUM(ab + bb + hbp + sf), 0) as lg_obp,
+            (SUM(h - "2b" - "3b" - hr) + 2 * SUM("2b") + 3 * SUM("3b") + 4 * SUM(hr)) * 1.0 / NULLIF(SUM(ab), 0) as lg_slg
+        FROM lahman_batting
+        WHERE yearid = ANY(:years)
+        GROUP BY yearid
+    """,
+
+    # Awards
+    "all_player_awards": """
+        SELECT playerid, yearid, awardid, lgid, tie, notes
+        FROM lahman_awardsplayers
+        ORDER BY yearid DESC, awardid, playerid
+    """,
+    "all_allstar_games": """
+        SELECT playerid, yearid FROM lahman_allstarfull ORDER BY yearid DESC, playerid
+    """,
+    "all_ws_championships": """
+        SELECT b.playerid, b.yearid, b.teamid, s.name as team_name
+        FROM lahman_batting b
+        JOIN lahman_seriespost sp ON b.yearid = sp.yearid AND b.teamid = sp.teamidwinner
+        LEFT JOIN lahman_teams s ON b.teamid = s.teamid AND b.yearid = s.yearid
+        WHERE sp.round = 'WS'
+
+        UNION
+
+        SELECT p.playerid, p.yearid, p.teamid, s.name as team_name
+        FROM lahman_pitching p
+        JOIN lahman_seriespost sp ON p.yearid = sp.yearid AND p.teamid = sp.teamidwinner
+        LEFT JOIN lahman_teams s ON p.teamid = s.teamid AND p.yearid = s.yearid
+        WHERE sp.round = 'WS'
+
+        ORDER BY 2 DESC, 1, 3
+    """,
+    "season_positions": """
+        SELECT playerid, yearid, pos, SUM(g) AS g
+        FROM lahman_fielding
+        GROUP BY playerid, yearid, pos
+        ORDER BY playerid, yearid, g DESC
+    """,
+
+    # Teams
+    "team_season": """
+        SELECT yearid, teamid, 
+               g, w, l, r, ra,
+               ab, h, "2b", "3b", hr, bb, so as so_batting, sb, hbp, sf,
+               ipouts, er, ha, hra, bba, soa as so_pitching, cg, sho, sv,
+               -- We'll calculate playoff stats separately
+               0 as playoff_apps, 0 as ws_apps, 0 as ws_championships
+        FROM lahman_teams 
+        WHERE teamid = :team_id AND yearid = :year
+    """,
+    "franchise_team_seasons": """
+        SELECT yearid, teamid,
+               g, w, l, r, ra,
+               ab, h, "2b", "3b", hr, bb, so as so_batting, sb, hbp, sf,
+               ipouts, er, ha, hra, bba, soa as so_pitching, cg, sho, sv
+        FROM lahman_teams
+        WHERE teamid = ANY(:team_ids)
+        ORDER BY yearid
+    """,
+    "franchise_seasons": """
+        SELECT DISTINCT yearid, teamid FROM lahman_teams WHERE teamid = ANY(:team_ids)
+    """,
+    # Stints with the same club in one season are summed into a single line
+    "roster_batting": """
+        SELECT b.playerid, p.namefirst, p.namelast, b.yearid,
+               SUM(b.g) as g, SUM(b.ab) as ab, SUM(b.h) as h, SUM(b.hr) as hr, SUM(b.rbi) as rbi,
+               SUM(b.sb) as sb, SUM(b.bb) as bb, SUM(b.hbp) as hbp, SUM(b.sf) as sf, SUM(b.sh) as sh,
+               SUM(b."2b") as "2b", SUM(b."3b") as "3b"
+        FROM lahman_batting b
+        JOIN lahman_people p ON p.playerid = b.playerid
+        WHERE b.teamid = ANY(:team_ids) AND b.yearid = :year
+        GROUP BY b.playerid, p.namefirst, p.namelast, b.yearid
+    """,
+    "roster_pitching": """
+        SELECT pt.playerid, p.namefirst, p.namelast, pt.yearid,
+               SUM(pt.w) as w, SUM(pt.l) as l, SUM(pt.g) as g, SUM(pt.gs) as gs, SUM(pt.cg) as cg,
+               SUM(pt.sho) as sho, SUM(pt.sv) as sv, SUM(pt.ipouts) as ipouts, SUM(pt.h) as h,
+               SUM(pt.er) as er, SUM(pt.hr) as hr, SUM(pt.bb) as bb, SUM(pt.so) as so
+        FROM lahman_pitching pt
+        JOIN lahman_people p ON p.playerid = pt.playerid
+        WHERE pt.teamid = ANY(:team_ids) AND pt.yearid = :year
+        GROUP BY pt.playerid, p.namefirst, p.namelast, pt.yearid
+    """,
+    "roster_war": """
+        SELECT key_bbref AS playerid, SUM(WAR162) AS war
+        FROM jeffbagwell_war
+        WHERE year_ID = :year AND (
+            team_ID = ANY(:team_ids)
+            -- WAR files use Baseball-Reference team codes (LAD, not LAN)
+            OR team_ID IN (SELECT teamidbr FROM lahman_teams WHERE teamid = ANY(:team_ids) AND yearid = :year)
+        )
+        GROUP BY key_bbref
+    """,
+
+    # Postseason
+    "season_playoff_series": """
+        SELECT COUNT(*) as series_count
+        FROM lahman_seriespost 
+        WHERE (teamidwinner = :team_id OR teamidloser = :team_id) 
+        AND yearid = :year
+    """,
+    "season_ws_series": """
+        SELECT COUNT(*) as ws_series
+        FROM lahman_seriespost 
+        WHERE (teamidwinner = :team_id OR teamidloser = :team_id) 
+        AND yearid = :year 
+        AND round = 'WS'
+    """,
+    "season_ws_wins": """
+        SELECT COUNT(*) as ws_wins
+        FROM lahman_seriespost 
+        WHERE teamidwinner = :team_id
+        AND yearid = :year 
+        AND round = 'WS'
+    """,
+    "playoff_years": """
+        SELECT COUNT(DISTINCT yearid) as playoff_years
+        FROM lahman_seriespost 
+        WHERE (teamidwinner = :team_id OR teamidloser = :team_id)
+    """,
+    "ws_years": """
+        SELECT COUNT(DISTINCT yearid) as ws_years
+        FROM lahman_seriespost 
+        WHERE (teamidwinner = :team_id OR teamidloser = :team_id) 
+        AND round = 'WS'
+    """,
+    "ws_wins": """
+        SELECT COUNT(*) as total_ws_wins
+        FROM lahman_seriespost 
+        WHERE teamidwinner = :team_id
+        AND round = 'WS'
+    """,
+    "franchise_playoff_series": """
+        SELECT yearid, round, teamidwinner, teamidloser
+        FROM lahman_seriespost
+        WHERE teamidwinner = ANY(:team_ids) OR teamidloser = ANY(:team_ids)
+    """,
+
+    # Head to head
+    "h2h_games": """
+        SELECT team, opp, date, win
+        FROM retrosheet_teamstats 
+        WHERE (
+            (team = ANY(:team_a_ids) AND opp = ANY(:team_b_ids)) OR 
+            (team = ANY(:team_b_ids) AND opp = ANY(:team_a_ids))
+        )
+        ORDER BY date, team
+    """,
+    "h2h_games_in_year": """
+        SELECT team, opp, date, win
+        FROM retrosheet_teamstats 
+        WHERE (
+            (team = ANY(:team_a_ids) AND opp = ANY(:team_b_ids)) OR 
+            (team = ANY(:team_b_ids) AND opp = ANY(:team_a_ids))
+        ) AND CAST(date / 10000 AS INTEGER) = :year_filter
+        ORDER BY date, team
+    """,
+    "h2h_series": """
+        SELECT yearid, round, teamidwinner, teamidloser, wins, losses
+        FROM lahman_seriespost 
+        WHERE (
+            (teamidwinner = :team_a AND teamidloser = :team_b) OR 
+            (teamidwinner = :team_b AND teamidloser = :team_a)
+        )
+    """,
+    "h2h_series_in_year": """
+        SELECT yearid, round, teamidwinner, teamidloser, wins, losses
+        FROM lahman_seriespost 
+        WHERE (
+            (teamidwinner = :team_a AND teamidloser = :team_b) OR 
+            (teamidwinner = :team_b AND teamidloser = :team_a)
+        ) AND yearid = :year_filter
+    """,
+    "team_game_log": """
+        SELECT team, opp, date, number, vishome, win, loss, tie, b_r, p_r, gametype
+        FROM retrosheet_teamstats
+    """,
+    "standings_teams": """
+        SELECT teamid, teamidretro, lgid, divid, name FROM lahman_teams WHERE yearid = :year
+    """,
+    "team_analytics_source": """
+        SELECT yearid, lgid, teamid, name, g, w, l, r, ra FROM lahman_teams
+    """,
+    "season_batting_totals": """
+        SELECT playerid, yearid, SUM(g) AS g, SUM(ab) AS ab, SUM(h) AS h, SUM(hr) AS hr,
+               SUM(rbi) AS rbi, SUM(sb) AS sb, SUM(bb) AS bb, SUM(hbp) AS hbp, SUM(sf) AS sf,
+               SUM(sh) AS sh, SUM("2b") AS "2b", SUM("3b") AS "3b"
+        FROM lahman_batting
+        GROUP BY playerid, yearid
+    """,
+    "season_pitching_totals": """
+        SELECT playerid, yearid, SUM(w) AS w, SUM(l) AS l, SUM(g) AS g, SUM(gs) AS gs,
+               SUM(cg) AS cg, SUM(sho) AS sho, SUM(sv) AS sv, SUM(ipouts) AS ipouts,
+               SUM(h) AS h, SUM(er) AS er, SUM(hr) AS hr, SUM(bb) AS bb, SUM(so) AS so
+        FROM lahman_pitching
+        GROUP BY playerid, yearid
+    """,
+    "league_batting_environment": """
+        SELECT yearid, SUM(h) AS h, SUM(hr) AS hr, SUM(bb) AS bb, SUM(rbi) AS rbi,
+               SUM(ab + bb + COALESCE(hbp, 0) + COALESCE(sf, 0) + COALESCE(sh, 0)) AS pa
+        FROM lahman_batting
+        GROUP BY yearid
+    """,
+    "league_pitching_environment": """
+        SELECT yearid, SUM(h) AS h, SUM(hr) AS hr, SUM(bb) AS bb, SUM(er) AS er, SUM(ipouts) AS ipouts
+        FROM lahman_pitching
+        GROUP BY yearid
+    """,
+    "season_games": """
+        SELECT yearid, MAX(g) AS g FROM lahman_teams GROUP BY yearid
+    """,
+    "versus_seasons": """
+        SELECT yearid, SUM(pa) AS pa, SUM(ab) AS ab, SUM(h) AS h, SUM("2b") AS "2b",
+               SUM("3b") AS "3b", SUM(hr) AS hr, SUM(bb) AS bb, SUM(hbp) AS hbp,
+               SUM(so) AS so, SUM(sf) AS sf, SUM(sh) AS sh
+        FROM retrosheet_matchups
+        WHERE batter = :batter AND pitcher = :pitcher
+        GROUP BY yearid
+        ORDER BY yearid
+    """,
+}
+
+ARRAY_PARAM = re.compile(r"= ANY\(:(\w+)\)")
+
+_compiled_queries = {}
+
+def sql(name):
+    """Compiled statement for a registered query; lists bind to `= ANY(:ids)` params"""
+    statement = _compiled_queries.get(name)
+    if statement is None:
+        from sqlalchemy import bindparam, text
+
+        query = QUERIES[name]
+        if db_engine.dialect.name == "postgresql":
+            statement = text(query)
+        else:
+            array_params = sorted(set(ARRAY_PARAM.findall(query)))
+            statement = text(ARRAY_PARAM.sub(r"IN :\1", query)).bindparams(
+                *[bindparam(param, expanding=True) for param in array_params]
+            )
+        _compiled_queries[name] = statement
+    return statement
+
+
 # ─── UNIFIED TEAM DATA ──────────────────────────────────────────────────────
 # Single source for every team code.
 # Keys are Lahman DB team codes. Each value contains:
@@ -134,18 +857,181 @@ TEAMS = {
 
 # ── Derived lookup tables (built once at import time) ────────────────────────
 
+def _build_code_to_primary():
+    # Later TEAMS entries win, so "cal" -> CAL even though LAA lists it as an alt code
+    lookup = {}
+    for code, info in TEAMS.items():
+        lookup[code.lower()] = code  # self-maps
+        for alt in info.get("alt_codes", []):
+            lookup[alt.lower()] = code
+    return MappingProxyType(lookup)
+
+
+def _build_alias_to_code():
+    lookup = {}
+    for code, info in TEAMS.items():
+        for alias in info.get("aliases", []):
+            lookup[alias] = code
+    return MappingProxyType(lookup)
+
+
 # Map alternate codes → primary code  (e.g. "CHC" → "CHN")
-_CODE_TO_PRIMARY = {}
-for _code, _info in TEAMS.items():
-    _CODE_TO_PRIMARY[_code.lower()] = _code  # self-maps
-    for _alt in _info.get("alt_codes", []):
-        _CODE_TO_PRIMARY[_alt.lower()] = _code
+_CODE_TO_PRIMARY = _build_code_to_primary()
 
 # Map lowercase alias → primary code  (e.g. "cubs" → "CHN")
-_ALIAS_TO_CODE = {}
-for _code, _info in TEAMS.items():
-    for _alias in _info.get("aliases", []):
-        _ALIAS_TO_CODE[_alias] = _code
+_ALIAS_TO_CODE = _build_alias_to_code()
+
+# Partial matching returns the first alias (in TEAMS order) that contains the
+# search term or is contained in it. "Alias contains term" is one lookup in a
+# table of every alias substring; "term contains alias" is a single pass of an
+# Aho-Corasick automaton over the term. Neither depends on the number of aliases.
+_ALIASES = tuple(_ALIAS_TO_CODE)
+
+
+def _build_alias_substrings():
+    earliest = {}
+    for i, alias in enumerate(_ALIASES):
+        for start in range(len(alias) + 1):
+            for end in range(start, len(alias) + 1):
+                earliest.setdefault(alias[start:end], i)
+    return MappingProxyType(earliest)
+
+
+_ALIAS_SUBSTRINGS = _build_alias_substrings()
+
+
+def _build_alias_automaton():
+    # Trie of the aliases; best[state] is the earliest alias ending at that state
+    goto, best = [{}], [len(_ALIASES)]
+    for i, alias in enumerate(_ALIASES):
+        state = 0
+        for char in alias:
+            if char not in goto[state]:
+                goto[state][char] = len(goto)
+                goto.append({})
+                best.append(len(_ALIASES))
+            state = goto[state][char]
+        best[state] = min(best[state], i)
+
+    # Breadth-first, fold each state's failure state into it so matching never backtracks
+    fail = [0] * len(goto)
+    delta = [None] * len(goto)
+    delta[0] = dict(goto[0])
+    queue = list(goto[0].values())
+    for state in queue:
+        delta[state] = {**delta[fail[state]], **goto[state]}
+        best[state] = min(best[state], best[fail[state]])
+        for char, child in goto[state].items():
+            fail[child] = delta[fail[state]].get(char, 0)
+            queue.append(child)
+
+    return tuple(MappingProxyType(transitions) for transitions in delta), tuple(best)
+
+
+_ALIAS_TRANSITIONS, _ALIAS_BEST_MATCH = _build_alias_automaton()
+
+
+def match_team_alias(search_term):
+    """Code for the first alias that contains search_term or appears in it, else None"""
+    best = _ALIAS_SUBSTRINGS.get(search_term, len(_ALIASES))
+
+    state = 0
+    for char in search_term:
+        state = _ALIAS_TRANSITIONS[state].get(char, 0)
+        if _ALIAS_BEST_MATCH[state] < best:
+            best = _ALIAS_BEST_MATCH[state]
+
+    return _ALIAS_TO_CODE[_ALIASES[best]] if best < len(_ALIASES) else None
+
+
+# ── Franchise registry ───────────────────────────────────────────────────────
+# Every Lahman code a franchise has played under, with the seasons each code
+# covers (last_year None = still in use). Keys are the codes the app resolves
+# teams to; anything else is treated as a single-code franchise.
+
+class TeamEra(NamedTuple):
+    team_id: str
+    first_year: int
+    last_year: Optional[int] = None
+
+
+class Franchise(NamedTuple):
+    code: str
+    team_ids: tuple
+    eras: tuple = ()
+
+    def team_id_for(self, year):
+        """The code this franchise played under in a season (its own code when unknown)"""
+        for era in self.eras:
+            if era.first_year <= year and (era.last_year is None or year <= era.last_year):
+                return era.team_id
+        return self.code
+
+
+def _franchise(code, team_ids, *eras):
+    return Franchise(code, tuple(team_ids), tuple(TeamEra(*era) for era in eras))
+
+
+FRANCHISES = MappingProxyType({franchise.code: franchise for franchise in (
+    # Milwaukee Brewers - NL Brewers (1998+) + AL Brewers (1970-1997)
+    _franchise("MIL", ["MIL", "ML4"], ("ML4", 1970, 1997), ("MIL", 1998)),
+    # Atlanta Braves - includes Boston Braves and Milwaukee Braves
+    _franchise("ATL", ["ATL", "BSN", "ML1"], ("BSN", 1876, 1952), ("ML1", 1953, 1965), ("ATL", 1966)),
+    # Los Angeles Dodgers - includes all Brooklyn Dodgers
+    _franchise("LAN", ["LAN", "BRO", "BR3"], ("BR3", 1884, 1889), ("BRO", 1890, 1957), ("LAN", 1958)),
+    # San Francisco Giants - includes New York Giants
+    _franchise("SFN", ["SFN", "NY1"], ("NY1", 1883, 1957), ("SFN", 1958)),
+    # Baltimore Orioles - includes St. Louis Browns
+    _franchise("BAL", ["BAL", "SLA", "MLA"], ("MLA", 1901, 1901), ("SLA", 1902, 1953), ("BAL", 1954)),
+    _franchise("CHA", ["CHA"], ("CHA", 1901)),
+    _franchise("CLE", ["CLE"], ("CLE", 1901)),
+    _franchise("CIN", ["CIN", "CN2"], ("CN2", 1882, 1889), ("CIN", 1890)),
+    _franchise("PHI", ["PHI"], ("PHI", 1883)),
+    # Oakland Athletics - includes Philadelphia and Kansas City
+    _franchise("OAK", ["OAK", "KC1", "PHA"], ("PHA", 1901, 1954), ("KC1", 1955, 1967), ("OAK", 1968)),
+    _franchise("SLN", ["SLN", "SL4"], ("SL4", 1882, 1891), ("SLN", 1892)),
+    _franchise("NYA", ["NYA"], ("NYA", 1903)),
+    _franchise("NYN", ["NYN"], ("NYN", 1962)),
+    _franchise("KCR", ["KCR"]),
+    # Minnesota Twins - includes original Washington Senators (1901-1960)
+    _franchise("MIN", ["MIN", "WS1"], ("WS1", 1901, 1960), ("MIN", 1961)),
+    # Texas Rangers - includes expansion Washington Senators (1961-1971)
+    _franchise("TEX", ["TEX", "WS2"], ("WS2", 1961, 1971), ("TEX", 1972)),
+    # Washington Nationals - includes Montreal Expos
+    _franchise("WAS", ["WAS", "MON"], ("MON", 1969, 2004), ("WAS", 2005)),
+    # Los Angeles Angels - various eras
+    _franchise("LAA", ["LAA", "ANA", "CAL"], ("LAA", 1961, 1964), ("CAL", 1965, 1996), ("ANA", 1997, 2004), ("LAA", 2005)),
+    _franchise("TBA", ["TBA", "TBD"], ("TBA", 1998)),
+    _franchise("MIA", ["MIA", "FLO", "FLA"], ("FLO", 1993, 2011), ("MIA", 2012)),
+    _franchise("SEA", ["SEA"], ("SEA", 1977)),
+    _franchise("PIT", ["PIT", "PT1"], ("PT1", 1882, 1886), ("PIT", 1887)),
+    # Single-location franchises (no historical moves)
+    _franchise("ARI", ["ARI"], ("ARI", 1998)),
+    _franchise("BOS", ["BOS"], ("BOS", 1901)),
+    _franchise("COL", ["COL"], ("COL", 1993)),
+    _franchise("DET", ["DET"], ("DET", 1901)),
+    _franchise("HOU", ["HOU"], ("HOU", 1962)),
+    _franchise("SDN", ["SDN"], ("SDN", 1969)),
+    _franchise("TOR", ["TOR"], ("TOR", 1977)),
+    _franchise("CHC", ["CHN"], ("CHN", 1876)),
+)})
+
+
+def get_franchise(team_id):
+    """Registry entry for a team code; unknown codes are their own one-code franchise"""
+    franchise = FRANCHISES.get(team_id)
+    return franchise if franchise is not None else Franchise(team_id, (team_id,))
+
+
+# Any code a franchise has played under → the franchise's current code
+FRANCHISE_CODES = MappingProxyType({
+    team_id: franchise.code for franchise in reversed(FRANCHISES.values()) for team_id in franchise.team_ids
+})
+
+
+def franchise_code(team_id):
+    """Current franchise code for a historical team code (BRO → LAN)"""
+    return FRANCHISE_CODES.get(team_id, team_id)
 
 
 KNOWN_TWO_WAY_PLAYERS = {
@@ -176,87 +1062,11 @@ def get_photo_url_for_player(playerid, conn):
     """No photo URL - frontend will handle images"""
     return None
 
-def get_world_series_championships(playerid, conn=None):
-    """Get World Series championships for a player"""
-    from sqlalchemy import text
-    
-    owns_conn = conn is None
-    if owns_conn:
-        conn = db_engine.connect()
-    
-    try:
-        ws_query = text("""
-        SELECT DISTINCT b.yearid, b.teamid, s.name as team_name
-        FROM lahman_batting b
-        JOIN lahman_seriespost sp ON b.yearid = sp.yearid AND b.teamid = sp.teamidwinner
-        LEFT JOIN lahman_teams s ON b.teamid = s.teamid AND b.yearid = s.yearid
-        WHERE b.playerid = :playerid AND sp.round = 'WS'
-        
-        UNION
-        
-        SELECT DISTINCT p.yearid, p.teamid, s.name as team_name
-        FROM lahman_pitching p
-        JOIN lahman_seriespost sp ON p.yearid = sp.yearid AND p.teamid = sp.teamidwinner
-        LEFT JOIN lahman_teams s ON p.teamid = s.teamid AND p.yearid = s.yearid
-        WHERE p.playerid = :playerid AND sp.round = 'WS'
-        
-        ORDER BY 1 DESC
-        """)
-
-        ws_results = conn.execute(ws_query, {"playerid": playerid}).fetchall()
-
-        championships = []
-        for row in ws_results:
-            year, team_id, team_name = row
-            championships.append(
-                {"year": year, "team": team_id, "team_name": team_name or team_id}
-            )
-
-        return championships
-
-    except Exception as e:
-        # Fallback: check awards table for WS entries
-        try:
-            fallback_query = text("""
-                SELECT yearid, notes
-                FROM lahman_awardsplayers 
-                WHERE playerid = :playerid AND awardid = 'WS'
-                ORDER BY yearid DESC
-            """)
-
-            fallback_results = conn.execute(fallback_query, {"playerid": playerid}).fetchall()
-                
-            championships = []
-            for year, notes in fallback_results:
-                championships.append(
-                    {
-                        "year": year,
-                        "team": "Unknown",
-                        "team_name": notes or "World Series Champion",
-                    })
-                
-            return championships
-
-        except Exception as e2:
-            return []
-        finally:
-            if owns_conn:
-                conn.close()
-
-
 def get_career_war(playerid):
     """Get career WAR from JEFFBAGWELL database"""
-    from sqlalchemy import text
-    
     try:
-        query = text("""
-            SELECT SUM(WAR162) as career_war 
-            FROM jeffbagwell_war 
-            WHERE key_bbref = :playerid
-        """)
-
         with db_engine.connect() as conn:
-            result = conn.execute(query, {"playerid": playerid}).fetchone()
+            result = conn.execute(sql("career_war"), {"playerid": playerid}).fetchone()
 
         if result and result[0] is not None:
             return float(result[0])
@@ -267,49 +1077,29 @@ def get_career_war(playerid):
 
 
 def get_season_war_history(playerid):
-    """Get season-by-season WAR from JEFFBAGWELL database"""
-    from sqlalchemy import text
-    
+    """Get season-by-season WAR from JEFFBAGWELL database as {year: [war, ...]}"""
     try:
-        query = text("""
-            SELECT year_ID, WAR162 as war
-            FROM jeffbagwell_war 
-            WHERE key_bbref = :playerid
-            ORDER BY year_ID DESC
-        """)
-        
-        df = pd.read_sql_query(query, db_engine, params={"playerid": playerid})
-    
-        if 'year_ID' in df.columns:
-            df = df.rename(columns={'year_ID': 'yearid'})
-        
-        return df
+        war_by_year = {}
+        for row in fetch_records(sql("season_war"), {"playerid": playerid}):
+            war = row["war"]
+            war_by_year.setdefault(int(row["yearid"]), []).append(
+                float(war) if war is not None else 0
+            )
+        return war_by_year
 
     except Exception as e:
         print(f"get_season_war_history error: {e}")
-        return pd.DataFrame()
+        return {}
 
 def detect_player_type(playerid, conn=None):
     """Detect if player is primarily a pitcher or hitter based on their stats"""
-    from sqlalchemy import text
-    
     owns_conn = conn is None
     if owns_conn:
         conn = db_engine.connect()
     
     try:
-        pitching_query = text("""
-        SELECT COUNT(*) as pitch_seasons, SUM(g) as total_games_pitched, SUM(gs) as total_starts
-        FROM lahman_pitching WHERE playerid = :playerid
-        """)
-
-        batting_query = text("""
-        SELECT COUNT(*) as bat_seasons, SUM(g) as total_games_batted, SUM(ab) as total_at_bats
-        FROM lahman_batting WHERE playerid = :playerid
-        """)
-
-        pitch_result = conn.execute(pitching_query, {"playerid": playerid}).fetchone()
-        bat_result = conn.execute(batting_query, {"playerid": playerid}).fetchone()
+        pitch_result = conn.execute(sql("pitching_summary"), {"playerid": playerid}).fetchone()
+        bat_result = conn.execute(sql("batting_summary"), {"playerid": playerid}).fetchone()
 
         pitch_seasons = pitch_result[0] if pitch_result else 0
         total_games_pitched = pitch_result[1] if pitch_result and pitch_result[1] else 0
@@ -330,109 +1120,78 @@ def detect_player_type(playerid, conn=None):
             conn.close()
 
 
-def get_player_awards(playerid, conn=None):
-    """Get all awards for a player from the lahman database"""
-    from sqlalchemy import text
-    
-    owns_conn = conn is None
-    if owns_conn:
-        conn = db_engine.connect()
-    
-    try:
-        # Query for all awards
-        awards_query = text("""
-        SELECT yearid, awardid, lgid, tie, notes
-        FROM lahman_awardsplayers 
-        WHERE playerid = :playerid
-        ORDER BY yearid DESC, awardid
-        """)
-
-        awards_data = conn.execute(awards_query, {"playerid": playerid}).fetchall()
-            
-        awards = []
-        for row in awards_data:
-            year, award_id, league, tie, notes = row
-
-            # Format award name for display
-            award_display = format_award_name(award_id)
-
-            award_info = {
-                "year": year,
-                "award": award_display,
-                "award_id": award_id,
-                "league": league,
-                "tie": bool(tie) if tie else False,
-                "notes": notes,
-            }
-            awards.append(award_info)
-
-        # Group and summarize awards
-        award_summary = summarize_awards(awards)
+def empty_awards_block():
+    """Award block for a player with no awards, All-Star games or rings"""
+    return {
+        "awards": [],
+        "summary": {},
+        "mlbAllStar": 0,
+        "world_series_championships": [],
+        "ws_count": 0,
+    }
 
-        # Get MLB All-Star Game appearances:
-        allstar_games = get_allstar_appearances(playerid, conn)
 
-        # Get world series championships
-        ws_championships = get_world_series_championships(playerid, conn)
+def get_player_awards(playerid, conn=None):
+    """Awards, All-Star appearances and World Series rings for a player, from the awards index"""
+    try:
+        block = get_awards_index().by_player.get(playerid)
+    except Exception as e:
+        print(f"get_player_awards error: {e}")
+        block = None
+    return copy_awards_block(block) if block is not None else empty_awards_block()
+
+
+def copy_awards_block(block):
+    """Copy of an indexed award block down to its innermost lists, so callers can't edit the index"""
+    return {
+        "awards": [dict(award) for award in block["awards"]],
+        "summary": {award_id: dict(entry, years=list(entry["years"])) for award_id, entry in block["summary"].items()},
+        "mlbAllStar": block["mlbAllStar"],
+        "world_series_championships": [dict(ring) for ring in block["world_series_championships"]],
+        "ws_count": block["ws_count"],
+    }
 
-        return {
-            "awards": awards,
-            "summary": award_summary,
-            "mlbAllStar": allstar_games,
-            "world_series_championships": ws_championships,
-            "ws_count": len(ws_championships),
-        }
 
-    except Exception as e:
-        return {
-            "awards": [],
-            "summary": {},
-            "mlbAllStar": [],
-            "world_series_championships": [],
-            "ws_count": 0,
-        }
-    finally:
-        if owns_conn:
-            conn.close()
+AWARD_NAMES = MappingProxyType({
+    "MVP": "Most Valuable Player",
+    "CYA": "Cy Young Award",
+    "CY": "Cy Young Award",
+    "ROY": "Rookie of the Year",
+    "GG": "Gold Glove",
+    "SS": "Silver Slugger",
+    "AS": "TSN All-Star Team",
+    "ASG": "All-Star Game",
+    "WSMVP": "World Series MVP",
+    "WS": "World Series Champion",
+    "WSRING": "World Series Ring",
+    "ALCS MVP": "ALCS MVP",
+    "NLCS MVP": "NLCS MVP",
+    "ASG MVP": "All-Star Game MVP",
+    "ASGMVP": "All-Star Game MVP",
+    "COMEB": "Comeback Player of the Year",
+    "Hutch": "Hutch Award",
+    "Lou Gehrig": "Lou Gehrig Memorial Award",
+    "Babe Ruth": "Babe Ruth Award",
+    "Roberto Clemente": "Roberto Clemente Award",
+    "Branch Rickey": "Branch Rickey Award",
+    "Hank Aaron": "Hank Aaron Award",
+    "DHL Hometown Hero": "DHL Hometown Hero",
+    "Edgar Martinez": "Edgar Martinez Outstanding DH Award",
+    "Hutch Award": "Hutch Award",
+    "Man of the Year": "Man of the Year",
+    "Players Choice": "Players Choice Award",
+    "Reliever": "Reliever of the Year",
+    "TSN Fireman": "The Sporting News Fireman Award",
+    "TSN MVP": "The Sporting News MVP",
+    "TSN Pitcher": "The Sporting News Pitcher of the Year",
+    "TSN Player": "The Sporting News Player of the Year",
+    "TSN Rookie": "The Sporting News Rookie of the Year",
+})
 
 
 def format_award_name(award_id):
     """Convert award IDs to readable names"""
-    award_names = {
-        "MVP": "Most Valuable Player",
-        "CYA": "Cy Young Award",
-        "CY": "Cy Young Award",
-        "ROY": "Rookie of the Year",
-        "GG": "Gold Glove",
-        "SS": "Silver Slugger",
-        "AS": "TSN All-Star Team",
-        "WSMVP": "World Series MVP",
-        "WS": "World Series Champion",
-        "ALCS MVP": "ALCS MVP",
-        "NLCS MVP": "NLCS MVP",
-        "ASG MVP": "All-Star Game MVP",
-        "ASGMVP": "All-Star Game MVP",
-        "COMEB": "Comeback Player of the Year",
-        "Hutch": "Hutch Award",
-        "Lou Gehrig": "Lou Gehrig Memorial Award",
-        "Babe Ruth": "Babe Ruth Award",
-        "Roberto Clemente": "Roberto Clemente Award",
-        "Branch Rickey": "Branch Rickey Award",
-        "Hank Aaron": "Hank Aaron Award",
-        "DHL Hometown Hero": "DHL Hometown Hero",
-        "Edgar Martinez": "Edgar Martinez Outstanding DH Award",
-        "Hutch Award": "Hutch Award",
-        "Man of the Year": "Man of the Year",
-        "Players Choice": "Players Choice Award",
-        "Reliever": "Reliever of the Year",
-        "TSN Fireman": "The Sporting News Fireman Award",
-        "TSN MVP": "The Sporting News MVP",
-        "TSN Pitcher": "The Sporting News Pitcher of the Year",
-        "TSN Player": "The Sporting News Player of the Year",
-        "TSN Rookie": "The Sporting News Rookie of the Year",
-    }
-
-    return award_names.get(award_id, award_id)
+    return AWARD_NAMES.get(award_id, award_id)
 
 
 def summarize_awards(awards):
@@ -458,39 +1217,25 @@ def summarize_awards(awards):
     return summary
 
 
-def get_allstar_appearances(playerid, conn=None):
-    """Get MLB All-Star Game appearances from AllstarFull table"""
-    from sqlalchemy import text
-    
-    owns_conn = conn is None
-    if owns_conn:
-        conn = db_engine.connect()
-    
-    try:
-        query = text("""
-            SELECT COUNT(*) as allstar_games
-            FROM lahman_allstarfull 
-            WHERE playerid = :playerid
-        """)
-        result = conn.execute(query, {"playerid": playerid}).fetchone()
-        
-        return result[0] if result else 0
-    except Exception as e:
-        return 0
-    finally:
-        if owns_conn:
-            conn.close()
-
 @app.route("/")
 def serve_index():
     return send_from_directory("static", "index.html")
 
-# Route for two-way player handling
-@app.route("/player-two-way")
-def get_player_with_two_way():
-    """Enhanced player endpoint that handles two-way players"""
-    from sqlalchemy import text
-    
+def ambiguous_player_response(name, suggestions, **extra):
+    """422 listing the players a typed name could mean"""
+    return (
+        jsonify({
+            "error": "Multiple players found",
+            "suggestions": suggestions,
+            "message": f"Found {len(suggestions)} players named '{name.split(' Jr.')[0].split(' Sr.')[0]}'. Please specify which player:",
+            **extra,
+        }),
+        422,
+    )
+
+
+def legacy_player_response():
+    """Shared body of /player-two-way and /player-disambiguate"""
     name = request.args.get("name", "")
     mode = request.args.get("mode", "career").lower()
     player_type = request.args.get("player_type", "").lower()
@@ -498,31 +1243,17 @@ def get_player_with_two_way():
     if " " not in name:
         return jsonify({"error": "Enter full name"}), 400
 
-    playerid, suggestions = improved_player_lookup_with_disambiguation(name)
+    entry, suggestions = resolve_player(name)
 
-    if playerid is None and suggestions:
-        return (
-            jsonify({
-                "error": "Multiple players found",
-                "suggestions": suggestions,
-                "message": f"Found {len(suggestions)} players named '{name.split(' Jr.')[0].split(' Sr.')[0]}'. Please specify which player:",
-            }),
-            422,
-        )
+    if entry is None and suggestions:
+        return ambiguous_player_response(name, suggestions)
 
-    if playerid is None:
+    if entry is None:
         return jsonify({"error": "Player not found"}), 404
 
+    playerid, first, last = entry.playerid, entry.namefirst, entry.namelast
     detected_type = detect_two_way_player_simple(playerid, None)
 
-    # Get player's actual name for display
-    name_query = text("SELECT namefirst, namelast FROM lahman_people WHERE playerid = :playerid")
-    
-    with db_engine.connect() as conn:
-        name_result = conn.execute(name_query, {"playerid": playerid}).fetchone()
-    
-    first, last = name_result if name_result else ("Unknown", "Unknown")
-
     # Handle two-way players
     if detected_type == "two-way" and not player_type:
         # Return options for user to choose
@@ -559,11 +1290,16 @@ def get_player_with_two_way():
         return handle_hitter_stats(playerid, mode, photo_url, first, last)
 
 
+# Route for two-way player handling
+@app.route("/player-two-way")
+def get_player_with_two_way():
+    """Enhanced player endpoint that handles two-way players"""
+    return legacy_player_response()
+
+
 @app.route('/search-players')
 def search_players_enhanced():
     """Enhanced search that handles father/son players and provides disambiguation"""
-    from sqlalchemy import text
-    
     query = request.args.get("q", "").strip()
 
     if len(query) < 2:
@@ -574,42 +1310,8 @@ def search_players_enhanced():
         search_term = f"%{query_clean}%"
         exact_match = f"{query_clean}%"
 
-        search_query = text("""
-        SELECT DISTINCT 
-            p.namefirst,
-            p.namelast,
-            p.playerid,
-            p.debut,
-            p.finalgame,
-            p.birthyear,
-            CASE 
-                WHEN LOWER(p.namefirst || ' ' || p.namelast) LIKE :exact_match THEN 1
-                WHEN LOWER(p.namelast) LIKE :exact_match THEN 2
-                WHEN LOWER(p.namefirst) LIKE :exact_match THEN 3
-                ELSE 4
-            END as priority,
-            (SELECT pos FROM lahman_fielding f 
-             WHERE f.playerid = p.playerid
-             GROUP BY pos 
-             ORDER BY SUM(g) DESC 
-             LIMIT 1) as primary_pos
-        FROM lahman_people p
-        WHERE (
-            LOWER(p.namefirst || ' ' || p.namelast) LIKE :search_term
-            OR LOWER(p.namelast) LIKE :search_term
-            OR LOWER(p.namefirst) LIKE :search_term
-        )
-        AND p.birthyear IS NOT NULL
-        AND (
-            EXISTS (SELECT 1 FROM lahman_batting b WHERE b.playerid = p.playerid)
-            OR EXISTS (SELECT 1 FROM lahman_pitching pt WHERE pt.playerid = p.playerid)
-        )
-        ORDER BY priority, p.debut DESC NULLS LAST, p.namelast, p.namefirst
-        LIMIT 15
-        """)
-
         with db_engine.connect() as conn:
-            results = conn.execute(search_query, {
+            results = conn.execute(sql("search_players"), {
                 "exact_match": exact_match,
                 "search_term": search_term
             }).fetchall()
@@ -706,70 +1408,338 @@ def search_players_enhanced():
             "traceback": error_trace
         }), 500
 
+# ─── PLAYER NAME INDEX ──────────────────────────────────────────────────────
+# Name → playerid resolution runs against an in-process index instead of the
+# database: names are accent-folded, each player is indexed under its listed
+# first name plus given-name and nickname variants, and misspellings are caught
+# with a SymSpell-style delete index verified by Damerau-Levenshtein distance.
+
+NAME_SUFFIXES = {
+    "jr": "Jr.",
+    "jr.": "Jr.",
+    "junior": "Jr.",
+    "sr": "Sr.",
+    "sr.": "Sr.",
+    "senior": "Sr.",
+    "ii": "II",
+    "iii": "III",
+    "2nd": "II",
+    "3rd": "III",
+}
+
+NICKNAME_GROUPS = (
+    ("alexander", "alex", "al"),
+    ("albert", "al", "bert"),
+    ("andrew", "andy", "drew"),
+    ("anthony", "tony"),
+    ("benjamin", "ben", "benny"),
+    ("charles", "charlie", "chuck", "chas"),
+    ("christopher", "chris"),
+    ("daniel", "dan", "danny"),
+    ("david", "dave", "davey"),
+    ("donald", "don", "donnie"),
+    ("douglas", "doug"),
+    ("edward", "ed", "eddie", "ted"),
+    ("frederick", "fred", "freddie"),
+    ("gerald", "jerry"),
+    ("gregory", "greg"),
+    ("harold", "hal", "harry"),
+    ("henry", "hank", "harry"),
+    ("jacob", "jake"),
+    ("james", "jim", "jimmy", "jamie"),
+    ("jeffrey", "jeff"),
+    ("john", "johnny", "jack"),
+    ("jonathan", "jon"),
+    ("joseph", "joe", "joey"),
+    ("joshua", "josh"),
+    ("kenneth", "ken", "kenny"),
+    ("lawrence", "larry"),
+    ("leonard", "leo", "lenny"),
+    ("matthew", "matt"),
+    ("michael", "mike", "mickey"),
+    ("nathaniel", "nate", "nathan"),
+    ("nicholas", "nick"),
+    ("patrick", "pat"),
+    ("peter", "pete"),
+    ("philip", "phil"),
+    ("raymond", "ray"),
+    ("richard", "rick", "ricky", "dick", "rich"),
+    ("robert", "bob", "bobby", "rob", "robbie"),
+    ("ronald", "ron", "ronnie"),
+    ("samuel", "sam", "sammy"),
+    ("stephen", "steve", "stevie"),
+    ("steven", "steve", "stevie"),
+    ("thomas", "tom", "tommy"),
+    ("timothy", "tim", "timmy"),
+    ("vincent", "vince", "vinny"),
+    ("walter", "walt"),
+    ("william", "will", "bill", "billy", "willie"),
+    ("zachary", "zach", "zack"),
+)
+
+
+def _build_nicknames():
+    nicknames = {}
+    for group in NICKNAME_GROUPS:
+        for name in group:
+            nicknames.setdefault(name, set()).update(n for n in group if n != name)
+    return MappingProxyType({name: frozenset(names) for name, names in nicknames.items()})
+
+
+NICKNAMES = _build_nicknames()
+
+_NAME_PUNCTUATION = re.compile(r"[^a-z0-9 ]+")
+
+
+def fold_name(name):
+    """Lowercase, strip accents and punctuation ("Acuña Jr." → "acuna jr")"""
+    if not name:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(_NAME_PUNCTUATION.sub("", stripped.lower().replace("-", " ")).split())
+
+
+def split_name_suffix(name):
+    """Split a trailing Jr./Sr./II style suffix off a typed name"""
+    name = name.strip()
+    name_lower = name.lower()
+    for suffix_variant, standard_suffix in NAME_SUFFIXES.items():
+        if name_lower.endswith(" " + suffix_variant):
+            return name[: -(len(suffix_variant) + 1)].strip(), standard_suffix
+    return name, None
+
+
+def name_edit_budget(term):
+    """Typos tolerated for a term: none for initials, one for short names"""
+    if len(term) <= 2:
+        return 0
+    return 1 if len(term) <= 5 else 2
+
+
+def damerau_levenshtein(a, b, limit):
+    """Optimal string alignment distance, or limit + 1 once it is exceeded"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev_prev = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev_prev[j - 2] + 1)
+            row_min = min(row_min, cur[j])
+        if row_min > limit:
+            return limit + 1
+        prev_prev, prev = prev, cur
+    return prev[-1]
+
+
+def _deletes(term, depth):
+    """Every string reachable from term by deleting up to depth characters"""
+    found = {term}
+    frontier = {term}
+    for _ in range(depth):
+        frontier = {t[:i] + t[i + 1:] for t in frontier for i in range(len(t))} - found
+        found |= frontier
+    return found
+
+
+class DeleteIndex:
+    """SymSpell-style lookup of dictionary terms within a small edit distance"""
+
+    def __init__(self, terms, max_distance=2):
+        self.max_distance = max_distance
+        self._deletes = {}
+        for term in terms:
+            for variant in _deletes(term, min(max_distance, name_edit_budget(term))):
+                self._deletes.setdefault(variant, []).append(term)
+
+    def lookup(self, term):
+        """Map each dictionary term within the edit budget of term to its distance"""
+        budget = min(self.max_distance, name_edit_budget(term))
+        matches = {}
+        for variant in _deletes(term, budget):
+            for candidate in self._deletes.get(variant, ()):
+                if candidate in matches:
+                    continue
+                distance = damerau_levenshtein(term, candidate, budget)
+                if distance <= min(budget, name_edit_budget(candidate)):
+                    matches[candidate] = distance
+        return matches
+
+
+class NameEntry(NamedTuple):
+    playerid: str
+    namefirst: str
+    namelast: str
+    debut: Optional[str]
+    finalgame: Optional[str]
+    birthyear: Optional[int]
+    first_keys: MappingProxyType  # folded first name → 0 listed, 1 given/nickname
+
+
+class PlayerNameIndex(NamedTuple):
+    entries: tuple
+    by_id: MappingProxyType
+    by_last: MappingProxyType
+    last_terms: DeleteIndex
+    first_terms: DeleteIndex
+
+
+def _first_name_keys(namefirst, namegiven):
+    keys = {}
+    listed = fold_name(namefirst)
+    listed_tokens = listed.split()
+    if listed:
+        keys[listed] = 0
+    given_tokens = fold_name(namegiven).split()
+    variants = listed_tokens[:1] + given_tokens[:1]
+    if len(listed_tokens) > 1:
+        # "J. D." style listings: also answer to the initials run together
+        variants.append("".join(listed_tokens))
+    for variant in variants:
+        for key in (variant, *NICKNAMES.get(variant, ())):
+            keys.setdefault(key, 1)
+    return MappingProxyType(keys)
+
+
+def _debut_order(entry):
+    return (entry.debut is None, entry.debut or "")
+
+
+def build_player_name_index(rows):
+    """Build the in-memory name index from lahman_people rows"""
+    entries = []
+    by_last = {}
+    for playerid, namefirst, namelast, namegiven, debut, finalgame, birthyear in rows:
+        last_key = fold_name(namelast)
+        if not last_key:
+            continue
+        entry = NameEntry(
+            playerid, namefirst or "", namelast, debut, finalgame, birthyear,
+            _first_name_keys(namefirst, namegiven),
+        )
+        entries.append(entry)
+        by_last.setdefault(last_key, []).append(entry)
+    for players in by_last.values():
+        players.sort(key=_debut_order)
+    first_keys = {key for entry in entries for key in entry.first_keys}
+    return PlayerNameIndex(
+        tuple(entries),
+        MappingProxyType({entry.playerid: entry for entry in entries}),
+        MappingProxyType({key: tuple(players) for key, players in by_last.items()}),
+        DeleteIndex(by_last),
+        DeleteIndex(first_keys),
+    )
+
+
+_player_name_index = None
+_player_name_index_lock = threading.Lock()
+
+
+def get_player_name_index():
+    """Load the name index once per process"""
+    global _player_name_index
+    if _player_name_index is None:
+        with _player_name_index_lock:
+            if _player_name_index is None:
+                with db_engine.connect() as conn:
+                    rows = conn.execute(sql("people_names")).fetchall()
+                _player_name_index = build_player_name_index(rows)
+                print(f"👤 Player name index built: {len(_player_name_index.entries)} players")
+    return _player_name_index
+
+
+def get_player_entry(playerid):
+    """Indexed identity (names, debut, birth year) for a playerid, or None"""
+    return get_player_name_index().by_id.get(playerid)
+
+
+def find_players_by_name(first, last, index=None):
+    """
+    Ranked candidates for a typed first/last name.
+
+    Returns (distance, variant, entry) tuples sorted best first, where distance
+    is the combined edit distance and variant is 0 when the listed first name
+    matched and 1 when a given-name or nickname variant did.
+    """
+    index = index or get_player_name_index()
+    first_key, last_key = fold_name(first), fold_name(last)
+    if not first_key or not last_key:
+        return []
+    first_matches = index.first_terms.lookup(first_key)
+    if not first_matches:
+        return []
+
+    candidates = []
+    for last_term, last_distance in index.last_terms.lookup(last_key).items():
+        for entry in index.by_last[last_term]:
+            best = None
+            for key, variant in entry.first_keys.items():
+                distance = first_matches.get(key)
+                if distance is not None and (best is None or (distance, variant) < best):
+                    best = (distance, variant)
+            if best is not None:
+                candidates.append((best[0] + last_distance, best[1], entry))
+    candidates.sort(key=lambda c: (c[0], c[1], _debut_order(c[2])))
+    return candidates
+
+
 def improved_player_lookup_with_disambiguation(name):
     """
-    Improved player lookup that handles common father/son cases
-    and provides suggestions when multiple players exist
+    Improved player lookup that handles common father/son cases,
+    accents, nicknames and typos, and provides suggestions when
+    multiple players match
     """
-    from sqlalchemy import text
-    
-    # Handle common suffixes
-    suffixes = {
-        "jr": "Jr.",
-        "jr.": "Jr.",
-        "junior": "Jr.",
-        "sr": "Sr.",
-        "sr.": "Sr.",
-        "senior": "Sr.",
-        "ii": "II",
-        "iii": "III",
-        "2nd": "II",
-        "3rd": "III",
-    }
+    entry, suggestions = resolve_player(name)
+    return (entry.playerid if entry else None), suggestions
 
-    name_lower = name.lower().strip()
-    suffix = None
-    clean_name = name
 
-    # Check if name contains a suffix
-    for suffix_variant, standard_suffix in suffixes.items():
-        if name_lower.endswith(" " + suffix_variant):
-            suffix = standard_suffix
-            clean_name = name[: -(len(suffix_variant) + 1)].strip()
-            break
+def resolve_player(name):
+    """Like improved_player_lookup_with_disambiguation, but returns the matched NameEntry"""
+    clean_name, suffix = split_name_suffix(name)
 
     if " " not in clean_name:
         return None, []
 
     first, last = clean_name.split(" ", 1)
 
-    # Find all players with this name using SQLAlchemy
-    all_players_query = text("""
-    SELECT playerid, namefirst, namelast, debut, finalgame, birthyear
-    FROM lahman_people
-    WHERE LOWER(namefirst) = :first AND LOWER(namelast) = :last
-    ORDER BY debut
-    """)
-
-    with db_engine.connect() as conn:
-        all_matches = conn.execute(all_players_query, {
-            "first": first.lower(), 
-            "last": last.lower()
-        }).fetchall()
+    candidates = find_players_by_name(first, last)
+    if not candidates:
+        return None, []
 
+    # Spelling-exact matches on the listed name keep the father/son handling
+    all_matches = [entry for distance, variant, entry in candidates if distance == 0 and variant == 0]
     if not all_matches:
-        return None, []
+        best = candidates[0][:2]
+        all_matches = [entry for distance, variant, entry in candidates if (distance, variant) == best]
+        if len(all_matches) == 1:
+            return all_matches[0], []
+        if len({(fold_name(e.namefirst), fold_name(e.namelast)) for e in all_matches}) > 1:
+            return None, [
+                {
+                    "name": f"{entry.namefirst} {entry.namelast}",
+                    "playerid": entry.playerid,
+                    "debut_year": entry.debut[:4] if entry.debut else "Unknown",
+                    "birth_year": entry.birthyear or "Unknown",
+                }
+                for entry in all_matches[:10]
+            ]
 
     if len(all_matches) == 1:
-        return all_matches[0][0], []
+        return all_matches[0], []
 
     # Multiple players found - create suggestions
     suggestions = []
     target_player = None
 
-    for i, (playerid, fname, lname, debut, final_game, birth_year) in enumerate(all_matches):
-        full_name = f"{fname} {lname}"
-        debut_year = debut[:4] if debut else "Unknown"
+    for i, entry in enumerate(all_matches):
+        full_name = f"{entry.namefirst} {entry.namelast}"
+        debut_year = entry.debut[:4] if entry.debut else "Unknown"
 
         # Create suggestion with disambiguation
         if len(all_matches) == 2:
@@ -779,15 +1749,15 @@ def improved_player_lookup_with_disambiguation(name):
 
         suggestion = {
             "name": f"{full_name} {player_suffix}",
-            "playerid": playerid,
+            "playerid": entry.playerid,
             "debut_year": debut_year,
-            "birth_year": birth_year or "Unknown",
+            "birth_year": entry.birthyear or "Unknown",
         }
         suggestions.append(suggestion)
 
         # If user specified a suffix, try to match it
         if suffix and suffix == player_suffix:
-            target_player = playerid
+            target_player = entry
 
     return target_player, suggestions
 
@@ -795,78 +1765,88 @@ def improved_player_lookup_with_disambiguation(name):
 @app.route("/player-disambiguate")
 def get_player_with_disambiguation():
     """Enhanced player endpoint that handles disambiguation"""
-    from sqlalchemy import text
-    
-    name = request.args.get("name", "")
-    mode = request.args.get("mode", "career").lower()
-    player_type = request.args.get("player_type", "").lower()
+    return legacy_player_response()
 
-    if " " not in name:
-        return jsonify({"error": "Enter full name"}), 400
 
-    # Try improved lookup
-    playerid, suggestions = improved_player_lookup_with_disambiguation(name)
+# Concurrent DB reads for two-way /player responses (each task holds one pooled connection)
+_player_fetch_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="player-fetch")
 
-    if playerid is None and suggestions:
-        # Multiple players found, return suggestions
-        return (
-            jsonify(
-                {
-                    "error": "Multiple players found",
-                    "suggestions": suggestions,
-                    "message": f"Found {len(suggestions)} players named '{name.split(' Jr.')[0].split(' Sr.')[0]}'. Please specify which player:",
-                }
-            ),
-            422,
-        )
 
-    if playerid is None:
-        return jsonify({"error": "Player not found"}), 404
+@app.route("/player")
+def get_player():
+    """
+    Player stats by name or playerid in one request. Two-way players get
+    hitting and pitching together unless player_type picks one.
+    """
+    playerid = request.args.get("playerid", "").strip()
+    name = request.args.get("name", "")
+    mode = request.args.get("mode", "career").lower()
+    player_type = request.args.get("player_type", "").lower()
 
-    # Continue with existing logic using the found playerid
-    detected_type = detect_two_way_player_simple(playerid, None)
+    if mode not in ("career", "season") + LIVE_MODES:
+        return jsonify({"error": "Invalid mode. Use 'career', 'season', 'live' or 'combined'"}), 400
 
-    # Get player's actual name for display using SQLAlchemy
-    name_query = text("SELECT namefirst, namelast FROM lahman_people WHERE playerid = :playerid")
-    
-    with db_engine.connect() as conn:
-        name_result = conn.execute(name_query, {"playerid": playerid}).fetchone()
-    
-    first, last = name_result if name_result else ("Unknown", "Unknown")
+    if playerid:
+        entry = get_player_entry(playerid)
+    elif " " in name:
+        entry, suggestions = resolve_player(name)
+        if entry is None and suggestions:
+            return ambiguous_player_response(name, suggestions)
+    else:
+        return jsonify({"error": "Enter full name or playerid"}), 400
 
-    # Handle two-way players
-    if detected_type == "two-way" and not player_type:
-        return (
-            jsonify(
-                {
-                    "error": "Two-way player detected",
-                    "player_type": "two-way",
-                    "options": [
-                        {
-                            "type": "pitcher",
-                            "label": f"{first} {last} (Pitching Stats)",
-                        },
-                        {"type": "hitter", "label": f"{first} {last} (Hitting Stats)"},
-                    ],
-                    "message": f"{first} {last} is a known two-way player. Please select which stats to display:",
-                }
-            ),
-            423,
-        )
+    if entry is None:
+        return jsonify({"error": "Player not found"}), 404
 
-    # Continue with existing logic using specified or detected type
-    final_type = player_type if player_type in ["pitcher", "hitter"] else detected_type
-    if final_type == "two-way":
-        final_type = "hitter"  # Default fallback
-    
-    # Get photo URL
+    playerid, first, last = entry.playerid, entry.namefirst, entry.namelast
     photo_url = get_photo_url_for_player(playerid, None)
 
-    if final_type == "pitcher":
+    if player_type not in ("pitcher", "hitter", "both"):
+        player_type = detect_two_way_player_simple(playerid, None)
+
+    if player_type == "pitcher":
         return handle_pitcher_stats(playerid, None, mode, photo_url, first, last)
-    else:
+    if player_type == "hitter":
         return handle_hitter_stats(playerid, mode, photo_url, first, last)
 
+    # Two-way: fetch both stat lines and WAR concurrently, then build each
+    # payload from the shared awards (from the awards index) and WAR
+    hitter_rows = _player_fetch_pool.submit(fetch_records, sql("hitter_stats"), {"playerid": playerid})
+    pitcher_rows = _player_fetch_pool.submit(fetch_records, sql("pitcher_stats"), {"playerid": playerid})
+    war_by_year = _player_fetch_pool.submit(get_season_war_history, playerid)
+
+    try:
+        awards_data, war = get_player_awards(playerid), war_by_year.result()
+        hitting, hitting_status = hitter_stats_payload(
+            playerid, mode, photo_url, hitter_rows.result(), awards_data, war
+        )
+        pitching, pitching_status = pitcher_stats_payload(
+            playerid, mode, photo_url, pitcher_rows.result(), awards_data, war
+        )
+    except Exception as e:
+        print(f"/player error for {playerid}: {e}")
+        return jsonify({"error": "Failed to load player stats"}), 500
+
+    if hitting_status == 400:  # a bad option (e.g. neutralize) fails both lines the same way
+        return jsonify(hitting), 400
+    if hitting_status != 200 and pitching_status != 200:
+        return jsonify({"error": "No stats found"}), 404
+
+    for payload in (hitting, pitching):
+        payload.pop("awards", None)
+        payload.pop("photo_url", None)
+
+    return jsonify({
+        "playerid": playerid,
+        "name": f"{first} {last}",
+        "mode": mode,
+        "player_type": "two-way",
+        "photo_url": photo_url,
+        "awards": awards_data,
+        "hitting": hitting if hitting_status == 200 else None,
+        "pitching": pitching if pitching_status == 200 else None,
+    })
+
 @app.route("/popular-players")
 def popular_players():
     fallback_players = [
@@ -888,178 +1868,505 @@ def popular_players():
     ]
     return jsonify(fallback_players)
 
-def handle_pitcher_stats(playerid, conn, mode, photo_url, first, last):
-    from sqlalchemy import text
-    
-    stats_query = text("""
-    SELECT yearid, teamid, w, l, g, gs, cg, sho, sv, ipouts, h, er, hr, bb, so, era
-    FROM lahman_pitching WHERE playerid = :playerid
-    ORDER BY yearid DESC
-    """)
-    
-    df_lahman = pd.read_sql_query(stats_query, db_engine, params={"playerid": playerid})
-    awards_data = get_player_awards(playerid, None)
-    
-    if mode == "career":
-        if df_lahman.empty:
-            return jsonify({"error": "No pitching stats found"}), 404
+# ─── AWARDS INDEX ───────────────────────────────────────────────────────────
+# Every award, All-Star selection and World Series ring is loaded once and
+# indexed two ways: by player, as the finished award block the player
+# endpoints return, and by award, as the winners behind /awards/<id> and the
+# counts behind /awards/leaders. All-Star selections are indexed as "ASG" and
+# rings as "WSRING", next to the lahman_awardsplayers ids (which include "WS").
 
-        totals = df_lahman.agg({
-            "w": "sum", "l": "sum", "g": "sum", "gs": "sum", "cg": "sum", 
-            "sho": "sum", "sv": "sum", "ipouts": "sum", "h": "sum", 
-            "er": "sum", "hr": "sum", "bb": "sum", "so": "sum",
-        }).to_dict()
+ALLSTAR_AWARD_ID = "ASG"
+WS_AWARD_ID = "WS"  # lahman_awardsplayers' World Series Champion rows
+WS_RING_AWARD_ID = "WSRING"
+MAX_AWARD_LEADERS = 500
 
-        innings_pitched = totals["ipouts"] / 3.0 if totals["ipouts"] > 0 else 0
-        era = (totals["er"] * 9) / innings_pitched if innings_pitched > 0 else 0
-        whip = (totals["h"] + totals["bb"]) / innings_pitched if innings_pitched > 0 else 0
-        career_war = get_career_war(playerid)
 
-        result = {
-            "war": round(career_war, 1),
-            "wins": int(totals["w"]),
-            "losses": int(totals["l"]),
-            "games": int(totals["g"]),
-            "games_started": int(totals["gs"]),
-            "complete_games": int(totals["cg"]),
-            "shutouts": int(totals["sho"]),
-            "saves": int(totals["sv"]),
-            "innings_pitched": round(innings_pitched, 1),
-            "hits_allowed": int(totals["h"]),
-            "earned_runs": int(totals["er"]),
-            "home_runs_allowed": int(totals["hr"]),
-            "walks": int(totals["bb"]),
-            "strikeouts": int(totals["so"]),
-            "era": round(era, 2),
-            "whip": round(whip, 2),
-        }
+class AwardWinner(NamedTuple):
+    playerid: str
+    year: int
+    league: Optional[str]
+    team: Optional[str]
+    position: Optional[str]   # most games in the field that season
+    tie: bool
+    notes: Optional[str]
 
-        return jsonify({
-            "mode": "career",
-            "player_type": "pitcher", 
-            "totals": result,
-            "photo_url": photo_url,
-            "awards": awards_data,
-        })
 
-    elif mode == "season":
-        if df_lahman.empty:
-            return jsonify({"error": "No pitching stats found"}), 404
+class AwardLeader(NamedTuple):
+    rank: int
+    playerid: str
+    count: int
+    years: tuple
 
-        df_war_history = get_season_war_history(playerid)
 
-        df = df_lahman.copy()
-        df["innings_pitched"] = df["ipouts"] / 3.0
-        df["era_calc"] = df.apply(
-            lambda row: (row["er"] * 9) / (row["ipouts"] / 3.0) if row["ipouts"] > 0 else 0,
-            axis=1,
-        )
-        df["whip"] = df.apply(
-            lambda row: (row["h"] + row["bb"]) / (row["ipouts"] / 3.0) if row["ipouts"] > 0 else 0,
-            axis=1,
-        )
-        df["era_final"] = df.apply(
-            lambda row: row["era"] if row["era"] > 0 else row["era_calc"], axis=1
-        )
+class AwardsIndex(NamedTuple):
+    by_player: dict   # playerid -> award block (the get_player_awards shape)
+    by_award: dict    # award id -> AwardWinner tuples, newest first
+    leaders: dict     # award id -> AwardLeader tuples, most wins first
+    aliases: dict     # lowercased award id or display name -> award id
 
-        if not df_war_history.empty:
-            df = df.merge(df_war_history, on="yearid", how="left")
-            df["war"] = df["war"].fillna(0)
-        else:
-            df["war"] = 0
-
-        df_result = df[[
-            "yearid", "teamid", "w", "l", "g", "gs", "cg", "sho", "sv",
-            "innings_pitched", "h", "er", "hr", "bb", "so", "era_final", "whip", "war",
-        ]].rename(columns={
-            "yearid": "year", "w": "wins", "l": "losses", "g": "games",
-            "gs": "games_started", "cg": "complete_games", "sho": "shutouts",
-            "sv": "saves", "h": "hits_allowed", "er": "earned_runs",
-            "hr": "home_runs_allowed", "bb": "walks", "so": "strikeouts",
-            "era_final": "era",
+
+_awards_index = None
+_awards_index_lock = threading.Lock()
+
+
+def build_awards_index(award_rows, allstar_rows, ring_rows, positions):
+    """
+    Index award rows, All-Star rows and (playerid, year, team, team name)
+    rings, all newest first; positions maps (playerid, year) to a position.
+    """
+    blocks = {}
+
+    def block_of(playerid):
+        if playerid not in blocks:
+            blocks[playerid] = empty_awards_block()
+        return blocks[playerid]
+
+    by_award = {}
+    for row in award_rows:
+        year = int(row["yearid"])
+        tie = bool(row["tie"]) if row["tie"] else False
+        block_of(row["playerid"])["awards"].append({
+            "year": year,
+            "award": format_award_name(row["awardid"]),
+            "award_id": row["awardid"],
+            "league": row["lgid"],
+            "tie": tie,
+            "notes": row["notes"],
         })
+        by_award.setdefault(row["awardid"], []).append(AwardWinner(
+            row["playerid"], year, row["lgid"], None, positions.get((row["playerid"], year)), tie, row["notes"]
+        ))
+
+    allstars = by_award[ALLSTAR_AWARD_ID] = []
+    for row in allstar_rows:
+        year = int(row["yearid"])
+        block_of(row["playerid"])["mlbAllStar"] += 1
+        allstars.append(AwardWinner(row["playerid"], year, None, None, positions.get((row["playerid"], year)), False, None))
+
+    rings = by_award[WS_RING_AWARD_ID] = []
+    for playerid, year, team, team_name in ring_rows:
+        block_of(playerid)["world_series_championships"].append({"year": year, "team": team, "team_name": team_name})
+        rings.append(AwardWinner(playerid, year, None, team, positions.get((playerid, year)), False, None))
+
+    for block in blocks.values():
+        block["summary"] = summarize_awards(block["awards"])
+        block["ws_count"] = len(block["world_series_championships"])
+
+    leaders = {}
+    for award_id, winners in by_award.items():
+        years_by_player = {}
+        for winner in winners:
+            years_by_player.setdefault(winner.playerid, []).append(winner.year)
+        ranked = sorted(years_by_player.items(), key=lambda item: (-len(item[1]), item[0]))
+        # Competition ranking: players tied on count share a rank
+        rank_of_count = {}
+        leaders[award_id] = [
+            AwardLeader(rank_of_count.setdefault(len(years), position + 1), playerid, len(years), tuple(years))
+            for position, (playerid, years) in enumerate(ranked)
+        ]
+
+    aliases = {}
+    for award_id in by_award:
+        aliases.setdefault(format_award_name(award_id).lower(), award_id)
+    aliases.update((award_id.lower(), award_id) for award_id in by_award)
+
+    return AwardsIndex(
+        {playerid: MappingProxyType(block) for playerid, block in blocks.items()}, by_award, leaders, aliases
+    )
+
+
+def get_awards_index():
+    """The awards index (built once per process)"""
+    global _awards_index
+    if _awards_index is None:
+        with _awards_index_lock:
+            if _awards_index is None:
+                with db_engine.connect() as conn:
+                    award_rows = fetch_records(sql("all_player_awards"), None, conn)
+                    allstar_rows = fetch_records(sql("all_allstar_games"), None, conn)
+                    positions = {}
+                    for row in fetch_records(sql("season_positions"), None, conn):
+                        positions.setdefault((row["playerid"], int(row["yearid"])), row["pos"])
+                    try:
+                        ring_rows = [
+                            (row["playerid"], int(row["yearid"]), row["teamid"], row["team_name"] or row["teamid"])
+                            for row in fetch_records(sql("all_ws_championships"), None, conn)
+                        ]
+                    except Exception as e:
+                        # Without lahman_seriespost, rings come from WS rows in the awards table
+                        print(f"WS rings from awards table: {e}")
+                        ring_rows = [
+                            (row["playerid"], int(row["yearid"]), "Unknown", row["notes"] or "World Series Champion")
+                            for row in award_rows if row["awardid"] == WS_AWARD_ID
+                        ]
+                _awards_index = build_awards_index(award_rows, allstar_rows, ring_rows, positions)
+                print(f"🏆 Awards index built: {len(_awards_index.by_player)} players, {len(_awards_index.by_award)} awards")
+    return _awards_index
+
+
+def _player_name(playerid):
+    entry = get_player_entry(playerid)
+    return f"{entry.namefirst} {entry.namelast}" if entry else playerid
+
+
+def unknown_award_response(award, index):
+    return jsonify({"error": f"Unknown award: {award}", "awards": sorted(index.by_award)}), 404
+
+
+@app.route("/awards/leaders")
+def get_award_leaders():
+    """Players with the most wins of one award (award=GG, MVP, ASG for All-Star games, WSRING for rings)"""
+    try:
+        award = request.args.get("award", "").strip()
+        if not award:
+            return jsonify({"error": "Missing award, e.g. award=GG"}), 400
+        index = get_awards_index()
+        award_id = index.aliases.get(award.lower())
+        if award_id is None:
+            return unknown_award_response(award, index)
+
+        limit = request.args.get("limit", "25")
+        limit = min(int(limit), MAX_AWARD_LEADERS) if limit.isdigit() else 25
+        leaders = index.leaders[award_id][:limit]
 
         return jsonify({
-            "mode": "season",
-            "player_type": "pitcher",
-            "stats": df_result.to_dict(orient="records"),
-            "photo_url": photo_url,
-            "awards": awards_data,
+            "award": award_id,
+            "display_name": format_award_name(award_id),
+            "count": len(leaders),
+            "leaders": format_stat_table([
+                {
+                    "rank": leader.rank,
+                    "playerid": leader.playerid,
+                    "name": _player_name(leader.playerid),
+                    "count": leader.count,
+                    "years": list(leader.years),
+                }
+                for leader in leaders
+            ]),
         })
 
-    # Return error for live and combined modes
-    elif mode in ["live", "combined"]:
-        return jsonify({"error": f"{mode.title()} stats temporarily disabled"}), 503
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
 
-    else:
-        return jsonify({"error": "Invalid mode"}), 400
 
-# Lightweight cache for league averages by year (~4KB for all of baseball history)
-_league_avg_cache = {}
+@app.route("/awards/<award>")
+def get_award_winners(award):
+    """Every winner of an award, newest first, filtered by league, position and years"""
+    try:
+        index = get_awards_index()
+        award_id = index.aliases.get(award.strip().lower())
+        if award_id is None:
+            return unknown_award_response(award, index)
+
+        winners = index.by_award[award_id]
+        since, until = request.args.get("since", ""), request.args.get("until", "")
+        if since.isdigit():
+            winners = [winner for winner in winners if winner.year >= int(since)]
+        if until.isdigit():
+            winners = [winner for winner in winners if winner.year <= int(until)]
+        league = request.args.get("league", "").upper()
+        if league:
+            winners = [winner for winner in winners if winner.league == league]
+        position = request.args.get("position", "").upper()
+        if position:
+            winners = [winner for winner in winners if winner.position == position]
+
+        by_position = {}
+        for winner in winners:
+            if winner.position:
+                by_position[winner.position] = by_position.get(winner.position, 0) + 1
+
+        if until.isdigit():
+            note_requested_season(until)
 
-def get_league_averages(conn=None, year=None):
-    """Get league average OBP and SLG for a given year (cached)"""
-    from sqlalchemy import text
-    
-    # Convert numpy types to plain Python int
-    year = int(year)
-    
-    # Return cached value if available
-    if year in _league_avg_cache:
-        return _league_avg_cache[year]
-    
+        return jsonify({
+            "award": award_id,
+            "display_name": format_award_name(award_id),
+            "count": len(winners),
+            "by_position": dict(sorted(by_position.items(), key=lambda item: -item[1])),
+            "winners": format_stat_table([
+                {
+                    "year": winner.year,
+                    "playerid": winner.playerid,
+                    "name": _player_name(winner.playerid),
+                    "league": winner.league,
+                    "team": winner.team,
+                    "position": winner.position,
+                    "tie": winner.tie,
+                    "notes": winner.notes,
+                }
+                for winner in winners
+            ]),
+        })
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+# ─── RECORD STAT PIPELINE ───────────────────────────────────────────────────
+# Player and team requests only touch 5–25 rows, so the per-request stat lines
+# are computed from plain DB-API rows (dicts) instead of DataFrames. Pandas is
+# kept for bulk/analytics paths where the construction overhead pays for itself.
+
+def fetch_records(query, params=None, conn=None):
+    """Execute a query and return its rows as a list of plain dicts"""
     owns_conn = conn is None
     if owns_conn:
         conn = db_engine.connect()
-    
+
     try:
-        query = text("""
-        SELECT 
-            SUM(h + bb + hbp) * 1.0 / NULLIF(SUM(ab + bb + hbp + sf), 0) as lg_obp,
-            (SUM(h - "2b" - "3b" - hr) + 2 * SUM("2b") + 3 * SUM("3b") + 4 * SUM(hr)) * 1.0 / NULLIF(SUM(ab), 0) as lg_slg
-        FROM lahman_batting
-        WHERE yearid = :year
-        """)
-        
-        result = conn.execute(query, {"year": year}).fetchone()
-        
-        if result and result[0] and result[1]:
-            avg = {"obp": float(result[0]), "slg": float(result[1])}
-        else:
-            avg = {"obp": 0.320, "slg": 0.400}  # Fallback averages
-        
-        _league_avg_cache[year] = avg
-        return avg
+        return [dict(row) for row in conn.execute(query, params or {}).mappings()]
     finally:
         if owns_conn:
             conn.close()
 
 
-def _batch_load_league_averages(years, conn=None):
-    """Fetch league averages for multiple years in a single query and cache them."""
-    from sqlalchemy import text
-    
-    # Filter to only years not already cached
-    missing = [int(y) for y in years if int(y) not in _league_avg_cache]
-    if not missing:
-        return
-    
-    owns_conn = conn is None
-    if owns_conn:
-        conn = db_engine.connect()
-    
+def _num(value):
+    """Coerce a DB value (None, Decimal, int, float) to a plain number, NULL -> 0"""
+    if value is None:
+        return 0
+    if isinstance(value, (int, float)):
+        return value
     try:
-        placeholders = ",".join([f":y{i}" for i in range(len(missing))])
-        query = text(f"""
-        SELECT yearid,
-            SUM(h + bb + hbp) * 1.0 / NULLIF(SUM(ab + bb + hbp + sf), 0) as lg_obp,
-            (SUM(h - "2b" - "3b" - hr) + 2 * SUM("2b") + 3 * SUM("3b") + 4 * SUM(hr)) * 1.0 / NULLIF(SUM(ab), 0) as lg_slg
-        FROM lahman_batting
-        WHERE yearid IN ({placeholders})
-        GROUP BY yearid
-        """)
-        params = {f"y{i}": y for i, y in enumerate(missing)}
-        rows = conn.execute(query, params).fetchall()
+        num_value = float(value)
+    except (ValueError, TypeError):
+        return 0
+    return int(num_value) if num_value.is_integer() else num_value
+
+
+def _sum_columns(rows, columns):
+    """Sum the given columns over a list of row dicts, treating NULL as 0"""
+    totals = dict.fromkeys(columns, 0)
+    for row in rows:
+        for col in columns:
+            totals[col] += _num(row[col])
+    return totals
+
+
+PITCHER_TOTAL_COLUMNS = ("w", "l", "g", "gs", "cg", "sho", "sv", "ipouts", "h", "er", "hr", "bb", "so")
+
+
+def build_pitcher_career_totals(rows, career_war):
+    """Career pitching line from lahman_pitching rows"""
+    totals = _sum_columns(rows, PITCHER_TOTAL_COLUMNS)
+
+    innings_pitched = totals["ipouts"] / 3.0 if totals["ipouts"] > 0 else 0
+    era = (totals["er"] * 9) / innings_pitched if innings_pitched > 0 else 0
+    whip = (totals["h"] + totals["bb"]) / innings_pitched if innings_pitched > 0 else 0
+
+    return {
+        "war": round(career_war, PER_GAME_DECIMALS),
+        "wins": int(totals["w"]),
+        "losses": int(totals["l"]),
+        "games": int(totals["g"]),
+        "games_started": int(totals["gs"]),
+        "complete_games": int(totals["cg"]),
+        "shutouts": int(totals["sho"]),
+        "saves": int(totals["sv"]),
+        "innings_pitched": round(innings_pitched, PER_GAME_DECIMALS),
+        "hits_allowed": int(totals["h"]),
+        "earned_runs": int(totals["er"]),
+        "home_runs_allowed": int(totals["hr"]),
+        "walks": int(totals["bb"]),
+        "strikeouts": int(totals["so"]),
+        "era": round(era, ERA_DECIMALS),
+        "whip": round(whip, ERA_DECIMALS),
+    }
+
+
+def build_pitcher_season_records(rows, war_by_year):
+    """Season-by-season pitching lines from lahman_pitching rows"""
+    records = []
+    for row in rows:
+        ipouts = _num(row["ipouts"])
+        h, er, bb = _num(row["h"]), _num(row["er"]), _num(row["bb"])
+        innings_pitched = ipouts / 3.0
+        era_calc = (er * 9) / innings_pitched if ipouts > 0 else 0
+        whip = (h + bb) / innings_pitched if ipouts > 0 else 0
+        era = _num(row["era"])
+
+        record = {
+            "year": row["yearid"],
+            "teamid": row["teamid"],
+            "wins": _num(row["w"]),
+            "losses": _num(row["l"]),
+            "games": _num(row["g"]),
+            "games_started": _num(row["gs"]),
+            "complete_games": _num(row["cg"]),
+            "shutouts": _num(row["sho"]),
+            "saves": _num(row["sv"]),
+            "innings_pitched": round(innings_pitched, PER_GAME_DECIMALS),
+            "hits_allowed": h,
+            "earned_runs": er,
+            "home_runs_allowed": _num(row["hr"]),
+            "walks": bb,
+            "strikeouts": _num(row["so"]),
+            "era": round(era if era > 0 else era_calc, ERA_DECIMALS),
+            "whip": round(whip, ERA_DECIMALS),
+        }
+        # Same semantics as a left merge: one line per WAR row, 0 when missing
+        for war in war_by_year.get(int(row["yearid"]), [0]):
+            records.append(dict(record, war=round(war, PER_GAME_DECIMALS)))
+
+    return records
+
+
+def _career_war_from(playerid, war_by_year):
+    """Career WAR from prefetched season WAR when available, else from the DB"""
+    if war_by_year is None:
+        return get_career_war(playerid)
+    return float(sum(sum(wars) for wars in war_by_year.values()))
+
+
+def pitcher_stats_payload(playerid, mode, photo_url, rows, awards_data, war_by_year=None):
+    """Pitcher response body and HTTP status from already-fetched lahman_pitching rows"""
+    try:
+        neutral_year = requested_neutral_year() if mode in ("career", "season") else None
+        age_view = requested_age_view(playerid) if mode in ("career", "season") else None
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    if mode == "career":
+        if not rows:
+            return {"error": "No pitching stats found"}, 404
+
+        stat_rows = rows if neutral_year is None else neutralize_rows(rows, "pitcher", neutral_year)
+        if age_view is None:
+            result = build_pitcher_career_totals(stat_rows, _career_war_from(playerid, war_by_year))
+        else:
+            if war_by_year is None:
+                war_by_year = get_season_war_history(playerid)
+            ages, lines = pitcher_lines_by_age(stat_rows, age_view.birthyear, war_by_year)
+            result = lines[-1] if age_view.through_age is None else line_through_age(ages, lines, age_view.through_age)
+            if result is None:
+                return {"error": f"No pitching stats through age {age_view.through_age}"}, 404
+
+        payload = {
+            "mode": "career",
+            "player_type": "pitcher", 
+            "totals": result,
+            "photo_url": photo_url,
+            "awards": awards_data,
+        }
+        if neutral_year is not None:
+            payload["neutralized_to"] = neutral_year
+        return (payload if age_view is None else apply_age_view(payload, age_view, ages, lines)), 200
+
+    elif mode == "season":
+        if not rows:
+            return {"error": "No pitching stats found"}, 404
+
+        if war_by_year is None:
+            war_by_year = get_season_war_history(playerid)
+
+        stat_rows = rows if neutral_year is None else neutralize_rows(rows, "pitcher", neutral_year)
+        records = add_season_percentiles(build_pitcher_season_records(rows, war_by_year), "pitcher", rows)
+        if neutral_year is not None:
+            neutralize_records(records, build_pitcher_season_records(stat_rows, war_by_year), "pitcher")
+        payload = {
+            "mode": "season",
+            "player_type": "pitcher",
+            "stats": format_stat_table(records),
+            "photo_url": photo_url,
+            "awards": awards_data,
+        }
+        if neutral_year is not None:
+            payload["neutralized_to"] = neutral_year
+
+        if age_view is not None:
+            ages, lines = pitcher_lines_by_age(stat_rows, age_view.birthyear, war_by_year)
+            apply_age_view(payload, age_view, ages, lines, records)
+        return payload, 200
+
+    elif mode in LIVE_MODES:
+        live_rows = live_payload_rows(rows, get_live_rows(playerid, "pitching"), mode)
+        if not live_rows:
+            return {"error": f"No {mode} pitching stats found"}, 404
+
+        if mode == "live":
+            return {
+                "mode": "live",
+                "player_type": "pitcher",
+                "season": live_season(),
+                "stats": format_stat_table(build_pitcher_season_records(live_rows, {})),
+                "photo_url": photo_url,
+                "awards": awards_data,
+            }, 200
+
+        # Live-season WAR isn't published until the season ends
+        result = build_pitcher_career_totals(live_rows, _career_war_from(playerid, war_by_year))
+        return {
+            "mode": "combined",
+            "player_type": "pitcher",
+            "totals": result,
+            "live_season": live_season(),
+            "photo_url": photo_url,
+            "awards": awards_data,
+        }, 200
+
+    else:
+        return {"error": "Invalid mode"}, 400
+
+
+def handle_pitcher_stats(playerid, conn, mode, photo_url, first, last):
+    snapshot = serve_snapshot(snapshot_key("player", playerid, "pitcher", mode))
+    if snapshot is not None:
+        return snapshot
+
+    rows = fetch_records(sql("pitcher_stats"), {"playerid": playerid})
+    awards_data = get_player_awards(playerid, None)
+    
+    payload, status = pitcher_stats_payload(playerid, mode, photo_url, rows, awards_data)
+    return jsonify(payload), status
+
+# Lightweight cache for league averages by year (~4KB for all of baseball history)
+_league_avg_cache = {}
+
+def get_league_averages(conn=None, year=None):
+    """Get league average OBP and SLG for a given year (cached)"""
+    # Convert numpy types to plain Python int
+    year = int(year)
+    
+    # Return cached value if available
+    if year in _league_avg_cache:
+        return _league_avg_cache[year]
+    
+    owns_conn = conn is None
+    if owns_conn:
+        conn = db_engine.connect()
+    
+    try:
+        result = conn.execute(sql("league_average"), {"year": year}).fetchone()
+        
+        if result and result[0] and result[1]:
+            avg = {"obp": float(result[0]), "slg": float(result[1])}
+        else:
+            avg = {"obp": 0.320, "slg": 0.400}  # Fallback averages
+        
+        _league_avg_cache[year] = avg
+        return avg
+    finally:
+        if owns_conn:
+            conn.close()
+
+
+def _batch_load_league_averages(years, conn=None):
+    """Fetch league averages for multiple years in a single query and cache them."""
+    # Filter to only years not already cached
+    missing = [int(y) for y in years if int(y) not in _league_avg_cache]
+    if not missing:
+        return
+    
+    owns_conn = conn is None
+    if owns_conn:
+        conn = db_engine.connect()
+    
+    try:
+        rows = conn.execute(sql("league_averages"), {"years": missing}).fetchall()
         
         for row in rows:
             yr, obp_val, slg_val = row
@@ -1089,38 +2396,30 @@ def calculate_ops_plus(obp, slg, year):
     return round(ops_plus)
 
 
-def calculate_career_ops_plus(playerid):
+def calculate_career_ops_plus(playerid, rows=None):
     """Calculate career OPS+ weighted by plate appearances"""
-    from sqlalchemy import text
-    
-    # Get all seasons with OBP/SLG
-    query = text("""
-    SELECT yearid, ab, h, bb, hbp, sf, "2b", "3b", hr
-    FROM lahman_batting 
-    WHERE playerid = :playerid
-    ORDER BY yearid
-    """)
+    if rows is None:
+        # Get all seasons with OBP/SLG
+        rows = fetch_records(sql("batting_seasons"), {"playerid": playerid})
     
-    df = pd.read_sql_query(query, db_engine, params={"playerid": playerid})
-    
-    if df.empty:
+    if not rows:
         return 100
     
     # Batch-load all league averages this player needs in one query
-    _batch_load_league_averages(df['yearid'].unique())
+    _batch_load_league_averages({row["yearid"] for row in rows})
     
     total_weighted_ops_plus = 0
     total_pa = 0
     
-    for _, row in df.iterrows():
-        ab = row['ab'] or 0
-        h = row['h'] or 0
-        bb = row['bb'] or 0
-        hbp = row['hbp'] or 0
-        sf = row['sf'] or 0
-        doubles = row['2b'] or 0
-        triples = row['3b'] or 0
-        hr = row['hr'] or 0
+    for row in rows:
+        ab = _num(row['ab'])
+        h = _num(row['h'])
+        bb = _num(row['bb'])
+        hbp = _num(row['hbp'])
+        sf = _num(row['sf'])
+        doubles = _num(row['2b'])
+        triples = _num(row['3b'])
+        hr = _num(row['hr'])
         
         pa = ab + bb + hbp + sf
         
@@ -1147,445 +2446,1347 @@ def calculate_career_ops_plus(playerid):
     
     return round(total_weighted_ops_plus / total_pa)
 
-def handle_hitter_stats(playerid, mode, photo_url, first, last):
-    from sqlalchemy import text
-    
-    stats_query = text("""
-    SELECT yearid, teamid, g, ab, h, hr, rbi, sb, bb, hbp, sf, sh, "2b", "3b"
-    FROM lahman_batting WHERE playerid = :playerid
-    ORDER BY yearid DESC
-    """)
-    
-    df_lahman = pd.read_sql_query(stats_query, db_engine, params={"playerid": playerid})
-    awards_data = get_player_awards(playerid, None)
-    
-    if mode == "career":
-        if df_lahman.empty:
-            return jsonify({"error": "No batting stats found"}), 404
-
-        totals = df_lahman.agg({
-            "g": "sum", "ab": "sum", "h": "sum", "hr": "sum", "rbi": "sum",
-            "sb": "sum", "bb": "sum", "hbp": "sum", "sf": "sum", "sh": "sum",
-            "2b": "sum", "3b": "sum",
-        }).to_dict()
-
-        singles = totals["h"] - totals["2b"] - totals["3b"] - totals["hr"]
-        total_bases = singles + 2 * totals["2b"] + 3 * totals["3b"] + 4 * totals["hr"]
-        ba = totals["h"] / totals["ab"] if totals["ab"] > 0 else 0
-        obp_denominator = totals["ab"] + totals["bb"] + totals["hbp"] + totals["sf"]
-        obp = (totals["h"] + totals["bb"] + totals["hbp"]) / obp_denominator if obp_denominator > 0 else 0
-        slg = total_bases / totals["ab"] if totals["ab"] > 0 else 0
-        ops = obp + slg
-        plate_appearances = totals["ab"] + totals["bb"] + totals["hbp"] + totals["sf"] + totals["sh"]
-        career_war = get_career_war(playerid)
-        
-        # Calculate career OPS+
-        career_ops_plus = calculate_career_ops_plus(playerid)
 
-        result = {
-            "war": round(career_war, 1),
-            "games": int(totals["g"]),
-            "plate_appearances": int(plate_appearances),
-            "hits": int(totals["h"]),
-            "home_runs": int(totals["hr"]),
-            "rbi": int(totals["rbi"]),
-            "stolen_bases": int(totals["sb"]),
-            "batting_average": round(ba, 3),
-            "on_base_percentage": round(obp, 3),
-            "slugging_percentage": round(slg, 3),
-            "ops": round(ops, 3),
-            "ops_plus": career_ops_plus,
+HITTER_TOTAL_COLUMNS = ("g", "ab", "h", "hr", "rbi", "sb", "bb", "hbp", "sf", "sh", "2b", "3b")
+
+
+def build_hitter_career_totals(rows, career_war, career_ops_plus):
+    """Career batting line from lahman_batting rows"""
+    totals = _sum_columns(rows, HITTER_TOTAL_COLUMNS)
+
+    singles = totals["h"] - totals["2b"] - totals["3b"] - totals["hr"]
+    total_bases = singles + 2 * totals["2b"] + 3 * totals["3b"] + 4 * totals["hr"]
+    ba = totals["h"] / totals["ab"] if totals["ab"] > 0 else 0
+    obp_denominator = totals["ab"] + totals["bb"] + totals["hbp"] + totals["sf"]
+    obp = (totals["h"] + totals["bb"] + totals["hbp"]) / obp_denominator if obp_denominator > 0 else 0
+    slg = total_bases / totals["ab"] if totals["ab"] > 0 else 0
+    ops = obp + slg
+    plate_appearances = totals["ab"] + totals["bb"] + totals["hbp"] + totals["sf"] + totals["sh"]
+
+    return {
+        "war": round(career_war, PER_GAME_DECIMALS),
+        "games": int(totals["g"]),
+        "plate_appearances": int(plate_appearances),
+        "hits": int(totals["h"]),
+        "home_runs": int(totals["hr"]),
+        "rbi": int(totals["rbi"]),
+        "stolen_bases": int(totals["sb"]),
+        "batting_average": round(ba, RATE_DECIMALS),
+        "on_base_percentage": round(obp, RATE_DECIMALS),
+        "slugging_percentage": round(slg, RATE_DECIMALS),
+        "ops": round(ops, RATE_DECIMALS),
+        "ops_plus": career_ops_plus,
+    }
+
+
+def build_hitter_season_records(rows, war_by_year):
+    """Season-by-season batting lines (with OPS+) from lahman_batting rows"""
+    # One query for every league average these seasons need
+    _batch_load_league_averages({row["yearid"] for row in rows})
+
+    records = []
+    for row in rows:
+        ab, h, bb = _num(row["ab"]), _num(row["h"]), _num(row["bb"])
+        hbp, sf, sh = _num(row["hbp"]), _num(row["sf"]), _num(row["sh"])
+        doubles, triples, hr = _num(row["2b"]), _num(row["3b"]), _num(row["hr"])
+
+        singles = h - doubles - triples - hr
+        total_bases = singles + 2 * doubles + 3 * triples + 4 * hr
+        obp_denominator = ab + bb + hbp + sf
+        ba = h / ab if ab > 0 else 0
+        obp = (h + bb + hbp) / obp_denominator if obp_denominator > 0 else 0
+        slg = total_bases / ab if ab > 0 else 0
+
+        record = {
+            "year": row["yearid"],
+            "teamid": row["teamid"],
+            "games": _num(row["g"]),
+            "pa": ab + bb + hbp + sf + sh,
+            "at_bats": ab,
+            "hits": h,
+            "home_runs": hr,
+            "rbi": _num(row["rbi"]),
+            "stolen_bases": _num(row["sb"]),
+            "walks": bb,
+            "hit_by_pitch": hbp,
+            "sacrifice_flies": sf,
+            "doubles": doubles,
+            "triples": triples,
+            "ba": round(ba, RATE_DECIMALS),
+            "obp": round(obp, RATE_DECIMALS),
+            "slg": round(slg, RATE_DECIMALS),
+            "ops": round(obp + slg, RATE_DECIMALS),
+            "ops_plus": calculate_ops_plus(obp, slg, row["yearid"]),
         }
+        # Same semantics as a left merge: one line per WAR row, 0 when missing
+        for war in war_by_year.get(int(row["yearid"]), [0]):
+            records.append(dict(record, war=round(war, PER_GAME_DECIMALS)))
 
-        return jsonify({
+    return records
+
+
+def hitter_stats_payload(playerid, mode, photo_url, rows, awards_data, war_by_year=None):
+    """Hitter response body and HTTP status from already-fetched lahman_batting rows"""
+    try:
+        neutral_year = requested_neutral_year() if mode in ("career", "season") else None
+        age_view = requested_age_view(playerid) if mode in ("career", "season") else None
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    if mode == "career":
+        if not rows:
+            return {"error": "No batting stats found"}, 404
+
+        stat_rows = rows if neutral_year is None else neutralize_rows(rows, "hitter", neutral_year)
+        if age_view is None:
+            # The batting rows already hold everything career OPS+ needs
+            result = build_hitter_career_totals(
+                stat_rows, _career_war_from(playerid, war_by_year), calculate_career_ops_plus(playerid, rows)
+            )
+        else:
+            if war_by_year is None:
+                war_by_year = get_season_war_history(playerid)
+            ages, lines = hitter_lines_by_age(rows, age_view.birthyear, war_by_year, stat_rows)
+            result = lines[-1] if age_view.through_age is None else line_through_age(ages, lines, age_view.through_age)
+            if result is None:
+                return {"error": f"No batting stats through age {age_view.through_age}"}, 404
+
+        payload = {
             "mode": "career",
             "player_type": "hitter",
             "totals": result,
             "photo_url": photo_url,
             "awards": awards_data,
-        })
+        }
+        if neutral_year is not None:
+            payload["neutralized_to"] = neutral_year
+        return (payload if age_view is None else apply_age_view(payload, age_view, ages, lines)), 200
 
     elif mode == "season":
-        if df_lahman.empty:
-            return jsonify({"error": "No batting stats found"}), 404
-
-        df_war_history = get_season_war_history(playerid)
-
-        df = df_lahman.copy()
-        df["singles"] = df["h"] - df["2b"] - df["3b"] - df["hr"]
-        df["total_bases"] = df["singles"] + 2 * df["2b"] + 3 * df["3b"] + 4 * df["hr"]
-        df["ba"] = df.apply(lambda row: row["h"] / row["ab"] if row["ab"] > 0 else 0, axis=1)
-        df["obp"] = df.apply(lambda row: (
-            (row["h"] + row["bb"] + row["hbp"]) / 
-            (row["ab"] + row["bb"] + row["hbp"] + row["sf"])
-            if (row["ab"] + row["bb"] + row["hbp"] + row["sf"]) > 0 else 0
-        ), axis=1)
-        df["slg"] = df.apply(lambda row: row["total_bases"] / row["ab"] if row["ab"] > 0 else 0, axis=1)
-        df["ops"] = df["obp"] + df["slg"]
-        df["pa"] = df["ab"] + df["bb"] + df["hbp"] + df["sf"] + df["sh"]
-        
-        # Calculate OPS+ for each season
-        df["ops_plus"] = df.apply(
-            lambda row: calculate_ops_plus(row["obp"], row["slg"], row["yearid"]),
-            axis=1
-        )
+        if not rows:
+            return {"error": "No batting stats found"}, 404
 
-        if not df_war_history.empty:
-            df = df.merge(df_war_history, on="yearid", how="left")
-            df["war"] = df["war"].fillna(0)
-        else:
-            df["war"] = 0
-
-        df_result = df[[
-            "yearid", "teamid", "g", "pa", "ab", "h", "hr", "rbi", "sb", "bb",
-            "hbp", "sf", "2b", "3b", "ba", "obp", "slg", "ops", "ops_plus", "war",
-        ]].rename(columns={
-            "yearid": "year", "g": "games", "ab": "at_bats", "h": "hits",
-            "hr": "home_runs", "rbi": "rbi", "sb": "stolen_bases", "bb": "walks",
-            "hbp": "hit_by_pitch", "sf": "sacrifice_flies", "2b": "doubles", "3b": "triples",
-        })
+        if war_by_year is None:
+            war_by_year = get_season_war_history(playerid)
 
-        return jsonify({
+        stat_rows = rows if neutral_year is None else neutralize_rows(rows, "hitter", neutral_year)
+        records = add_season_percentiles(build_hitter_season_records(rows, war_by_year), "hitter", rows)
+        if neutral_year is not None:
+            neutralize_records(records, build_hitter_season_records(stat_rows, war_by_year), "hitter")
+        payload = {
             "mode": "season",
             "player_type": "hitter",
-            "stats": df_result.to_dict(orient="records"),
+            "stats": format_stat_table(records),
             "photo_url": photo_url,
             "awards": awards_data,
-        })
+        }
+        if neutral_year is not None:
+            payload["neutralized_to"] = neutral_year
+
+        if age_view is not None:
+            ages, lines = hitter_lines_by_age(rows, age_view.birthyear, war_by_year, stat_rows)
+            apply_age_view(payload, age_view, ages, lines, records)
+        return payload, 200
+
+    elif mode in LIVE_MODES:
+        live_rows = live_payload_rows(rows, get_live_rows(playerid, "batting"), mode)
+        if not live_rows:
+            return {"error": f"No {mode} batting stats found"}, 404
+
+        # No league averages exist for a season in progress, so there is no OPS+ to give
+        if mode == "live":
+            records = build_hitter_season_records(live_rows, {})
+            for record in records:
+                record["ops_plus"] = None
+            return {
+                "mode": "live",
+                "player_type": "hitter",
+                "season": live_season(),
+                "stats": format_stat_table(records),
+                "photo_url": photo_url,
+                "awards": awards_data,
+            }, 200
+
+        # Live-season WAR isn't published until the season ends
+        result = build_hitter_career_totals(live_rows, _career_war_from(playerid, war_by_year), None)
+        return {
+            "mode": "combined",
+            "player_type": "hitter",
+            "totals": result,
+            "live_season": live_season(),
+            "photo_url": photo_url,
+            "awards": awards_data,
+        }, 200
 
     else:
-        return jsonify({"error": "Invalid mode. Use 'career' or 'season'"}), 400
-
+        return {"error": "Invalid mode. Use 'career', 'season', 'live' or 'combined'"}, 400
 
-@app.route("/team")
-def get_team_stats():
-    """Unified endpoint that returns both batting and pitching stats"""
-    try:
-        team = request.args.get("team", "").strip()
-        mode = request.args.get("mode", "season").lower()
 
-        if not team:
-            return jsonify({"error": "Enter team"}), 400
+def handle_hitter_stats(playerid, mode, photo_url, first, last):
+    snapshot = serve_snapshot(snapshot_key("player", playerid, "hitter", mode))
+    if snapshot is not None:
+        return snapshot
 
-        team_id, year = parse_team_input(team)
+    rows = fetch_records(sql("hitter_stats"), {"playerid": playerid})
+    awards_data = get_player_awards(playerid, None)
+    
+    payload, status = hitter_stats_payload(playerid, mode, photo_url, rows, awards_data)
+    return jsonify(payload), status
 
-        # Get combined stats
-        return handle_combined_team_stats(team_id, year, mode)
 
-    except Exception as e:
-        import traceback
+# ─── CURRENT SEASON STORE ───────────────────────────────────────────────────
+# In-season stat lines arrive as NDJSON deltas, either as files dropped into
+# LIVE_STATS_PATH or appended to a single feed file at that path, one object
+# per line:
+#   {"playerid": "ohtansh01", "stat": "batting", "yearid": 2026, "teamid": "LAN", "ab": 4, "h": 2, "hr": 1}
+# Counting columns are added to the player's running season line. Only the
+# bytes appended since the last pass are read, and only the players they
+# touch are rebuilt. Each rebuilt line is published as a fresh tuple with a
+# single dict assignment, so request threads read without any locking. A feed
+# file that shrinks, is replaced or disappears would leave its old deltas
+# counted, so then the whole store is rebuilt from the files as they are now.
 
-        traceback.print_exc()
-        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+LIVE_STATS_PATH = os.environ.get("LIVE_STATS_PATH")
+LIVE_STATS_POLL_SECONDS = int(os.environ.get("LIVE_STATS_POLL_SECONDS", "60"))
+LIVE_MODES = ("live", "combined")
 
+LIVE_COUNT_COLUMNS = {"batting": HITTER_TOTAL_COLUMNS, "pitching": PITCHER_TOTAL_COLUMNS}
 
-def handle_combined_team_stats(team_id, year, mode):
-    """Get both batting and pitching stats in one query - updated for SQLAlchemy"""
-    try:
-        # Use SQLAlchemy engine directly instead of get_db_connection()
-        from sqlalchemy import text
-        
-        # Track the actual year being used
-        actual_year = None
+_live_lines = {}  # (stat, playerid) → tuple of per-team season rows, never mutated once published
+_live_files = {}  # feed file → (inode, bytes already ingested, mtime_ns)
+_live_version = ""  # digest of the ingested feed files, the same in every worker; part of live ETags
+_live_ingest_lock = threading.Lock()  # serializes ingest passes only
 
-        if mode == "season":
-            actual_year = year or 2025
-            query = text("""
-            SELECT yearid, teamid, 
-                   -- Basic team stats
-                   g, w, l, r, ra,
-                   -- We'll calculate playoff stats separately
-                   0 as playoff_apps, 0 as ws_apps, 0 as ws_championships
-            FROM lahman_teams 
-            WHERE teamid = :team_id AND yearid = :year
-            """)
-            df = pd.read_sql_query(query, db_engine, params={"team_id": team_id, "year": actual_year})
 
-        elif mode in ["franchise", "career", "overall"]:
-            # Check for franchise moves
-            franchise_ids = get_franchise_team_ids(team_id)
+def live_season():
+    """The season the live store accumulates"""
+    return int(os.environ.get("LIVE_SEASON") or current_season())
 
-            if len(franchise_ids) > 1:
-                # Multiple team IDs for this franchise
-                placeholders = ",".join([f":team_id_{i}" for i in range(len(franchise_ids))])
-                query_str = f"""
-                SELECT 'FRANCHISE' as teamid, 
-                       COUNT(*) as seasons,
-                       -- Basic aggregates
-                       SUM(g) as g, SUM(w) as w, SUM(l) as l, 
-                       SUM(r) as r, SUM(ra) as ra,
-                       -- We'll calculate playoff stats separately
-                       0 as playoff_apps, 0 as ws_apps, 0 as ws_championships
-                FROM lahman_teams 
-                WHERE teamid IN ({placeholders})
-                """
-                query = text(query_str)
-                params = {f"team_id_{i}": team_id for i, team_id in enumerate(franchise_ids)}
-                df = pd.read_sql_query(query, db_engine, params=params)
-            else:
-                # Single team ID
-                query = text("""
-                SELECT teamid, 
-                       COUNT(*) as seasons,
-                       -- Basic aggregates
-                       SUM(g) as g, SUM(w) as w, SUM(l) as l, 
-                       SUM(r) as r, SUM(ra) as ra,
-                       -- We'll calculate playoff stats separately
-                       0 as playoff_apps, 0 as ws_apps, 0 as ws_championships
-                FROM lahman_teams 
-                WHERE teamid = :team_id
-                GROUP BY teamid
-                """)
-                df = pd.read_sql_query(query, db_engine, params={"team_id": team_id})
 
-        else:
-            # Default to season
-            actual_year = year or 2025
-            query = text("""
-            SELECT yearid, teamid, 
-                   g, w, l, r, ra,
-                   0 as playoff_apps, 0 as ws_apps, 0 as ws_championships
-            FROM lahman_teams 
-            WHERE teamid = :team_id AND yearid = :year
-            """)
-            df = pd.read_sql_query(query, db_engine, params={"team_id": team_id, "year": actual_year})
-
-        if not df.empty:
-            # Add playoff statistics - pass actual_year for season mode
-            df = add_playoff_stats(
-                df, team_id, actual_year if mode == "season" else year, mode
-            )
+def get_live_rows(playerid, stat):
+    """Current-season rows for a player, shaped like the hitter_stats/pitcher_stats rows"""
+    return _live_lines.get((stat, playerid), ())
 
-        if df.empty:
-            if mode in ["franchise", "career", "overall"]:
-                return (
-                    jsonify({"error": f"Team '{team_id}' not found in database"}),
-                    404,
-                )
-            else:
-                return (
-                    jsonify(
-                        {"error": f"Team '{team_id}' not found for year {actual_year}"}
-                    ),
-                    404,
-                )
 
-        # Calculate derived stats
-        df = calculate_simple_team_stats(df)
+def _live_feed_files():
+    if not LIVE_STATS_PATH or not os.path.exists(LIVE_STATS_PATH):
+        return []
+    if os.path.isfile(LIVE_STATS_PATH):
+        return [LIVE_STATS_PATH]
+    return sorted(
+        os.path.join(LIVE_STATS_PATH, name)
+        for name in os.listdir(LIVE_STATS_PATH)
+        if name.endswith((".ndjson", ".jsonl"))
+    )
 
-        # Pass the correct year value based on mode
-        year_to_pass = actual_year if mode == "season" else None
-        return format_combined_team_response(df, mode, team_id, year_to_pass)
 
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
+def _live_feed_rewritten(stats):
+    """Whether a feed file ingested earlier has shrunk, been replaced or been removed"""
+    for path, (inode, offset, _) in _live_files.items():
+        st = stats.get(path)
+        if st is None or st.st_ino != inode or st.st_size < offset:
+            return True
+    return False
 
 
-def get_franchise_team_ids(team_id):
-    """
-    Map current team IDs to all historical team IDs for franchise totals
-    This handles team moves and ID changes
-    """
-    franchise_mapping = {
-        # Modern team ID -> All historical IDs for that franchise
-        # Milwaukee Brewers - Current franchise (1970+)
-        "MIL": ["MIL", "ML4"],  # NL Brewers (1998+) + AL Brewers (1970-1997)
-        # Atlanta Braves - includes Boston Braves and Milwaukee Braves
-        "ATL": ["ATL", "BSN", "ML1"],  # Atlanta + Boston + Milwaukee Braves (1953-1965)
-        # Los Angeles Dodgers - includes all Brooklyn Dodgers
-        "LAN": ["LAN", "BRO", "BR3"],
-        # San Francisco Giants - includes New York Giants
-        "SFN": ["SFN", "NY1"],
-        # Baltimore Orioles - includes St. Louis Browns
-        "BAL": ["BAL", "SLA", "MLA"],
-        # Chicago White Sox
-        "CHA": ["CHA"],
-        # Cleveland Guardians/Indians
-        "CLE": ["CLE"],
-        # Cincinnati Reds
-        "CIN": ["CIN", "CN2"],
-        # Philadelphia Phillies
-        "PHI": ["PHI"],
-        # Oakland Athletics
-        "OAK": [
-            "OAK",
-            "KC1",
-            "PHA",
-        ],
-        # St. Louis Cardinals
-        "SLN": ["SLN", "SL4"],
-        # New York Yankees
-        "NYA": ["NYA"],
-        # New York Mets
-        "NYN": ["NYN"],
-        # Kansas City Royals
-        "KCR": ["KCR"],
-        # Minnesota Twins - includes original Washington Senators (1901-1960)
-        "MIN": ["MIN", "WS1"],
-        # Texas Rangers - includes expansion Washington Senators (1961-1971)
-        "TEX": ["TEX", "WS2"],
-        # Washington Nationals - includes Montreal Expos
-        "WAS": ["WAS", "MON"],
-        # Los Angeles Angels - various eras
-        "LAA": ["LAA", "ANA", "CAL"],
-        # Tampa Bay Rays
-        "TBA": ["TBA", "TBD"],
-        # Miami Marlins
-        "MIA": ["MIA", "FLO", "FLA"],
-        # Seattle Mariners
-        "SEA": ["SEA"],
-        # Pittsburgh Pirates
-        "PIT": ["PIT", "PT1"],
-        # Single-location franchises (no historical moves)
-        "ARI": ["ARI"],
-        "BOS": ["BOS"],
-        "COL": ["COL"],
-        "DET": ["DET"],
-        "HOU": ["HOU"],
-        "SDN": ["SDN"],
-        "TOR": ["TOR"],
-        "CHC": ["CHN"],
-    }
+def _read_new_deltas(path, st):
+    """Complete lines appended to path since the last pass, up to its size when stat'ed"""
+    offset = _live_files[path][1] if path in _live_files else 0
+    with open(path, "rb") as f:
+        f.seek(offset)
+        chunk = f.read(max(st.st_size - offset, 0))
+    end = chunk.rfind(b"\n") + 1  # leave a partially written last line for the next pass
+    _live_files[path] = (st.st_ino, offset + end, st.st_mtime_ns)
+    return chunk[:end].splitlines()
 
-    return franchise_mapping.get(team_id, [team_id])
 
+def _live_feed_digest():
+    """Version of the live store derived from what was ingested, not from this process's history"""
+    key = "|".join(
+        f"{path}:{offset}:{mtime_ns}" for path, (_, offset, mtime_ns) in sorted(_live_files.items())
+    )
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest() if key else ""
+
+
+def _merge_live_line(current, deltas, stat, season):
+    """New season rows for one player from their published rows plus deltas"""
+    columns = LIVE_COUNT_COLUMNS[stat]
+    by_team = {row["teamid"]: dict(row) for row in current}
+    for delta in deltas:
+        teamid = delta.get("teamid") or "UNK"
+        row = by_team.setdefault(teamid, {"yearid": season, "teamid": teamid, **dict.fromkeys(columns, 0)})
+        for column in columns:
+            row[column] += _num(delta.get(column))
+    if stat == "pitching":
+        for row in by_team.values():
+            row["era"] = 0  # recomputed from er/ipouts by the record builder
+    return tuple(by_team.values())
+
+
+def ingest_live_stats():
+    """Fold newly arrived deltas into the store; returns how many player lines changed"""
+    global _live_lines, _live_version
+    season = live_season()
+
+    with _live_ingest_lock:
+        stats = {}
+        for path in _live_feed_files():
+            try:
+                stats[path] = os.stat(path)
+            except OSError as e:
+                print(f"Live stats: could not read {path}: {e}")
+
+        rebuild = _live_feed_rewritten(stats)
+        if rebuild:
+            print("Live stats: a feed file was truncated, replaced or removed; rebuilding the store")
+            _live_files.clear()
+        lines_by_player = {} if rebuild else _live_lines
+
+        pending = {}
+        skipped = 0
+        for path, st in stats.items():
+            try:
+                lines = _read_new_deltas(path, st)
+            except OSError as e:
+                print(f"Live stats: could not read {path}: {e}")
+                continue
+
+            for line in lines:
+                try:
+                    delta = json.loads(line)
+                    stat = delta["stat"]
+                    if stat not in LIVE_COUNT_COLUMNS or int(delta["yearid"]) != season:
+                        raise ValueError
+                except (ValueError, KeyError, TypeError):
+                    skipped += 1
+                    continue
+                pending.setdefault((stat, delta["playerid"]), []).append(delta)
+
+        for (stat, playerid), deltas in pending.items():
+            lines_by_player[(stat, playerid)] = _merge_live_line(
+                lines_by_player.get((stat, playerid), ()), deltas, stat, season
+            )
 
-def add_playoff_stats(df, team_id, year, mode):
-    """Add playoff appearance and World Series statistics using lahman_seriespost"""
-    try:
-        from sqlalchemy import text
-        
-        if mode == "season":
-            # For single season, check if team made playoffs that year
-            actual_year = year or 2025
+        # A rebuilt store is swapped in whole, so readers never see it half-filled
+        _live_lines = lines_by_player
+        _live_version = _live_feed_digest()
+        if skipped:
+            print(f"Live stats: skipped {skipped} malformed or off-season deltas")
+        return len(pending)
 
-            # Check if they appeared in any playoff series that year
-            playoff_query = text("""
-            SELECT COUNT(*) as series_count
-            FROM lahman_seriespost 
-            WHERE (teamidwinner = :team_id OR teamidloser = :team_id) 
-            AND yearid = :year
-            """)
 
-            with db_engine.connect() as conn:
-                result = conn.execute(playoff_query, {"team_id": team_id, "year": actual_year})
-                playoff_apps = 1 if result.fetchone()[0] > 0 else 0
+@background_task(bool(LIVE_STATS_PATH))
+def _poll_live_stats():
+    while True:
+        try:
+            changed = ingest_live_stats()
+            if changed:
+                print(f"Live stats: updated {changed} player lines")
+        except Exception as e:
+            print(f"Live stats ingest error: {e}")
+        time.sleep(LIVE_STATS_POLL_SECONDS)
+
+
+def live_payload_rows(rows, live_rows, mode):
+    """Rows a live/combined response covers: the live season alone, or merged over Lahman"""
+    if mode == "live":
+        return list(live_rows)
+    season = live_season()
+    return list(live_rows) + [row for row in rows if int(row["yearid"]) != season]
+
+
+# ─── BATCH STAT KERNELS ─────────────────────────────────────────────────────
+# Column-wise counterparts of the record builders above, for requests that
+# cover many players at once. Rates are derived on whole DataFrames; values are
+# rounded only when rows are turned back into records, with the same rules as
+# the builders, so a player's numbers match the single-player endpoints.
+
+# (output key, frame column, decimals) - decimals None keeps the raw value, 0 is an int count
+HITTER_SEASON_FIELDS = [
+    ("year", "yearid", 0), ("teamid", "teamid", None), ("games", "g", 0), ("pa", "pa", 0),
+    ("at_bats", "ab", 0), ("hits", "h", 0), ("home_runs", "hr", 0), ("rbi", "rbi", 0),
+    ("stolen_bases", "sb", 0), ("walks", "bb", 0), ("hit_by_pitch", "hbp", 0),
+    ("sacrifice_flies", "sf", 0), ("doubles", "2b", 0), ("triples", "3b", 0),
+    ("ba", "ba", RATE_DECIMALS), ("obp", "obp", RATE_DECIMALS), ("slg", "slg", RATE_DECIMALS),
+    ("ops", "ops", RATE_DECIMALS), ("ops_plus", "ops_plus", 0), ("war", "war", PER_GAME_DECIMALS),
+]
+
+HITTER_CAREER_FIELDS = [
+    ("war", "war", PER_GAME_DECIMALS), ("games", "g", 0), ("plate_appearances", "pa", 0),
+    ("hits", "h", 0), ("home_runs", "hr", 0), ("rbi", "rbi", 0), ("stolen_bases", "sb", 0),
+    ("batting_average", "ba", RATE_DECIMALS), ("on_base_percentage", "obp", RATE_DECIMALS),
+    ("slugging_percentage", "slg", RATE_DECIMALS), ("ops", "ops", RATE_DECIMALS),
+    ("ops_plus", "ops_plus", 0),
+]
+
+PITCHER_SEASON_FIELDS = [
+    ("year", "yearid", 0), ("teamid", "teamid", None), ("wins", "w", 0), ("losses", "l", 0),
+    ("games", "g", 0), ("games_started", "gs", 0), ("complete_games", "cg", 0),
+    ("shutouts", "sho", 0), ("saves", "sv", 0), ("innings_pitched", "innings_pitched", PER_GAME_DECIMALS),
+    ("hits_allowed", "h", 0), ("earned_runs", "er", 0), ("home_runs_allowed", "hr", 0),
+    ("walks", "bb", 0), ("strikeouts", "so", 0), ("era", "era", ERA_DECIMALS),
+    ("whip", "whip", ERA_DECIMALS), ("war", "war", PER_GAME_DECIMALS),
+]
+
+PITCHER_CAREER_FIELDS = [
+    ("war", "war", PER_GAME_DECIMALS), ("wins", "w", 0), ("losses", "l", 0), ("games", "g", 0),
+    ("games_started", "gs", 0), ("complete_games", "cg", 0), ("shutouts", "sho", 0),
+    ("saves", "sv", 0), ("innings_pitched", "innings_pitched", PER_GAME_DECIMALS),
+    ("hits_allowed", "h", 0), ("earned_runs", "er", 0), ("home_runs_allowed", "hr", 0),
+    ("walks", "bb", 0), ("strikeouts", "so", 0), ("era", "era", ERA_DECIMALS),
+    ("whip", "whip", ERA_DECIMALS),
+]
+
+
+def _ratio(numerator, denominator):
+    """Element-wise ratio that is 0 wherever the denominator isn't positive"""
+    return (numerator / denominator.where(denominator > 0)).fillna(0)
+
+
+def hitter_rate_frame(frame):
+    """Batting counts plus PA, BA, OBP, SLG, OPS, and season OPS+ when yearid is present"""
+    out = frame.copy()
+    columns = list(HITTER_TOTAL_COLUMNS)
+    out[columns] = out[columns].apply(pd.to_numeric, errors="coerce").fillna(0)
+
+    singles = out["h"] - out["2b"] - out["3b"] - out["hr"]
+    total_bases = singles + 2 * out["2b"] + 3 * out["3b"] + 4 * out["hr"]
+    obp_denominator = out["ab"] + out["bb"] + out["hbp"] + out["sf"]
+
+    out["pa"] = obp_denominator + out["sh"]
+    out["ba"] = _ratio(out["h"], out["ab"])
+    out["obp"] = _ratio(out["h"] + out["bb"] + out["hbp"], obp_denominator)
+    out["slg"] = _ratio(total_bases, out["ab"])
+    out["ops"] = out["obp"] + out["slg"]
+
+    if "yearid" in out and len(out):
+        years = out["yearid"].astype(int)
+        _batch_load_league_averages(set(years))
+        lg_obp = years.map(lambda year: _league_avg_cache[year]["obp"])
+        lg_slg = years.map(lambda year: _league_avg_cache[year]["slg"])
+        out["ops_plus"] = np.rint(100 * ((out["obp"] / lg_obp) + (out["slg"] / lg_slg) - 1)).astype(int)
+
+    return out
+
+
+def hitter_career_frame(seasons, key="playerid"):
+    """Career batting lines per key from a hitter_rate_frame of season rows"""
+    totals = seasons.groupby(key, sort=False)[list(HITTER_TOTAL_COLUMNS)].sum()
+
+    # Career OPS+ is the season OPS+ weighted by PA (without sacrifices), 100 when there are none
+    weight = seasons["ab"] + seasons["bb"] + seasons["hbp"] + seasons["sf"]
+    played = seasons[weight > 0]
+    weighted = (played["ops_plus"] * weight[weight > 0]).groupby(played[key]).sum()
+    career_ops_plus = np.rint(weighted / weight[weight > 0].groupby(played[key]).sum())
+
+    totals = hitter_rate_frame(totals)
+    totals["ops_plus"] = career_ops_plus.reindex(totals.index).fillna(100).astype(int)
+    return totals
+
+
+def pitcher_rate_frame(frame):
+    """Pitching counts plus innings, ERA and WHIP (the table's ERA wins when it is set)"""
+    out = frame.copy()
+    columns = list(PITCHER_TOTAL_COLUMNS)
+    out[columns] = out[columns].apply(pd.to_numeric, errors="coerce").fillna(0)
+
+    out["innings_pitched"] = out["ipouts"] / 3.0
+    era_calc = _ratio(out["er"] * 9, out["innings_pitched"])
+    out["whip"] = _ratio(out["h"] + out["bb"], out["innings_pitched"])
+
+    if "era" in out:
+        era = pd.to_numeric(out["era"], errors="coerce").fillna(0)
+        out["era"] = era.where(era > 0, era_calc)
+    else:
+        out["era"] = era_calc
 
-                # Check World Series appearances
-                ws_query = text("""
-                SELECT COUNT(*) as ws_series
-                FROM lahman_seriespost 
-                WHERE (teamidwinner = :team_id OR teamidloser = :team_id) 
-                AND yearid = :year 
-                AND round = 'WS'
-                """)
-
-                result = conn.execute(ws_query, {"team_id": team_id, "year": actual_year})
-                ws_apps = 1 if result.fetchone()[0] > 0 else 0
+    return out
 
-                # Check World Series wins
-                ws_win_query = text("""
-                SELECT COUNT(*) as ws_wins
-                FROM lahman_seriespost 
-                WHERE teamidwinner = :team_id
-                AND yearid = :year 
-                AND round = 'WS'
-                """)
-
-                result = conn.execute(ws_win_query, {"team_id": team_id, "year": actual_year})
-                ws_championships = result.fetchone()[0]
 
-        else:
-            # For franchise/career mode, count all playoff appearances
-            with db_engine.connect() as conn:
-                playoff_query = text("""
-                SELECT COUNT(DISTINCT yearid) as playoff_years
-                FROM lahman_seriespost 
-                WHERE (teamidwinner = :team_id OR teamidloser = :team_id)
-                """)
+def pitcher_career_frame(seasons, key="playerid"):
+    """Career pitching lines per key from raw season rows"""
+    totals = seasons.groupby(key, sort=False)[list(PITCHER_TOTAL_COLUMNS)].sum()
+    return pitcher_rate_frame(totals)
 
-                result = conn.execute(playoff_query, {"team_id": team_id})
-                playoff_apps = result.fetchone()[0]
 
-                # Count World Series appearances
-                ws_query = text("""
-                SELECT COUNT(DISTINCT yearid) as ws_years
-                FROM lahman_seriespost 
-                WHERE (teamidwinner = :team_id OR teamidloser = :team_id) 
-                AND round = 'WS'
-                """)
-
-                result = conn.execute(ws_query, {"team_id": team_id})
-                ws_apps = result.fetchone()[0]
+def with_season_war(frame, war, keys=("playerid", "yearid")):
+    """Left-merge season WAR onto stat rows: one row per WAR row, 0 when missing"""
+    keys = list(keys)
+    if war.empty:
+        return frame.assign(war=0.0)
 
-                # Count World Series championships
-                ws_win_query = text("""
-                SELECT COUNT(*) as total_ws_wins
-                FROM lahman_seriespost 
-                WHERE teamidwinner = :team_id
-                AND round = 'WS'
-                """)
-
-                result = conn.execute(ws_win_query, {"team_id": team_id})
-                ws_championships = result.fetchone()[0]
+    war = war[keys + ["war"]].copy()
+    war["war"] = pd.to_numeric(war["war"], errors="coerce").fillna(0)
+    merged = frame.merge(war, on=keys, how="left")
+    merged["war"] = merged["war"].fillna(0)
+    return merged
 
-        df.loc[0, "playoff_apps"] = playoff_apps
-        df.loc[0, "ws_apps"] = ws_apps
-        df.loc[0, "ws_championships"] = ws_championships
 
-        return df
+def _round_field(value, decimals):
+    if decimals is None:
+        return value.item() if isinstance(value, np.generic) else value
+    if decimals == 0:
+        return int(value)
+    return round(float(value), decimals)
 
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        # Return original df with zeros for playoff stats
-        df.loc[0, "playoff_apps"] = 0
-        df.loc[0, "ws_apps"] = 0
-        df.loc[0, "ws_championships"] = 0
-        return df
 
+def frame_records(frame, fields):
+    """Frame rows as dicts of the given (key, column, decimals) fields"""
+    columns = [column for _, column, _ in fields]
+    return [
+        {key: _round_field(value, decimals) for (key, _, decimals), value in zip(fields, row)}
+        for row in frame[columns].itertuples(index=False, name=None)
+    ]
 
-def calculate_simple_team_stats(df):
-    """Calculate basic team stats for StatHead format"""
-    try:
-        df.columns = df.columns.str.lower()
 
-        # Essential columns for StatHead format
-        essential_cols = ["g", "w", "l", "r", "ra"]
+# ─── SEASON PERCENTILES ─────────────────────────────────────────────────────
+# Where a season line ranks among that season's qualified players. Every
+# player-season is summed across stints and turned into rates in one pass, then
+# kept as a sorted list per (season, stat), so a payload's percentiles are one
+# binary search per value and no queries. A traded player's stint lines aren't
+# comparable with those full seasons, so each of them carries the percentiles
+# of the player's season total.
 
-        for col in essential_cols:
-            if col not in df.columns:
-                df[col] = 0
+# Qualifying minimums per scheduled team game (the MLB batting/ERA title rules)
+QUALIFYING_PA_PER_GAME = 3.1
+QUALIFYING_IPOUTS_PER_GAME = 3
 
-        # Fill NaN and convert to numeric
-        for col in essential_cols:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+# player type -> (stat, decimals it is shown with, higher is better)
+PERCENTILE_STATS = {
+    "hitter": [("ba", RATE_DECIMALS, True), ("obp", RATE_DECIMALS, True), ("slg", RATE_DECIMALS, True),
+               ("ops", RATE_DECIMALS, True), ("ops_plus", 0, True)],
+    "pitcher": [("era", ERA_DECIMALS, False), ("whip", ERA_DECIMALS, False)],
+}
 
-        # Calculate derived stats
-        df["gp"] = df["g"]  # Games played same as games
-        df["rpg"] = df.apply(
-            lambda row: row["r"] / row["g"] if row["g"] > 0 else 0, axis=1
-        )  # Runs per game
-        df["rapg"] = df.apply(
-            lambda row: row["ra"] / row["g"] if row["g"] > 0 else 0, axis=1
-        )  # Runs allowed per game
+_season_percentiles = None
+_season_percentiles_lock = threading.Lock()
 
-        return df
 
-    except Exception as e:
-        return df
+def build_season_percentiles(batting, pitching, season_games):
+    """{(player type, season): {stat: sorted values of the qualified players}}"""
+    tables = {}
+    games = lambda frame: frame["yearid"].map(season_games).fillna(162)
 
+    hitters = hitter_rate_frame(batting)
+    hitters = hitters[hitters["pa"] >= QUALIFYING_PA_PER_GAME * games(hitters)]
+    pitchers = pitcher_rate_frame(pitching)
+    pitchers = pitchers[pitchers["ipouts"] >= QUALIFYING_IPOUTS_PER_GAME * games(pitchers)]
 
-def calculate_combined_team_stats(df):
-    """Calculate both batting and pitching derived stats - without RBI"""
-    try:
-        df.columns = df.columns.str.lower()
+    for player_type, frame in (("hitter", hitters), ("pitcher", pitchers)):
+        for year, season in frame.groupby("yearid"):
+            tables[(player_type, int(year))] = {
+                stat: np.sort(season[stat].round(decimals).to_numpy(float)).tolist()
+                for stat, decimals, _ in PERCENTILE_STATS[player_type]
+            }
+    return tables
+
+
+def get_season_percentiles():
+    """Percentile tables for every season (built once per process)"""
+    global _season_percentiles
+    if _season_percentiles is None:
+        with _season_percentiles_lock:  # the startup warm-up and early requests build it once
+            if _season_percentiles is None:
+                with db_engine.connect() as conn:
+                    batting = _frame_of(fetch_records(sql("season_batting_totals"), None, conn), ("yearid",) + HITTER_TOTAL_COLUMNS)
+                    pitching = _frame_of(fetch_records(sql("season_pitching_totals"), None, conn), ("yearid",) + PITCHER_TOTAL_COLUMNS)
+                    season_games = {int(row["yearid"]): _num(row["g"]) for row in fetch_records(sql("season_games"), None, conn)}
+                _season_percentiles = build_season_percentiles(batting, pitching, season_games)
+    return _season_percentiles
+
+
+def percentile_rank(values, value, higher_is_better=True):
+    """Share (0-100) of the sorted values that value is at least as good as"""
+    if value is None or not values:
+        return None
+    # bisect on plain lists: the scalar form of searchsorted, without NumPy's per-call overhead
+    if higher_is_better:
+        at_least_as_good = bisect.bisect_right(values, value)
+    else:
+        at_least_as_good = len(values) - bisect.bisect_left(values, value)
+    return int(round(100 * at_least_as_good / len(values)))
+
+
+def split_season_totals(rows, player_type):
+    """{season: record of the summed line} for the seasons a player spent with more than one team"""
+    columns, build = {
+        "hitter": (HITTER_TOTAL_COLUMNS, build_hitter_season_records),
+        "pitcher": (PITCHER_TOTAL_COLUMNS, build_pitcher_season_records),
+    }[player_type]
+    stints = {}
+    for row in rows:
+        stints.setdefault(int(row["yearid"]), []).append(row)
+    return {
+        # era 0 makes the builder derive ERA from the summed earned runs and outs
+        year: build([dict(_sum_columns(season, columns), yearid=year, teamid="TOT", era=0)], {})[0]
+        for year, season in stints.items() if len(season) > 1
+    }
 
-        # Updated to include hbp and sf but exclude rbi
-        batting_cols = ["ab", "h", "bb", "hbp", "sf", "2b", "3b", "hr", "r", "sb"]
-        pitching_cols = ["ipouts", "er", "ha", "bba", "so_pitching", "w", "l"]
+
+def add_season_percentiles(records, player_type, rows=()):
+    """
+    Attach "percentiles" ({stat: 0-100}) to season records; None for seasons
+    without data. rows are the stat rows behind the records: seasons split
+    across teams are ranked on their totals, not on each stint.
+    """
+    try:
+        tables = get_season_percentiles()
+    except Exception as e:
+        print(f"Season percentiles unavailable: {e}")
+        return records
+
+    totals = split_season_totals(rows, player_type)
+    for record in records:
+        year = int(record["year"])
+        season = tables.get((player_type, year))
+        ranked = totals.get(year, record)
+        record["percentiles"] = {
+            stat: percentile_rank(season[stat], ranked.get(stat), higher)
+            for stat, _, higher in PERCENTILE_STATS[player_type]
+        } if season else None
+    return records
+
+
+# ─── AGE-ALIGNED CAREERS ────────────────────────────────────────────────────
+# `align=age` and `through_age=N` on the player endpoints compare careers by
+# age (season year minus birth year) instead of by calendar season. A player's
+# seasons are grouped by age and prefix-summed once, so the career line through
+# any age is a single row of that cumulative table.
+
+class AgeView(NamedTuple):
+    birthyear: int
+    through_age: Optional[int]
+    align: bool
+
+
+def requested_age_view(playerid):
+    """The request's align=age / through_age options, or None when absent; ValueError if unusable"""
+    if not has_request_context():
+        return None
+    through_age = request.args.get("through_age", "").strip()
+    align = request.args.get("align", "").lower() == "age"
+    if through_age and not through_age.isdigit():
+        raise ValueError("through_age must be a whole number")
+    if not align and not through_age:
+        return None
+    entry = get_player_entry(playerid)
+    if entry is None or not entry.birthyear:
+        # Calendar seasons in place of ages would look like an answer, so refuse instead
+        raise ValueError("No birth year on record for this player, so stats can't be aligned by age")
+    return AgeView(int(entry.birthyear), int(through_age) if through_age else None, align)
+
+
+def _cumulative_by_age(frame, birthyear, columns, war_by_year):
+    """(ages, cumulative column sums through each age, cumulative WAR through each age)"""
+    frame = frame.assign(age=frame["yearid"].astype(int) - birthyear)
+    by_age = frame.groupby("age")[list(columns)].sum().sort_index()
+    war = pd.Series({year - birthyear: sum(wars) for year, wars in war_by_year.items()}, dtype=float)
+    war = war.reindex(by_age.index, fill_value=0)
+    return by_age.index.to_numpy(), by_age.cumsum(), war.cumsum().to_numpy()
+
+
+def hitter_lines_by_age(rows, birthyear, war_by_year, counting_rows=None):
+    """(ages, career batting line through each age); counting_rows replaces the counts but not OPS+"""
+    frame = hitter_rate_frame(pd.DataFrame(rows))
+    # Career OPS+ is season OPS+ weighted by PA without sacrifices, as in calculate_career_ops_plus
+    frame["ops_weight"] = frame["ab"] + frame["bb"] + frame["hbp"] + frame["sf"]
+    frame["ops_plus_weighted"] = frame["ops_plus"] * frame["ops_weight"]
+    if counting_rows is not None:
+        columns = list(HITTER_TOTAL_COLUMNS)
+        frame[columns] = pd.DataFrame(counting_rows)[columns].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy()
+
+    ages, cumulative, war = _cumulative_by_age(
+        frame, birthyear, HITTER_TOTAL_COLUMNS + ("ops_weight", "ops_plus_weighted"), war_by_year
+    )
+    lines = []
+    for totals, career_war in zip(cumulative.to_dict("records"), war):
+        weight = totals["ops_weight"]
+        ops_plus = round(totals["ops_plus_weighted"] / weight) if weight > 0 else 100
+        lines.append(build_hitter_career_totals([totals], float(career_war), ops_plus))
+    return ages, lines
+
+
+def pitcher_lines_by_age(rows, birthyear, war_by_year):
+    """(ages, career pitching line through each age)"""
+    frame = pd.DataFrame(rows)
+    frame[list(PITCHER_TOTAL_COLUMNS)] = frame[list(PITCHER_TOTAL_COLUMNS)].apply(pd.to_numeric, errors="coerce").fillna(0)
+    ages, cumulative, war = _cumulative_by_age(frame, birthyear, PITCHER_TOTAL_COLUMNS, war_by_year)
+    return ages, [
+        build_pitcher_career_totals([totals], float(career_war))
+        for totals, career_war in zip(cumulative.to_dict("records"), war)
+    ]
+
+
+def line_through_age(ages, lines, age):
+    """Career line through the given age (the last age at or before it), or None before the debut"""
+    index = np.searchsorted(ages, age, side="right") - 1
+    return lines[index] if index >= 0 else None
+
+
+def apply_age_view(payload, age_view, ages, lines, records=None):
+    """Add ages, the through-age cutoff and the by-age career table to a player payload"""
+    if records is not None:
+        for record in records:
+            record["age"] = int(record["year"]) - age_view.birthyear
+        if age_view.through_age is not None:
+            records = [record for record in records if record["age"] <= age_view.through_age]
+        payload["stats"] = format_stat_table(records)
+
+    if age_view.through_age is not None:
+        payload["through_age"] = age_view.through_age
+    if age_view.align:
+        payload["by_age"] = format_stat_table([
+            {"age": int(age), **line} for age, line in zip(ages, lines)
+            if age_view.through_age is None or age <= age_view.through_age
+        ])
+    return payload
+
+
+# ─── ERA NEUTRALIZATION ─────────────────────────────────────────────────────
+# `neutralize=<year>` on the player endpoints restates a player's lines in that
+# season's league environment. Every season's league rates are computed once
+# into a baseline table; each stat is scaled by target rate / season rate, one
+# multiplier column per stat applied to the player's season arrays at once.
+# OPS+ and percentiles already measure a season against its own league, so
+# they keep their real values. A hitter's plate appearances stay fixed: extra
+# (or fewer) walks come out of at-bats, and hits never exceed the at-bats left.
+
+# Counting column -> baseline rate that scales it (hitters per PA, pitchers per out)
+NEUTRAL_SCALED_COLUMNS = {
+    "hitter": {"singles": "bat_hits", "2b": "bat_hits", "3b": "bat_hits", "hr": "bat_hr", "bb": "bat_bb", "rbi": "bat_rbi"},
+    "pitcher": {"h": "pit_h", "hr": "pit_hr", "bb": "pit_bb", "er": "pit_er"},
+}
+
+# Season record keys that change when the counting columns above do
+NEUTRAL_RECORD_KEYS = {
+    "hitter": ("at_bats", "hits", "home_runs", "rbi", "walks", "doubles", "triples", "ba", "obp", "slg", "ops"),
+    "pitcher": ("hits_allowed", "earned_runs", "home_runs_allowed", "walks", "era", "whip"),
+}
+
+class LeagueBaselines(NamedTuple):
+    row_of: dict          # yearid -> row of rates
+    columns: tuple        # baseline rate names, the columns of rates
+    rates: np.ndarray     # seasons x rates, plus a trailing all-NaN row for unknown seasons
+
+
+_league_baselines = None
+_league_baselines_lock = threading.Lock()
+
+
+def build_league_baselines(batting, pitching):
+    """League rates per season from season-level batting and pitching sums"""
+    batting = batting.set_index("yearid").apply(pd.to_numeric, errors="coerce").fillna(0)
+    pitching = pitching.set_index("yearid").apply(pd.to_numeric, errors="coerce").fillna(0)
+
+    baselines = pd.DataFrame({
+        # Non-HR hits, so doubles, triples and singles share one multiplier
+        "bat_hits": _ratio(batting["h"] - batting["hr"], batting["pa"]),
+        "bat_hr": _ratio(batting["hr"], batting["pa"]),
+        "bat_bb": _ratio(batting["bb"], batting["pa"]),
+        "bat_rbi": _ratio(batting["rbi"], batting["pa"]),
+    }).join(pd.DataFrame({
+        "pit_h": _ratio(pitching["h"], pitching["ipouts"]),
+        "pit_hr": _ratio(pitching["hr"], pitching["ipouts"]),
+        "pit_bb": _ratio(pitching["bb"], pitching["ipouts"]),
+        "pit_er": _ratio(pitching["er"], pitching["ipouts"]),
+    }), how="outer").sort_index()
+
+    rates = np.vstack([baselines.to_numpy(dtype=float), np.full(len(baselines.columns), np.nan)])
+    return LeagueBaselines(
+        {int(year): row for row, year in enumerate(baselines.index)}, tuple(baselines.columns), rates
+    )
+
+
+def get_league_baselines():
+    """League rate baselines for every season (built once per process)"""
+    global _league_baselines
+    if _league_baselines is None:
+        with _league_baselines_lock:
+            if _league_baselines is None:
+                with db_engine.connect() as conn:
+                    batting = _frame_of(fetch_records(sql("league_batting_environment"), None, conn), ("yearid", "h", "hr", "bb", "rbi", "pa"))
+                    pitching = _frame_of(fetch_records(sql("league_pitching_environment"), None, conn), ("yearid", "h", "hr", "bb", "er", "ipouts"))
+                _league_baselines = build_league_baselines(batting, pitching)
+    return _league_baselines
+
+
+def requested_neutral_year():
+    """The request's neutralize=<year> target, or None; ValueError when that season has no baseline"""
+    if not has_request_context() or not request.args.get("neutralize"):
+        return None
+    value = request.args["neutralize"]
+    if not value.isdigit() or int(value) not in get_league_baselines().row_of:
+        raise ValueError(f"No league baseline for neutralize={value}")
+    return int(value)
+
+
+def neutralize_rows(rows, player_type, target_year):
+    """Copies of season rows with their counting stats rescaled to the target season's league rates"""
+    scaled = NEUTRAL_SCALED_COLUMNS[player_type]
+    columns, rates = list(scaled), list(scaled.values())
+    if player_type == "hitter":
+        rows = [dict(row, singles=_num(row["h"]) - _num(row["2b"]) - _num(row["3b"]) - _num(row["hr"])) for row in rows]
+
+    baselines = get_league_baselines()
+    rate_columns = [baselines.columns.index(rate) for rate in rates]
+    unknown = len(baselines.rates) - 1
+    season_rows = [baselines.row_of.get(int(row["yearid"]), unknown) for row in rows]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factors = baselines.rates[baselines.row_of[target_year], rate_columns] / baselines.rates[np.ix_(season_rows, rate_columns)]
+    factors = np.where(np.isfinite(factors), factors, 1.0)  # seasons without a baseline stay as they are
+
+    values = np.array([[_num(row[column]) for column in columns] for row in rows], dtype=float)
+    scaled_values = np.rint(values.reshape(len(rows), len(columns)) * factors).astype(int)
+    if player_type == "hitter":
+        at_bats = _hold_plate_appearances(rows, columns, scaled_values)
+    else:
+        home_runs, hits = columns.index("hr"), columns.index("h")
+        scaled_values[:, home_runs] = np.minimum(scaled_values[:, home_runs], scaled_values[:, hits])
+
+    neutral = [dict(row, **dict(zip(columns, line))) for row, line in zip(rows, scaled_values.tolist())]
+    if player_type == "hitter":
+        for row, ab in zip(neutral, at_bats.tolist()):
+            row["ab"] = ab
+            row["h"] = row.pop("singles") + row["2b"] + row["3b"] + row["hr"]
+    else:
+        # A published ERA moves with earned runs
+        for row, factor in zip(neutral, factors[:, columns.index("er")]):
+            row["era"] = _num(row["era"]) * float(factor)
+    return neutral
+
+
+def _hold_plate_appearances(rows, columns, scaled_values):
+    """At-bats that keep each row's PA fixed under its scaled walks; trims hits in place to fit them"""
+    at_bats = np.array([_num(row["ab"]) for row in rows], dtype=int)
+    walks = np.array([_num(row["bb"]) for row in rows], dtype=int)
+
+    bb = columns.index("bb")
+    scaled_values[:, bb] = np.minimum(scaled_values[:, bb], walks + at_bats)
+    at_bats = at_bats - (scaled_values[:, bb] - walks)
+
+    # Any hits past the at-bats come off the cheapest ones first
+    excess = scaled_values[:, [columns.index(c) for c in ("singles", "2b", "3b", "hr")]].sum(axis=1) - at_bats
+    for column in ("singles", "2b", "3b", "hr"):
+        index = columns.index(column)
+        cut = np.clip(excess, 0, scaled_values[:, index])
+        scaled_values[:, index] -= cut
+        excess -= cut
+    return at_bats
+
+
+def neutralize_records(records, neutral_records, player_type):
+    """Season records with the stats of their neutralized counterparts swapped in"""
+    keys = NEUTRAL_RECORD_KEYS[player_type]
+    for record, neutral in zip(records, neutral_records):
+        record.update((key, neutral[key]) for key in keys)
+    return records
+
+
+# ─── BULK PLAYER STATS ──────────────────────────────────────────────────────
+
+MAX_BULK_PLAYERS = 500
+
+
+def _frame_of(rows, columns):
+    """DataFrame of fetched rows that keeps its columns when there are none"""
+    return pd.DataFrame(rows) if rows else pd.DataFrame(columns=list(columns))
+
+
+def _bulk_player_type(playerid, batting, pitching):
+    """detect_two_way_player_simple's rule applied to already-fetched season rows"""
+    if is_predefined_two_way_player(playerid):
+        return "two-way"
+
+    pitch_seasons = len(pitching)
+    if pitch_seasons >= 3 or pitching["g"].sum() >= 50 or pitching["gs"].sum() >= 10:
+        return "pitcher"
+    if len(batting) >= 3 or batting["ab"].sum() >= 300:
+        return "hitter"
+    return "pitcher" if pitch_seasons > 0 else "hitter"
+
+
+def bulk_player_lines(playerids, mode):
+    """One stats dict per requested playerid, from one batched query per table"""
+    params = {"playerids": list(playerids)}
+
+    with db_engine.connect() as conn:
+        people = {row["playerid"]: row for row in fetch_records(sql("people_many"), params, conn)}
+        batting = hitter_rate_frame(_frame_of(
+            fetch_records(sql("hitter_stats_many"), params, conn), ("playerid", "yearid", "teamid") + HITTER_TOTAL_COLUMNS
+        ))
+        pitching = pitcher_rate_frame(_frame_of(
+            fetch_records(sql("pitcher_stats_many"), params, conn), ("playerid", "yearid", "teamid", "era") + PITCHER_TOTAL_COLUMNS
+        ))
+        war = _frame_of(fetch_records(sql("season_war_many"), params, conn), ("playerid", "yearid", "war"))
+
+    if not war.empty:
+        war["yearid"] = war["yearid"].astype(int)
+        war["war"] = pd.to_numeric(war["war"], errors="coerce").fillna(0)
+    career_war = war.groupby("playerid")["war"].sum() if not war.empty else pd.Series(dtype=float)
+
+    if mode == "career":
+        hitting = hitter_career_frame(batting) if len(batting) else batting
+        pitching_lines = pitcher_career_frame(pitching) if len(pitching) else pitching
+        for frame in (hitting, pitching_lines):
+            if len(frame):
+                frame["war"] = career_war.reindex(frame.index).fillna(0)
+    else:
+        batting["yearid"] = batting["yearid"].astype(int)
+        pitching["yearid"] = pitching["yearid"].astype(int)
+        hitting = with_season_war(batting, war)
+        pitching_lines = with_season_war(pitching, war)
+
+    batting_by_player = dict(tuple(batting.groupby("playerid", sort=False)))
+    pitching_by_player = dict(tuple(pitching.groupby("playerid", sort=False)))
+    if mode == "season":
+        hitting = dict(tuple(hitting.groupby("playerid", sort=False)))
+        pitching_lines = dict(tuple(pitching_lines.groupby("playerid", sort=False)))
+
+    empty = pd.DataFrame(columns=["g", "gs", "ab"])
+    for playerid in playerids:
+        person = people.get(playerid)
+        if person is None:
+            yield {"playerid": playerid, "error": "Player not found"}
+            continue
+
+        player_batting = batting_by_player.get(playerid, empty)
+        player_pitching = pitching_by_player.get(playerid, empty)
+
+        if mode == "career":
+            hitter = frame_records(hitting.loc[[playerid]], HITTER_CAREER_FIELDS)[0] if playerid in hitting.index else None
+            pitcher = frame_records(pitching_lines.loc[[playerid]], PITCHER_CAREER_FIELDS)[0] if playerid in pitching_lines.index else None
+        else:
+            hitter = frame_records(hitting[playerid], HITTER_SEASON_FIELDS) if playerid in hitting else None
+            pitcher = frame_records(pitching_lines[playerid], PITCHER_SEASON_FIELDS) if playerid in pitching_lines else None
+
+        awards = get_player_awards(playerid)
+
+        yield {
+            "playerid": playerid,
+            "name": f"{person['namefirst']} {person['namelast']}",
+            "mode": mode,
+            "player_type": _bulk_player_type(playerid, player_batting, player_pitching),
+            "hitting": hitter,
+            "pitching": pitcher,
+            "awards": awards["summary"],
+            "mlbAllStar": awards["mlbAllStar"],
+        }
+
+
+@app.route("/players/bulk", methods=["GET", "POST"])
+def bulk_player_stats():
+    """Stats for many playerids in one call, streamed back as NDJSON (one player per line)"""
+    body = (request.get_json(silent=True) or {}) if request.method == "POST" else {}
+    playerids = body.get("playerids") or request.args.get("ids", "").split(",")
+    mode = str(body.get("mode") or request.args.get("mode", "career")).lower()
+
+    # De-duplicate while keeping the caller's order
+    playerids = list(dict.fromkeys(str(pid).strip() for pid in playerids if str(pid).strip()))
+
+    if not playerids:
+        return jsonify({"error": "Pass playerids (ids=a,b,c or a JSON body)"}), 400
+    if len(playerids) > MAX_BULK_PLAYERS:
+        return jsonify({"error": f"At most {MAX_BULK_PLAYERS} players per request"}), 400
+    if mode not in ("career", "season"):
+        return jsonify({"error": "Invalid mode. Use 'career' or 'season'"}), 400
+
+    try:
+        lines = bulk_player_lines(playerids, mode)
+        first = next(lines, None)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+    def generate():
+        if first is not None:
+            yield app.json.dumps(first) + "\n"
+        for line in lines:
+            yield app.json.dumps(line) + "\n"
+
+    return app.response_class(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@app.route("/team")
+def get_team_stats():
+    """Unified endpoint that returns both batting and pitching stats"""
+    try:
+        team = request.args.get("team", "").strip()
+        mode = request.args.get("mode", "season").lower()
+
+        if not team:
+            return jsonify({"error": "Enter team"}), 400
+
+        team_id, year = parse_team_input(team)
+
+        # Get combined stats
+        return handle_combined_team_stats(team_id, year, mode)
+
+    except Exception as e:
+        import traceback
+
+        traceback.print_exc()
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+def handle_combined_team_stats(team_id, year, mode):
+    """Get both batting and pitching stats in one query - updated for SQLAlchemy"""
+    try:
+        if mode == "season" and year:
+            note_requested_season(year)
+
+        # Use SQLAlchemy engine directly instead of get_db_connection()
+        snapshot = serve_snapshot(snapshot_key(
+            "team", team_id, mode, (year or 2025) if mode == "season" else ""
+        ))
+        if snapshot is not None:
+            return snapshot
+
+        # Track the actual year being used
+        actual_year = None
+
+        if mode == "timeline":
+            return handle_team_timeline(team_id)
+
+        # Code the team's stats are filed under (seasons before a move use the old code)
+        stats_team_id = team_id
+
+        if mode == "season":
+            actual_year = year or 2025
+            stats_team_id = get_franchise(team_id).team_id_for(actual_year)
+            rows = fetch_records(sql("team_season"), {"team_id": stats_team_id, "year": actual_year})
+
+        elif mode in ["franchise", "career", "overall"]:
+            # Check for franchise moves
+            franchise_ids = get_franchise_team_ids(team_id)
+
+            # All-time totals add up the cached franchise seasons instead of rescanning lahman_teams
+            seasons = get_franchise_season_lines(franchise_ids)
+            rows = [{
+                "teamid": "FRANCHISE" if len(franchise_ids) > 1 else team_id,
+                "seasons": len(seasons),
+                **_sum_columns(seasons, TEAM_TOTAL_COLUMNS),
+                # We'll calculate playoff stats separately
+                "playoff_apps": 0, "ws_apps": 0, "ws_championships": 0,
+            }] if seasons else []
+
+        else:
+            # Default to season
+            actual_year = year or 2025
+            rows = fetch_records(sql("team_season"), {"team_id": team_id, "year": actual_year})
+
+        stats = rows[0] if rows else None
+
+        if stats is not None:
+            # Add playoff statistics - pass actual_year for season mode
+            stats.update(get_playoff_stats(
+                stats_team_id, actual_year if mode == "season" else year, mode
+            ))
+
+        if stats is None:
+            if mode in ["franchise", "career", "overall"]:
+                return (
+                    jsonify({"error": f"Team '{team_id}' not found in database"}),
+                    404,
+                )
+            else:
+                return (
+                    jsonify(
+                        {"error": f"Team '{team_id}' not found for year {actual_year}"}
+                    ),
+                    404,
+                )
+
+        # Calculate derived stats
+        stats = calculate_combined_team_record(stats)
+
+        # Pass the correct year value based on mode
+        year_to_pass = actual_year if mode == "season" else None
+        return format_team_record_response(stats, mode, team_id, year_to_pass)
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+# Franchise season rows by tuple of team ids; Lahman only changes with a redeploy
+_franchise_season_cache = {}
+
+def get_franchise_season_lines(team_ids):
+    """Every lahman_teams season (full batting and pitching line) for a franchise's ids, cached"""
+    key = tuple(team_ids)
+    if key not in _franchise_season_cache:
+        _franchise_season_cache[key] = fetch_records(sql("franchise_team_seasons"), {"team_ids": list(team_ids)})
+    return [dict(row) for row in _franchise_season_cache[key]]
+
+
+def handle_team_timeline(team_id):
+    """Season-by-season team lines across every id of the franchise"""
+    franchise_ids = get_franchise_team_ids(team_id)
+    rows = get_franchise_season_lines(franchise_ids)
+
+    if not rows:
+        return jsonify({"error": f"Team '{team_id}' not found in database"}), 404
+
+    playoffs_by_year = get_playoff_stats_by_year(franchise_ids)
+    no_playoffs = {"playoff_apps": 0, "ws_apps": 0, "ws_championships": 0}
+
+    seasons = []
+    for row in rows:
+        row.update(playoffs_by_year.get(int(row["yearid"]), no_playoffs))
+        seasons.append(calculate_combined_team_record(row))
+
+    return jsonify({
+        "mode": "timeline",
+        "team_id": team_id,
+        "team_name": get_team_name(team_id, None, "timeline"),
+        "team_logo": get_team_logo_with_fallback(team_id),
+        "stats": format_stat_table(seasons),
+    })
+
+
+ROSTER_HITTER_FIELDS = [("playerid", "playerid", None), ("name", "name", None)] + [
+    field for field in HITTER_SEASON_FIELDS if field[0] not in ("year", "teamid")
+]
+
+ROSTER_PITCHER_FIELDS = [("playerid", "playerid", None), ("name", "name", None)] + [
+    field for field in PITCHER_SEASON_FIELDS if field[0] not in ("year", "teamid")
+]
+
+
+@app.route("/team/roster")
+def get_team_roster():
+    """Every batter and pitcher on a team-season with their lines, OPS+, ERA and WAR"""
+    try:
+        team = request.args.get("team", "").strip()
+        if not team:
+            return jsonify({"error": "Enter team"}), 400
+
+        team_id, year = parse_team_input(team)
+        if year:
+            note_requested_season(year)
+        year = year or 2025
+
+        # The franchise's ids cover seasons played under an older code (1955 Dodgers -> BRO)
+        params = {"team_ids": get_franchise_team_ids(team_id), "year": year}
+        with db_engine.connect() as conn:
+            batting = fetch_records(sql("roster_batting"), params, conn)
+            pitching = fetch_records(sql("roster_pitching"), params, conn)
+            war = {row["playerid"]: row["war"] for row in fetch_records(sql("roster_war"), params, conn)}
+
+        if not batting and not pitching:
+            return jsonify({"error": f"Team '{team_id}' not found for year {year}"}), 404
+
+        batters = pitchers = []
+        # WAR counts only the player's time with this club, not stints elsewhere that season
+        if batting:
+            batters = hitter_rate_frame(pd.DataFrame(batting))
+            batters = batters[batters["pa"] > 0].sort_values("pa", ascending=False, kind="stable")
+            batters["name"] = batters["namefirst"] + " " + batters["namelast"]
+            batters["war"] = pd.to_numeric(batters["playerid"].map(war), errors="coerce").fillna(0)
+            batters = frame_records(batters, ROSTER_HITTER_FIELDS)
+        if pitching:
+            pitchers = pitcher_rate_frame(pd.DataFrame(pitching))
+            pitchers = pitchers.sort_values("ipouts", ascending=False, kind="stable")
+            pitchers["name"] = pitchers["namefirst"] + " " + pitchers["namelast"]
+            pitchers["war"] = pd.to_numeric(pitchers["playerid"].map(war), errors="coerce").fillna(0)
+            pitchers = frame_records(pitchers, ROSTER_PITCHER_FIELDS)
+
+        return jsonify({
+            "team_id": team_id,
+            "team_name": get_team_name(team_id, year, "season"),
+            "year": year,
+            "team_logo": get_team_logo_with_fallback(team_id, year),
+            "batters": format_stat_table(batters),
+            "pitchers": format_stat_table(pitchers),
+        })
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+def get_franchise_team_ids(team_id):
+    """
+    Map current team IDs to all historical team IDs for franchise totals
+    This handles team moves and ID changes
+    """
+    return list(get_franchise(team_id).team_ids)
+
+
+def get_playoff_stats(team_id, year, mode):
+    """Playoff appearance and World Series statistics from lahman_seriespost"""
+    try:
+        if mode == "season":
+            # For single season, check if team made playoffs that year
+            actual_year = year or 2025
+
+            # Check if they appeared in any playoff series that year
+            with db_engine.connect() as conn:
+                result = conn.execute(sql("season_playoff_series"), {"team_id": team_id, "year": actual_year})
+                playoff_apps = 1 if result.fetchone()[0] > 0 else 0
+
+                # Check World Series appearances
+                result = conn.execute(sql("season_ws_series"), {"team_id": team_id, "year": actual_year})
+                ws_apps = 1 if result.fetchone()[0] > 0 else 0
+
+                # Check World Series wins
+                result = conn.execute(sql("season_ws_wins"), {"team_id": team_id, "year": actual_year})
+                ws_championships = result.fetchone()[0]
+
+        else:
+            # For franchise/career mode, count all playoff appearances
+            with db_engine.connect() as conn:
+                result = conn.execute(sql("playoff_years"), {"team_id": team_id})
+                playoff_apps = result.fetchone()[0]
+
+                # Count World Series appearances
+                result = conn.execute(sql("ws_years"), {"team_id": team_id})
+                ws_apps = result.fetchone()[0]
+
+                # Count World Series championships
+                result = conn.execute(sql("ws_wins"), {"team_id": team_id})
+                ws_championships = result.fetchone()[0]
+
+        return {
+            "playoff_apps": playoff_apps,
+            "ws_apps": ws_apps,
+            "ws_championships": ws_championships,
+        }
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        # Zeros for playoff stats
+        return {"playoff_apps": 0, "ws_apps": 0, "ws_championships": 0}
+
+
+def get_playoff_stats_by_year(team_ids):
+    """Per-season playoff flags for a list of team ids in one lahman_seriespost query"""
+
+    by_year = {}
+    try:
+        for row in fetch_records(sql("franchise_playoff_series"), {"team_ids": list(team_ids)}):
+            season = by_year.setdefault(
+                int(row["yearid"]), {"playoff_apps": 1, "ws_apps": 0, "ws_championships": 0}
+            )
+            if row["round"] == "WS":
+                season["ws_apps"] = 1
+                if row["teamidwinner"] in team_ids:
+                    season["ws_championships"] = 1
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+
+    return by_year
+
+
+def add_playoff_stats(df, team_id, year, mode):
+    """Add playoff appearance and World Series statistics to a team DataFrame"""
+    for key, value in get_playoff_stats(team_id, year, mode).items():
+        df.loc[0, key] = value
+    return df
+
+
+def calculate_simple_team_stats(df):
+    """Calculate basic team stats for StatHead format"""
+    try:
+        df.columns = df.columns.str.lower()
+
+        # Essential columns for StatHead format
+        essential_cols = ["g", "w", "l", "r", "ra"]
+
+        for col in essential_cols:
+            if col not in df.columns:
+                df[col] = 0
+
+        # Fill NaN and convert to numeric
+        for col in essential_cols:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+        # Calculate derived stats
+        df["gp"] = df["g"]  # Games played same as games
+        df["rpg"] = (df["r"] / df["g"]).where(df["g"] > 0, 0)  # Runs per game
+        df["rapg"] = (df["ra"] / df["g"]).where(df["g"] > 0, 0)  # Runs allowed per game
+
+        return df
+
+    except Exception as e:
+        return df
+
+
+TEAM_COUNT_COLUMNS = ("yearid", "seasons", "playoff_apps", "ws_apps", "ws_championships")
+
+
+def calculate_simple_team_record(stats):
+    """Record (dict) counterpart of calculate_simple_team_stats, rounded for output"""
+    stats = {key.lower(): value for key, value in stats.items()}
+
+    # Essential columns for StatHead format, NULL -> 0
+    for col in ["g", "w", "l", "r", "ra"]:
+        stats[col] = int(round(_num(stats.get(col))))
+
+    for col in TEAM_COUNT_COLUMNS:
+        if stats.get(col) is not None:
+            stats[col] = int(round(_num(stats[col])))
+
+    stats["gp"] = stats["g"]  # Games played same as games
+    stats["rpg"] = round(stats["r"] / stats["g"], PER_GAME_DECIMALS) if stats["g"] > 0 else 0  # Runs per game
+    stats["rapg"] = round(stats["ra"] / stats["g"], PER_GAME_DECIMALS) if stats["g"] > 0 else 0  # Runs allowed per game
+
+    return stats
+
+
+TEAM_BATTING_COLUMNS = ("ab", "h", "2b", "3b", "hr", "bb", "so_batting", "sb", "hbp", "sf")
+TEAM_PITCHING_COLUMNS = ("ipouts", "er", "ha", "hra", "bba", "so_pitching", "cg", "sho", "sv")
+TEAM_TOTAL_COLUMNS = ("g", "w", "l", "r", "ra") + TEAM_BATTING_COLUMNS + TEAM_PITCHING_COLUMNS
+
+# Pitching columns are renamed so they don't collide with the batting ones
+TEAM_PITCHING_RENAMES = {"ha": "h_allowed", "bba": "bb_allowed", "hra": "hr_allowed", "so_pitching": "so"}
+
+
+def calculate_combined_team_record(stats):
+    """Record (dict) counterpart of calculate_combined_team_stats: record plus slash lines"""
+    stats = calculate_simple_team_record(stats)
+
+    for col in TEAM_BATTING_COLUMNS + TEAM_PITCHING_COLUMNS:
+        stats[col] = int(round(_num(stats.get(col))))
+
+    # Batting calculations
+    ab = stats["ab"]
+    singles = stats["h"] - stats["2b"] - stats["3b"] - stats["hr"]
+    total_bases = singles + 2 * stats["2b"] + 3 * stats["3b"] + 4 * stats["hr"]
+    obp_denominator = ab + stats["bb"] + stats["hbp"] + stats["sf"]
+    obp = (stats["h"] + stats["bb"] + stats["hbp"]) / obp_denominator if obp_denominator > 0 else 0
+    slg = total_bases / ab if ab > 0 else 0
+
+    stats["ba"] = round(stats["h"] / ab, RATE_DECIMALS) if ab > 0 else 0
+    stats["obp"] = round(obp, RATE_DECIMALS)
+    stats["slg"] = round(slg, RATE_DECIMALS)
+    stats["ops"] = round(obp + slg, RATE_DECIMALS)
+
+    # Pitching calculations
+    ip = stats["ipouts"] / 3.0
+    stats["ip"] = round(ip, PER_GAME_DECIMALS)
+    stats["era"] = round((stats["er"] * 9) / ip, ERA_DECIMALS) if ip > 0 else 0
+    stats["whip"] = round((stats["ha"] + stats["bba"]) / ip, ERA_DECIMALS) if ip > 0 else 0
+
+    for col, name in TEAM_PITCHING_RENAMES.items():
+        stats[name] = stats.pop(col)
+
+    return stats
+
+
+def calculate_combined_team_stats(df):
+    """Calculate both batting and pitching derived stats - without RBI"""
+    try:
+        df.columns = df.columns.str.lower()
+
+        # Updated to include hbp and sf but exclude rbi
+        batting_cols = ["ab", "h", "bb", "hbp", "sf", "2b", "3b", "hr", "r", "sb"]
+        pitching_cols = ["ipouts", "er", "ha", "hra", "bba", "so_pitching", "cg", "sho", "sv", "w", "l"]
 
         for col in batting_cols + pitching_cols:
             if col not in df.columns:
@@ -1596,13 +3797,17 @@ def calculate_combined_team_stats(df):
             df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
 
         # Batting calculations
-        df["ba"] = df.apply(
-            lambda row: row["h"] / row["ab"] if row["ab"] > 0 else 0, axis=1
-        )
+        singles = df["h"] - df["2b"] - df["3b"] - df["hr"]
+        total_bases = singles + 2 * df["2b"] + 3 * df["3b"] + 4 * df["hr"]
+        obp_denominator = df["ab"] + df["bb"] + df["hbp"] + df["sf"]
+        df["ba"] = _ratio(df["h"], df["ab"])
+        df["obp"] = _ratio(df["h"] + df["bb"] + df["hbp"], obp_denominator)
+        df["slg"] = _ratio(total_bases, df["ab"])
+        df["ops"] = df["obp"] + df["slg"]
 
         # Pitching calculations
         df["ip"] = df["ipouts"] / 3.0
-        df["era_calc"] = df.apply(
+        df["era"] = df.apply(
             lambda row: (
                 (row["er"] * 9) / (row["ipouts"] / 3.0) if row["ipouts"] > 0 else 0
             ),
@@ -1617,15 +3822,8 @@ def calculate_combined_team_stats(df):
             axis=1,
         )
 
-        # Rename columns for consistency
-        df = df.rename(
-            columns={
-                "ha": "h_allowed",
-                "bba": "bb_allowed",
-                "so_pitching": "so",  # Use pitching strikeouts as main SO stat
-                "hra": "hr_allowed",
-            }
-        )
+        # Rename columns for consistency (pitching strikeouts become the main SO stat)
+        df = df.rename(columns={"so": "so_batting", **TEAM_PITCHING_RENAMES})
 
         return df
 
@@ -1634,21 +3832,25 @@ def calculate_combined_team_stats(df):
 
 
 def format_combined_team_response(df, mode, team_id, year):
-    """Format combined team stats response"""
+    """Format combined team stats response from a DataFrame"""
+    stats = df.to_dict(orient="records")[0] if not df.empty else {}
+
+    # Convert numpy types
+    for key, value in stats.items():
+        if hasattr(value, "item"):
+            stats[key] = value.item()
+        elif pd.isna(value):
+            stats[key] = None
+
+    return format_team_record_response(format_and_round_stats(stats), mode, team_id, year)
+
+
+def format_team_record_response(stats, mode, team_id, year):
+    """Format combined team stats response from an already-rounded stats record (dict)"""
     try:
         # Pass the mode to get_team_name for proper formatting
         team_name = get_team_name(team_id, year, mode)
 
-        stats = df.to_dict(orient="records")[0] if not df.empty else {}
-
-        # Convert numpy types and apply formatting
-        for key, value in stats.items():
-            if hasattr(value, "item"):
-                stats[key] = value.item()
-            elif pd.isna(value):
-                stats[key] = None
-
-        stats = format_and_round_stats(stats)
         team_logo = get_team_logo_with_fallback(team_id, year)
 
         return jsonify(
@@ -1705,6 +3907,7 @@ def parse_team_input(team):
         return team_code, None
 
 
+@lru_cache(maxsize=4096)
 def get_team_code_from_search(search_term):
     """Convert team search terms to database team codes"""
     search_term = search_term.lower().strip()
@@ -1718,11 +3921,7 @@ def get_team_code_from_search(search_term):
         return _ALIAS_TO_CODE[search_term]
 
     # Partial-match fallback
-    for alias, code in _ALIAS_TO_CODE.items():
-        if search_term in alias or alias in search_term:
-            return code
-
-    return search_term.upper()
+    return match_team_alias(search_term) or search_term.upper()
 
 
 def get_team_name(team_id, year=None, mode=None):
@@ -1775,12 +3974,14 @@ def format_and_round_stats(stats_dict):
     """Format stats with proper decimal places - updated for StatHead format"""
 
     # Stats that should show one decimal place
-    per_game_stats = ["rpg", "rapg"]
+    per_game_stats = ["rpg", "rapg", "ip"]
+    rate_stats = ["ba", "obp", "slg", "ops"]
+    era_stats = ["era", "whip"]
 
     formatted_stats = {}
 
     for key, value in stats_dict.items():
-        if value is None or pd.isna(value):
+        if value is None or (isinstance(value, float) and math.isnan(value)):
             formatted_stats[key] = None
             continue
 
@@ -1792,7 +3993,11 @@ def format_and_round_stats(stats_dict):
 
         if key in per_game_stats:
             # Per-game stats get 1 decimal place
-            formatted_stats[key] = f"{num_value:.1f}"
+            formatted_stats[key] = round(num_value, PER_GAME_DECIMALS)
+        elif key in rate_stats:
+            formatted_stats[key] = round(num_value, RATE_DECIMALS)
+        elif key in era_stats:
+            formatted_stats[key] = round(num_value, ERA_DECIMALS)
         else:
             # Everything else is whole numbers
             if isinstance(num_value, float) and num_value.is_integer():
@@ -1830,11 +4035,6 @@ def get_regular_season_h2h(engine, team_a, team_b, year_filter=None):
             
             print("retrosheet_teamstats table exists")
             
-            # Check columns
-            columns = inspector.get_columns('retrosheet_teamstats')
-            column_names = [col['name'] for col in columns]
-            print(f"retrosheet_teamstats columns: {column_names}")
-            
             # Check total row count
             count_query = text("SELECT COUNT(*) FROM retrosheet_teamstats")
             result = conn.execute(count_query)
@@ -1852,44 +4052,22 @@ def get_regular_season_h2h(engine, team_a, team_b, year_filter=None):
         print(f"Team A ({team_a}) IDs: {team_a_ids}")
         print(f"Team B ({team_b}) IDs: {team_b_ids}")
 
-        # Build dynamic query with named parameters
-        team_a_placeholders = ",".join([f":team_a_{i}" for i in range(len(team_a_ids))])
-        team_b_placeholders = ",".join([f":team_b_{i}" for i in range(len(team_b_ids))])
-
-        base_query_str = f"""
-        SELECT team, opp, date, win
-        FROM retrosheet_teamstats 
-        WHERE (
-            (team IN ({team_a_placeholders}) AND opp IN ({team_b_placeholders})) OR 
-            (team IN ({team_b_placeholders}) AND opp IN ({team_a_placeholders}))
-        )
-        """
-
-        # Build parameter dictionary
-        params = {}
-        for i, team_id in enumerate(team_a_ids):
-            params[f"team_a_{i}"] = team_id
-        for i, team_id in enumerate(team_b_ids):
-            params[f"team_b_{i}"] = team_id
-
+        params = {"team_a_ids": team_a_ids, "team_b_ids": team_b_ids}
+        query = sql("h2h_games")
         if year_filter:
-            base_query_str += " AND CAST(date / 10000 AS INTEGER) = :year_filter"
             params["year_filter"] = int(year_filter)
+            query = sql("h2h_games_in_year")
 
-        base_query_str += " ORDER BY date, team"
-        
-        print(f"Final query: {base_query_str}")
         print(f"Query params: {params}")
 
-        # Execute query using SQLAlchemy text and pandas
-        query = text(base_query_str)
-        games_df = pd.read_sql_query(query, engine, params=params)
-        print(f"Query executed successfully, returned {len(games_df)} rows")
+        with engine.connect() as conn:
+            games = fetch_records(query, params, conn)
+        print(f"Query executed successfully, returned {len(games)} rows")
         
-        if not games_df.empty:
-            print(f"Sample results:\n{games_df.head()}")
+        if games:
+            print(f"Sample results: {games[:5]}")
 
-        if games_df.empty:
+        if not games:
             print("No games found between these teams")
             return {"team_a_wins": 0, "team_b_wins": 0, "ties": 0, "total_games": 0}
 
@@ -1897,7 +4075,7 @@ def get_regular_season_h2h(engine, team_a, team_b, year_filter=None):
         team_a_wins = 0
         team_b_wins = 0
 
-        for _, row in games_df.iterrows():
+        for row in games:
             game_winner = row['team']
             game_win_flag = row['win']
 
@@ -1907,7 +4085,7 @@ def get_regular_season_h2h(engine, team_a, team_b, year_filter=None):
                 elif game_winner in team_b_ids:
                     team_b_wins += 1
 
-        total_games = len(games_df) // 2
+        total_games = len(games) // 2
 
         result = {
             "team_a_wins": team_a_wins,
@@ -1937,66 +4115,48 @@ def get_head_to_head_record(team_a, team_b, year_filter=None):
     Get head-to-head record between two teams using SQLAlchemy
     """
     try:
-        from sqlalchemy import text
-        
-        # Get regular season head-to-head 
-        regular_season_record = get_regular_season_h2h(db_engine, team_a, team_b, year_filter)
-
-        # Get playoff data using SQLAlchemy
-        playoff_query = text("""
-        SELECT yearid, round, teamidwinner, teamidloser, wins, losses
-        FROM lahman_seriespost 
-        WHERE (
-            (teamidwinner = :team_a AND teamidloser = :team_b) OR 
-            (teamidwinner = :team_b AND teamidloser = :team_a)
-        )
-        """)
+        # Get regular season head-to-head 
+        regular_season_record = get_regular_season_h2h(db_engine, team_a, team_b, year_filter)
 
+        # Get playoff data
+        playoff_query = sql("h2h_series")
         params = {"team_a": team_a, "team_b": team_b}
 
         if year_filter:
-            playoff_query = text("""
-            SELECT yearid, round, teamidwinner, teamidloser, wins, losses
-            FROM lahman_seriespost 
-            WHERE (
-                (teamidwinner = :team_a AND teamidloser = :team_b) OR 
-                (teamidwinner = :team_b AND teamidloser = :team_a)
-            ) AND yearid = :year_filter
-            """)
+            playoff_query = sql("h2h_series_in_year")
             params["year_filter"] = year_filter
 
-        playoff_df = pd.read_sql_query(playoff_query, db_engine, params=params)
+        playoff_series = fetch_records(playoff_query, params)
 
         # Process playoff data
-        team_a_series_wins = len(playoff_df[playoff_df["teamidwinner"] == team_a])
-        team_b_series_wins = len(playoff_df[playoff_df["teamidwinner"] == team_b])
+        team_a_series_wins = sum(1 for row in playoff_series if row["teamidwinner"] == team_a)
+        team_b_series_wins = sum(1 for row in playoff_series if row["teamidwinner"] == team_b)
 
         team_a_game_wins = 0
         team_b_game_wins = 0
 
-        if "wins" in playoff_df.columns and "losses" in playoff_df.columns:
-            for _, row in playoff_df.iterrows():
-                wins_val = int(row["wins"]) if pd.notna(row["wins"]) else 0
-                losses_val = int(row["losses"]) if pd.notna(row["losses"]) else 0
+        for row in playoff_series:
+            wins_val = int(row["wins"]) if row["wins"] is not None else 0
+            losses_val = int(row["losses"]) if row["losses"] is not None else 0
 
-                if row["teamidwinner"] == team_a:
-                    team_a_game_wins += wins_val
-                    team_b_game_wins += losses_val
-                else:
-                    team_b_game_wins += wins_val
-                    team_a_game_wins += losses_val
+            if row["teamidwinner"] == team_a:
+                team_a_game_wins += wins_val
+                team_b_game_wins += losses_val
+            else:
+                team_b_game_wins += wins_val
+                team_a_game_wins += losses_val
 
         series_details = []
-        for _, row in playoff_df.iterrows():
+        for row in playoff_series:
             series_details.append(
                 {
                     "year": int(row["yearid"]),
                     "round": row["round"],
                     "winner": row["teamidwinner"],
                     "loser": row["teamidloser"],
-                    "series_wins": int(row["wins"]) if pd.notna(row["wins"]) else None,
+                    "series_wins": int(row["wins"]) if row["wins"] is not None else None,
                     "series_losses": (
-                        int(row["losses"]) if pd.notna(row["losses"]) else None
+                        int(row["losses"]) if row["losses"] is not None else None
                     ),
                 }
             )
@@ -2035,6 +4195,9 @@ def team_h2h():
         team_a_id, _ = parse_team_input(team_a)
         team_b_id, _ = parse_team_input(team_b)
         
+        if year and year.isdigit():
+            note_requested_season(year)
+
         # Use the parsed team IDs, not the original strings
         h2h_data = get_head_to_head_record(team_a_id, team_b_id, year)  # CHANGED THIS LINE
         
@@ -2043,7 +4206,1491 @@ def team_h2h():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# ─── TEAM GAME LOG ──────────────────────────────────────────────────────────
+# retrosheet_teamstats holds one row per team per game. The regular-season rows
+# are read once per process into NumPy columns, and team views are reduced from
+# those arrays once instead of re-reading game rows on every request.
+
+class TeamGameLog(NamedTuple):
+    team: np.ndarray  # team code per row
+    opp: np.ndarray
+    date: np.ndarray  # yyyymmdd
+    number: np.ndarray  # 0 single game, 1/2 doubleheader
+    home: np.ndarray  # bool
+    win: np.ndarray
+    loss: np.ndarray
+    tie: np.ndarray
+    runs: np.ndarray
+    runs_against: np.ndarray
+
+
+_team_game_log = None
+
+
+def get_team_game_log():
+    """Date-ordered regular-season game rows as NumPy columns (loaded once)"""
+    global _team_game_log
+    if _team_game_log is None:
+        rows = pd.DataFrame(fetch_records(sql("team_game_log")))
+        if rows.empty:
+            rows = pd.DataFrame(columns=TeamGameLog._fields + ("vishome", "b_r", "p_r", "gametype"))
+        rows = rows[rows["gametype"].isna() | (rows["gametype"] == "regular")]
+        rows = rows.sort_values(["date", "number", "team"], kind="stable")
+        counts = {col: pd.to_numeric(rows[col], errors="coerce").fillna(0).to_numpy(np.int64)
+                  for col in ("date", "number", "win", "loss", "tie", "b_r", "p_r")}
+        _team_game_log = TeamGameLog(
+            team=rows["team"].to_numpy(object),
+            opp=rows["opp"].to_numpy(object),
+            date=counts["date"],
+            number=counts["number"],
+            home=(rows["vishome"] == "h").to_numpy(bool),
+            win=counts["win"],
+            loss=counts["loss"],
+            tie=counts["tie"],
+            runs=counts["b_r"],
+            runs_against=counts["p_r"],
+        )
+        print(f"📅 Team game log loaded: {len(_team_game_log.date)} team-games")
+    return _team_game_log
+
+
+# [wins, losses, ties, runs, runs allowed] tallied per split
+SPLIT_VALUES = ("win", "loss", "tie", "runs", "runs_against")
+
+
+def _grouped_totals(log, *keys):
+    """(unique key rows, totals per key) for the log grouped by the given key columns"""
+    codes = []
+    labels = []
+    for key in keys:
+        code, uniques = pd.factorize(key)
+        codes.append(code)
+        labels.append(uniques)
+    unique_codes, inverse = np.unique(np.column_stack(codes), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    totals = np.column_stack([
+        np.bincount(inverse, weights=getattr(log, value), minlength=len(unique_codes))
+        for value in SPLIT_VALUES
+    ]).astype(np.int64)
+    groups = [tuple(labels[i][code] for i, code in enumerate(row)) for row in unique_codes]
+    return groups, totals
+
+
+_team_splits = None
+
+
+def get_team_split_cube():
+    """{(team, season): {"total", "home", "away", "opponents", "months"}} built in one pass"""
+    global _team_splits
+    if _team_splits is None:
+        log = get_team_game_log()
+        seasons = log.date // 10000
+        months = (log.date // 100) % 100
+        splits = {}
+
+        def entry(team, season):
+            return splits.setdefault((team, int(season)), {"opponents": {}, "months": {}})
+
+        for (team, season), line in zip(*_grouped_totals(log, log.team, seasons)):
+            entry(team, season)["total"] = line
+        for (team, season, home), line in zip(*_grouped_totals(log, log.team, seasons, log.home)):
+            entry(team, season)["home" if home else "away"] = line
+        for (team, season, opp), line in zip(*_grouped_totals(log, log.team, seasons, log.opp)):
+            entry(team, season)["opponents"][opp] = line
+        for (team, season, month), line in zip(*_grouped_totals(log, log.team, seasons, months)):
+            entry(team, season)["months"][int(month)] = line
+
+        _team_splits = splits
+    return _team_splits
+
+
+MONTH_NAMES = {3: "March", 4: "April", 5: "May", 6: "June", 7: "July", 8: "August", 9: "September", 10: "October", 11: "November"}
+
+
+def format_split_line(line):
+    """W-L line from a [wins, losses, ties, runs, runs allowed] tally"""
+    wins, losses, ties, runs, runs_against = (int(value) for value in line)
+    decisions = wins + losses
+    return {
+        "wins": wins,
+        "losses": losses,
+        "ties": ties,
+        "win_pct": round(wins / decisions, RATE_DECIMALS) if decisions else 0,
+        "runs": runs,
+        "runs_allowed": runs_against,
+        "run_differential": runs - runs_against,
+    }
+
+
+def combine_team_splits(entries, opponent_key=lambda opp: opp):
+    """Sum several (team, season) split entries, grouping opponents by opponent_key"""
+    empty = np.zeros(len(SPLIT_VALUES), dtype=np.int64)
+    combined = {"total": empty, "home": empty, "away": empty, "opponents": {}, "months": {}}
+    for split in entries:
+        for side in ("total", "home", "away"):
+            combined[side] = combined[side] + split.get(side, empty)
+        for opp, line in split["opponents"].items():
+            key = opponent_key(opp)
+            combined["opponents"][key] = combined["opponents"].get(key, empty) + line
+        for month, line in split["months"].items():
+            combined["months"][month] = combined["months"].get(month, empty) + line
+    return combined
+
+
+@app.route("/team/splits")
+def get_team_splits():
+    """A team-season's (or franchise's) record overall, home/away, by opponent and by month"""
+    try:
+        team = request.args.get("team", "").strip()
+        mode = request.args.get("mode", "season").lower()
+        if not team:
+            return jsonify({"error": "Enter team"}), 400
+        if mode not in ("season", "franchise"):
+            return jsonify({"error": "Invalid mode. Use 'season' or 'franchise'"}), 400
+
+        team_id, year = parse_team_input(team)
+        if year:
+            note_requested_season(year)  # only a year the request named, not the default below
+        franchise = get_franchise(team_id)
+        splits = get_team_split_cube()
+
+        if mode == "season":
+            year = year or 2025
+            entries = [splits[(tid, year)] for tid in franchise.team_ids if (tid, year) in splits]
+            opponent_key = lambda opp: opp
+        else:
+            entries = [split for (tid, season), split in splits.items()
+                       if tid in franchise.team_ids and (year is None or season == year)]
+            opponent_key = franchise_code  # BRO and LAN games are both "LAN"
+
+        if not entries:
+            return jsonify({"error": f"No game logs for '{team_id}'" + (f" in {year}" if year else "")}), 404
+
+        combined = combine_team_splits(entries, opponent_key)
+
+        return jsonify({
+            "team_id": team_id,
+            "mode": mode,
+            "year": year,
+            "total": format_split_line(combined["total"]),
+            "home": format_split_line(combined["home"]),
+            "away": format_split_line(combined["away"]),
+            "opponents": format_stat_table([
+                {"opponent": opp, **format_split_line(line)}
+                for opp, line in sorted(combined["opponents"].items())
+            ]),
+            "months": format_stat_table([
+                {"month": MONTH_NAMES.get(month, str(month)), **format_split_line(line)}
+                for month, line in sorted(combined["months"].items())
+            ]),
+        })
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+def _game_date(yyyymmdd):
+    value = int(yyyymmdd)
+    return f"{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}"
+
+
+def run_lengths(results, breaks=None):
+    """Run-length encode a result series: (starts, lengths, values), breaking also where breaks is True"""
+    if len(results) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty
+    boundary = results[1:] != results[:-1]
+    if breaks is not None:
+        boundary |= breaks
+    starts = np.concatenate(([0], np.flatnonzero(boundary) + 1))
+    lengths = np.diff(np.append(starts, len(results)))
+    return starts, lengths, results[starts]
+
+
+MAX_STREAKS = 25
+
+
+@lru_cache(maxsize=1024)
+def team_streaks(team_ids, opp_ids=None, year=None, across_seasons=False):
+    """Win and losing streaks for a set of team codes (optionally vs an opponent / in one season)"""
+    log = get_team_game_log()
+    mask = np.isin(log.team, team_ids)
+    if opp_ids:
+        mask &= np.isin(log.opp, opp_ids)
+    if year:
+        mask &= log.date // 10000 == year
+
+    dates = log.date[mask]
+    opponents = log.opp[mask]
+    # 1 win, -1 loss, 0 tie: a tie ends both kinds of streak
+    results = np.sign(log.win[mask] - log.loss[mask])
+    seasons = dates // 10000
+    starts, lengths, values = run_lengths(results, None if across_seasons else seasons[1:] != seasons[:-1])
+
+    def describe(index):
+        start, length = starts[index], lengths[index]
+        end = start + length - 1
+        return {
+            "length": int(length),
+            "start_date": _game_date(dates[start]),
+            "end_date": _game_date(dates[end]),
+            "opponents": sorted(set(opponents[start:end + 1])),
+        }
+
+    def longest(value):
+        candidates = np.flatnonzero(values == value)
+        order = candidates[np.argsort(-lengths[candidates], kind="stable")]
+        return [describe(index) for index in order[:MAX_STREAKS]]
+
+    current = None
+    if len(values) and values[-1] != 0:
+        current = dict(describe(len(values) - 1), type="W" if values[-1] > 0 else "L")
+
+    return {
+        "games": int(mask.sum()),
+        "win_streaks": longest(1),
+        "losing_streaks": longest(-1),
+        "current_streak": current,
+    }
+
+
+@app.route("/team/streaks")
+def get_team_streaks():
+    """Longest win and losing streaks for a franchise, optionally vs one opponent or in one season"""
+    try:
+        team = request.args.get("team", "").strip()
+        opponent = request.args.get("opponent", "").strip()
+        if not team:
+            return jsonify({"error": "Enter team"}), 400
+
+        limit = request.args.get("limit", "5")
+        limit = min(int(limit), MAX_STREAKS) if limit.isdigit() else 5
+
+        team_id, year = parse_team_input(team)
+        opp_id = parse_team_input(opponent)[0] if opponent else None
+        # Streaks against one opponent usually carry over from season to season
+        across_seasons = request.args.get("span", "all" if opp_id else "season").lower() == "all"
+
+        streaks = team_streaks(
+            tuple(get_franchise_team_ids(team_id)),
+            tuple(get_franchise_team_ids(opp_id)) if opp_id else None,
+            year,
+            across_seasons,
+        )
+        if not streaks["games"]:
+            return jsonify({"error": f"No game logs for '{team_id}'" + (f" vs '{opp_id}'" if opp_id else "")}), 404
+
+        if year:
+            note_requested_season(year)
+
+        return jsonify({
+            "team_id": team_id,
+            "opponent": opp_id,
+            "year": year,
+            "span": "all" if across_seasons else "season",
+            "games": streaks["games"],
+            "win_streaks": streaks["win_streaks"][:limit],
+            "losing_streaks": streaks["losing_streaks"][:limit],
+            "current_streak": streaks["current_streak"],
+        })
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+class SeasonStandings(NamedTuple):
+    dates: np.ndarray  # every date with a game, ascending
+    teams: np.ndarray  # team codes (columns)
+    wins: np.ndarray  # cumulative wins, dates x teams
+    losses: np.ndarray
+    leagues: tuple  # (lgid, divid) per team
+    names: tuple
+
+
+_season_standings = {}
+
+
+def get_season_standings(year):
+    """Cumulative W/L arrays for a season (built once per season), or None without game logs"""
+    if year not in _season_standings:
+        log = get_team_game_log()
+        lo, hi = np.searchsorted(log.date, [year * 10000, (year + 1) * 10000])
+        if lo == hi:
+            return None
+
+        team_index, teams = pd.factorize(log.team[lo:hi])
+        dates, date_index = np.unique(log.date[lo:hi], return_inverse=True)
+        wins = np.zeros((len(dates), len(teams)), dtype=np.int64)
+        losses = np.zeros_like(wins)
+        np.add.at(wins, (date_index, team_index), log.win[lo:hi])
+        np.add.at(losses, (date_index, team_index), log.loss[lo:hi])
+
+        # Game log columns are Retrosheet codes, which differ from Lahman's for some clubs (MIL vs ML4)
+        info = {
+            row["teamidretro"] or row["teamid"]: row
+            for row in fetch_records(sql("standings_teams"), {"year": year})
+        }
+        _season_standings[year] = SeasonStandings(
+            dates=dates,
+            teams=np.asarray(teams, dtype=object),
+            wins=wins.cumsum(axis=0),
+            losses=losses.cumsum(axis=0),
+            leagues=tuple((info.get(team, {}).get("lgid") or "", info.get(team, {}).get("divid")) for team in teams),
+            names=tuple(info.get(team, {}).get("name") or team for team in teams),
+        )
+    return _season_standings[year]
+
+
+def games_back(standings, wins, losses):
+    """Games behind each team's division leader, for W/L rows (one row per date)"""
+    diff = wins - losses
+    behind = np.zeros(diff.shape, dtype=float)
+    for group in set(standings.leagues):
+        columns = [i for i, league in enumerate(standings.leagues) if league == group]
+        block = diff[..., columns]
+        behind[..., columns] = (block.max(axis=-1, keepdims=True) - block) / 2
+    return behind
+
+
+@app.route("/standings")
+def get_standings():
+    """Division standings as of a date, or a season's games-back timeline"""
+    try:
+        date = request.args.get("date", "").replace("-", "")
+        year = request.args.get("year", "")
+        timeline = request.args.get("timeline", "").lower() in ("1", "true", "yes")
+
+        if date.isdigit() and len(date) == 8:
+            date, year = int(date), int(date) // 10000
+        elif year.isdigit():
+            date, year = None, int(year)
+        else:
+            return jsonify({"error": "Pass date=YYYYMMDD or year=YYYY"}), 400
+
+        standings = get_season_standings(year)
+        if standings is None:
+            return jsonify({"error": f"No game logs for {year}"}), 404
+        note_requested_season(year)
+
+        if timeline:
+            behind = games_back(standings, standings.wins, standings.losses)
+            return jsonify({
+                "year": year,
+                "dates": [_game_date(d) for d in standings.dates],
+                "teams": [
+                    {
+                        "team_id": team,
+                        "name": standings.names[i],
+                        "league": standings.leagues[i][0],
+                        "division": standings.leagues[i][1],
+                        "games_back": behind[:, i].tolist(),
+                    }
+                    for i, team in enumerate(standings.teams)
+                ],
+            })
+
+        # Last date with games on or before the requested one (season end without a date)
+        row = len(standings.dates) - 1 if date is None else np.searchsorted(standings.dates, date, side="right") - 1
+        if row < 0:
+            wins = losses = np.zeros(len(standings.teams), dtype=np.int64)
+        else:
+            wins, losses = standings.wins[row], standings.losses[row]
+        behind = games_back(standings, wins, losses)
+
+        divisions = {}
+        for i, team in enumerate(standings.teams):
+            decisions = wins[i] + losses[i]
+            divisions.setdefault(standings.leagues[i], []).append({
+                "team_id": team,
+                "name": standings.names[i],
+                "wins": int(wins[i]),
+                "losses": int(losses[i]),
+                "win_pct": round(wins[i] / decisions, RATE_DECIMALS) if decisions else 0,
+                "games_back": float(behind[i]),
+            })
+
+        return jsonify({
+            "year": year,
+            "date": _game_date(date if date is not None else standings.dates[-1]),
+            "divisions": [
+                {
+                    "league": league,
+                    "division": division,
+                    "teams": sorted(teams, key=lambda t: (t["games_back"], -t["win_pct"], t["team_id"])),
+                }
+                for (league, division), teams in sorted(divisions.items(), key=lambda item: (item[0][0], item[0][1] or ""))
+            ],
+        })
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+# ─── TEAM ANALYTICS ─────────────────────────────────────────────────────────
+# Pythagorean record, luck and run environment for every lahman_teams row,
+# computed column-wise in one pass by the startup warm-up. /team/analytics
+# filters and sorts that table ("luckiest teams since 1960") without touching
+# the database again.
+
+PYTHAGOREAN_EXPONENT = 1.83
+
+TEAM_ANALYTICS_FIELDS = [
+    ("year", "yearid", 0), ("team_id", "teamid", None), ("franchise", "franchise", None),
+    ("name", "name", None), ("league", "lgid", None), ("games", "g", 0), ("wins", "w", 0),
+    ("losses", "l", 0), ("runs", "r", 0), ("runs_allowed", "ra", 0), ("run_diff", "run_diff", 0),
+    ("pythag_win_pct", "pythag_win_pct", RATE_DECIMALS), ("pythag_wins", "pythag_wins", PER_GAME_DECIMALS),
+    ("pythag_losses", "pythag_losses", PER_GAME_DECIMALS), ("luck", "luck", PER_GAME_DECIMALS),
+    ("rpg", "rpg", ERA_DECIMALS), ("rapg", "rapg", ERA_DECIMALS), ("league_rpg", "league_rpg", ERA_DECIMALS),
+    ("run_environment", "run_environment", 0), ("runs_plus", "runs_plus", 0),
+    ("runs_allowed_plus", "runs_allowed_plus", 0), ("neutral_run_diff", "neutral_run_diff", 0),
+]
+TEAM_ANALYTICS_SORTS = {key for key, _, _ in TEAM_ANALYTICS_FIELDS} - {"team_id", "franchise", "name", "league"}
+
+MAX_TEAM_ANALYTICS_ROWS = 500
+
+
+def build_team_analytics(teams):
+    """Analytics columns for a lahman_teams frame, all rows at once"""
+    frame = teams.copy()
+    for col in ("g", "w", "l", "r", "ra"):
+        frame[col] = pd.to_numeric(frame[col], errors="coerce").fillna(0)
+
+    games = frame["g"].where(frame["g"] > 0)
+    decisions = frame["w"] + frame["l"]
+    runs_x = frame["r"] ** PYTHAGOREAN_EXPONENT
+    allowed_x = frame["ra"] ** PYTHAGOREAN_EXPONENT
+
+    frame["franchise"] = frame["teamid"].map(franchise_code)
+    frame["run_diff"] = frame["r"] - frame["ra"]
+    frame["pythag_win_pct"] = (runs_x / (runs_x + allowed_x)).fillna(0.5)
+    frame["pythag_wins"] = frame["pythag_win_pct"] * decisions
+    frame["pythag_losses"] = decisions - frame["pythag_wins"]
+    frame["luck"] = frame["w"] - frame["pythag_wins"]
+    frame["rpg"] = (frame["r"] / games).fillna(0)
+    frame["rapg"] = (frame["ra"] / games).fillna(0)
+
+    # Run environment: runs per team-game in the team's league and season, vs all of history
+    league = frame.groupby(["yearid", "lgid"], dropna=False)
+    frame["league_rpg"] = (league["r"].transform("sum") / league["g"].transform("sum").where(lambda g: g > 0)).fillna(0)
+    overall_rpg = frame["r"].sum() / frame["g"].sum() if frame["g"].sum() else 0
+    league_rpg = frame["league_rpg"].where(frame["league_rpg"] > 0)
+    frame["run_environment"] = (100 * league_rpg / overall_rpg).fillna(100) if overall_rpg else 100
+    frame["runs_plus"] = (100 * frame["rpg"] / league_rpg).fillna(100)
+    frame["runs_allowed_plus"] = (100 * frame["rapg"] / league_rpg).fillna(100)
+    # Run differential restated in an average run environment
+    frame["neutral_run_diff"] = (frame["run_diff"] * overall_rpg / league_rpg).fillna(0)
+
+    return frame
+
+
+_team_analytics = None
+_team_analytics_lock = threading.Lock()
+
+
+def get_team_analytics():
+    """The analytics table for every team-season (built once per process)"""
+    global _team_analytics
+    if _team_analytics is None:
+        with _team_analytics_lock:
+            if _team_analytics is None:
+                _team_analytics = build_team_analytics(pd.DataFrame(fetch_records(sql("team_analytics_source"))))
+    return _team_analytics
+
+
+@app.route("/team/analytics")
+def get_team_analytics_table():
+    """Team-seasons with Pythagorean record, luck and run environment, filtered and sorted"""
+    try:
+        sort = request.args.get("sort", "luck").lower()
+        if sort not in TEAM_ANALYTICS_SORTS:
+            return jsonify({"error": f"Invalid sort. Use one of: {', '.join(sorted(TEAM_ANALYTICS_SORTS))}"}), 400
+        ascending = request.args.get("order", "desc").lower() == "asc"
+
+        limit = request.args.get("limit", "25")
+        limit = min(int(limit), MAX_TEAM_ANALYTICS_ROWS) if limit.isdigit() else 25
+
+        frame = get_team_analytics()
+        since, until = request.args.get("since", ""), request.args.get("until", "")
+        if since.isdigit():
+            frame = frame[frame["yearid"] >= int(since)]
+        if until.isdigit():
+            frame = frame[frame["yearid"] <= int(until)]
+        league = request.args.get("league", "").upper()
+        if league:
+            frame = frame[frame["lgid"] == league]
+        team = request.args.get("team", "").strip()
+        if team:
+            team_id, year = parse_team_input(team)
+            frame = frame[frame["teamid"].isin(get_franchise_team_ids(team_id))]
+            if year:
+                frame = frame[frame["yearid"] == year]
+
+        column = dict((key, column) for key, column, _ in TEAM_ANALYTICS_FIELDS)[sort]
+        frame = frame.sort_values([column, "yearid"], ascending=[ascending, True], kind="stable").head(limit)
+
+        if until.isdigit():
+            note_requested_season(until)
+
+        return jsonify({
+            "sort": sort,
+            "order": "asc" if ascending else "desc",
+            "count": len(frame),
+            "teams": format_stat_table(frame_records(frame, TEAM_ANALYTICS_FIELDS)),
+        })
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+# ─── STATIC SNAPSHOTS ───────────────────────────────────────────────────────
+# `flask --app app export-snapshots` pre-renders every player and team response
+# into content-addressed files (objects/<sha[:2]>/<sha>.json) plus a manifest
+# keyed by request. With SNAPSHOT_DIR set, handlers serve those files and only
+# compute live on a miss, a stale manifest or a season that is still running.
+
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR")
+
+_snapshot_manifest = None
+
+
+def snapshot_key(*parts):
+    """Manifest key for a pre-rendered response, e.g. player/ruthba01/hitter/career"""
+    return "/".join(str(part) for part in parts)
+
+
+def get_snapshot_manifest():
+    """Snapshot entries for the loaded dataset version ({} when missing or stale)"""
+    global _snapshot_manifest
+
+    if _snapshot_manifest is None:
+        _snapshot_manifest = {}
+        try:
+            with open(os.path.join(SNAPSHOT_DIR, "manifest.json")) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Snapshot manifest unavailable: {e}")
+            return _snapshot_manifest
+
+        if manifest.get("dataset_version") != get_dataset_version():
+            print("Snapshot manifest is for another dataset version, serving live")
+            return _snapshot_manifest
+
+        _snapshot_manifest = manifest.get("entries", {})
+
+    return _snapshot_manifest
+
+
+# Query options that reshape a player payload; snapshots hold only the default shape
+SNAPSHOT_BYPASS_ARGS = ("align", "through_age", "neutralize")
+
+
+def serve_snapshot(key):
+    """Pre-rendered response for key, or None to compute it live"""
+    if not SNAPSHOT_DIR:
+        return None
+    if has_request_context() and (
+        request.args.get("format", "").lower() == "columnar"
+        or any(request.args.get(arg) for arg in SNAPSHOT_BYPASS_ARGS)
+    ):
+        return None
+
+    entry = get_snapshot_manifest().get(key)
+    if entry is None or entry["latest_season"] >= current_season():
+        return None
+
+    digest = entry["object"]
+    try:
+        with open(os.path.join(SNAPSHOT_DIR, "objects", digest[:2], f"{digest}.json"), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    # The handler has already noted any season the request named, as it does for a live response
+    return app.response_class(data, mimetype="application/json")
+
+
+def _write_snapshot(out_dir, data, latest_season):
+    """Store response bytes under their content hash and return the manifest entry"""
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.join(out_dir, "objects", digest[:2], f"{digest}.json")
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    return {"object": digest, "latest_season": int(latest_season)}
+
+
+def _init_snapshot_worker():
+    """Per-process setup: fresh DB connections, no snapshot reads, warm league averages"""
+    global _snapshot_manifest
+    db_engine.dispose(close=False)
+    _snapshot_manifest = {}
+    _batch_load_league_averages(range(1871, current_season() + 1))
+
+
+def _group_rows_by_player(rows, key="playerid"):
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row.pop(key), []).append(row)
+    return grouped
+
+
+def _export_player_chunk(playerids, out_dir):
+    """Render career and season snapshots for a batch of players with shared queries"""
+    params = {"playerids": list(playerids)}
+    season = current_season()
+    entries = {}
+
+    with app.app_context(), db_engine.connect() as conn:
+        batting = _group_rows_by_player(fetch_records(sql("hitter_stats_many"), params, conn))
+        pitching = _group_rows_by_player(fetch_records(sql("pitcher_stats_many"), params, conn))
+
+        war = {}
+        for row in fetch_records(sql("season_war_many"), params, conn):
+            war.setdefault(row["playerid"], {}).setdefault(int(row["yearid"]), []).append(
+                float(row["war"]) if row["war"] is not None else 0
+            )
+
+        for playerid in playerids:
+            if playerid not in batting and playerid not in pitching:
+                continue
+
+            awards_data = get_player_awards(playerid, conn)
+            photo_url = get_photo_url_for_player(playerid, conn)
+
+            for player_type, build_payload, rows in (
+                ("hitter", hitter_stats_payload, batting.get(playerid)),
+                ("pitcher", pitcher_stats_payload, pitching.get(playerid)),
+            ):
+                if not rows or rows[0]["yearid"] >= season:
+                    continue
+
+                for mode in ("career", "season"):
+                    payload, status = build_payload(
+                        playerid, mode, photo_url, rows, awards_data, war.get(playerid, {})
+                    )
+                    if status == 200:
+                        entries[snapshot_key("player", playerid, player_type, mode)] = _write_snapshot(
+                            out_dir, app.json.response(payload).get_data(), rows[0]["yearid"]
+                        )
+
+    return entries
+
+
+def _export_team(team_id, out_dir):
+    """Render season, franchise and timeline snapshots for one team code"""
+    franchise_ids = get_franchise_team_ids(team_id)
+    season = current_season()
+    entries = {}
+
+    rows = fetch_records(sql("franchise_seasons"), {"team_ids": franchise_ids})
+    if not rows:
+        return entries
+
+    renders = [
+        (int(row["yearid"]), "season", int(row["yearid"]))
+        for row in rows if row["teamid"] == team_id
+    ]
+    franchise_latest = max(int(row["yearid"]) for row in rows)
+    renders += [(None, mode, franchise_latest) for mode in ("franchise", "timeline")]
+
+    with app.app_context():
+        for year, mode, latest_season in renders:
+            if latest_season >= season:
+                continue
+
+            rv = handle_combined_team_stats(team_id, year, mode)
+            response, status = rv if isinstance(rv, tuple) else (rv, rv.status_code)
+            if status == 200:
+                entries[snapshot_key("team", team_id, mode, year or "")] = _write_snapshot(
+                    out_dir, response.get_data(), latest_season
+                )
+
+    return entries
+
+
+@app.cli.command("export-snapshots")
+@click.option("--out", "out_dir", default="snapshots", show_default=True, help="Output directory")
+@click.option("--workers", default=os.cpu_count(), type=int, help="Worker processes")
+@click.option("--chunk-size", default=250, show_default=True, help="Players per batched query")
+def export_snapshots(out_dir, workers, chunk_size):
+    """Pre-render every player and team response as static JSON"""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    version = get_dataset_version()
+    if version is None:
+        raise click.ClickException("Could not fingerprint the dataset (is DATABASE_URL reachable?)")
+
+    with db_engine.connect() as conn:
+        playerids = [row[0] for row in conn.execute(sql("all_playerids"))]
+    db_engine.dispose()
+
+    chunks = [playerids[i:i + chunk_size] for i in range(0, len(playerids), chunk_size)]
+    entries = {}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_snapshot_worker) as pool:
+        jobs = [pool.submit(_export_player_chunk, chunk, out_dir) for chunk in chunks]
+        jobs += [pool.submit(_export_team, team_id, out_dir) for team_id in TEAMS]
+
+        for done, job in enumerate(as_completed(jobs), 1):
+            entries.update(job.result())
+            if done % 10 == 0 or done == len(jobs):
+                click.echo(f"{done}/{len(jobs)} batches, {len(entries)} snapshots")
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    with open(f"{manifest_path}.tmp", "w") as f:
+        json.dump({"dataset_version": version, "entries": entries}, f, separators=(",", ":"))
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    click.echo(f"Wrote {len(entries)} snapshots for dataset {version} to {out_dir}")
+
+
+# ─── VERSUS FINDER ──────────────────────────────────────────────────────────
+# Batter-vs-pitcher matchups from Retrosheet play-by-play (*.EVA/*.EVN event
+# files). The events are folded at ingest into one retrosheet_matchups row per
+# (season, batter, pitcher) with the plate-appearance counts, keyed by Lahman
+# playerid and indexed on (batter, pitcher). A /versus lookup reads only that
+# pair's rows.
+
+MATCHUP_COUNT_COLUMNS = ("pa", "ab", "h", "2b", "3b", "hr", "bb", "hbp", "so", "sf", "sh")
+
+# Event prefixes that are not the end of a plate appearance (checked first, so
+# "SB" isn't read as a single, "WP" as a walk, "DI" as a double, ...)
+NON_PA_EVENTS = ("NP", "SB", "CS", "PO", "WP", "PB", "BK", "DI", "OA", "FLE")
+
+
+def classify_event(event):
+    """Counts a Retrosheet play event adds to the batter's line, or None if no PA ended"""
+    main, *modifiers = event.split(".", 1)[0].split("/")
+    if not main or main.startswith(NON_PA_EVENTS):
+        return None
+
+    if main.startswith("HP"):
+        return {"hbp": 1}
+    if main.startswith("H"):
+        return {"ab": 1, "h": 1, "hr": 1}
+    if main.startswith("D"):
+        return {"ab": 1, "h": 1, "2b": 1}
+    if main.startswith("T"):
+        return {"ab": 1, "h": 1, "3b": 1}
+    if main.startswith("S"):
+        return {"ab": 1, "h": 1}
+    if main.startswith(("W", "I")):
+        return {"bb": 1}
+    if main.startswith("K"):
+        return {"ab": 1, "so": 1}
+    if main.startswith("C"):
+        return {}  # catcher's interference: a PA but not an at-bat
+    if "SF" in modifiers:
+        return {"sf": 1}
+    if "SH" in modifiers:
+        return {"sh": 1}
+    if main[0].isdigit() or main.startswith(("E", "FC")):
+        return {"ab": 1}
+    return None
+
+
+def parse_event_file(path):
+    """{(season, batter retroid, pitcher retroid): counts} for one Retrosheet event file"""
+    matchups = {}
+    season = None
+    pitchers = {}  # "0" visitors / "1" home → pitcher currently on the mound
+
+    with open(path, encoding="latin-1") as f:
+        for line in f:
+            fields = line.rstrip("\r\n").split(",")
+            record = fields[0]
+
+            if record == "id":
+                season = int(fields[1][3:7])
+                pitchers = {}
+            elif record in ("start", "sub") and len(fields) >= 6 and fields[5] == "1":
+                pitchers[fields[3]] = fields[1]
+            elif record == "play" and len(fields) >= 7:
+                counts = classify_event(fields[6])
+                pitcher = pitchers.get("1" if fields[2] == "0" else "0")
+                if counts is None or pitcher is None:
+                    continue
+
+                line_counts = matchups.setdefault((season, fields[3], pitcher), dict.fromkeys(MATCHUP_COUNT_COLUMNS, 0))
+                line_counts["pa"] += 1
+                for column, value in counts.items():
+                    line_counts[column] += value
+
+    return matchups
+
+
+def events_to_matchups(paths, people=None):
+    """retrosheet_matchups rows from event files, with Retrosheet ids mapped to Lahman playerids"""
+    totals = {}
+    for path in paths:
+        for key, counts in parse_event_file(path).items():
+            if key in totals:
+                for column in MATCHUP_COUNT_COLUMNS:
+                    totals[key][column] += counts[column]
+            else:
+                totals[key] = counts
+
+    if not totals:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(
+        [(season, batter, pitcher, *counts.values()) for (season, batter, pitcher), counts in totals.items()],
+        columns=["yearid", "batter", "pitcher", *MATCHUP_COUNT_COLUMNS],
+    )
+
+    # People.csv carries each player's retroID; unmatched ids are kept as-is
+    if people is not None and "retroid" in people.columns:
+        to_playerid = people.dropna(subset=["retroid"]).set_index("retroid")["playerid"]
+        for column in ("batter", "pitcher"):
+            df[column] = df[column].map(to_playerid).fillna(df[column])
+
+    return df.sort_values(["yearid", "batter", "pitcher"]).reset_index(drop=True)
+
+
+def build_versus_line(counts):
+    """Matchup line with slash stats from summed counts"""
+    ab, h, bb, hbp, sf = (int(counts[col] or 0) for col in ("ab", "h", "bb", "hbp", "sf"))
+    doubles, triples, hr = (int(counts[col] or 0) for col in ("2b", "3b", "hr"))
+
+    total_bases = h + doubles + 2 * triples + 3 * hr
+    obp_denominator = ab + bb + hbp + sf
+    ba = h / ab if ab > 0 else 0
+    obp = (h + bb + hbp) / obp_denominator if obp_denominator > 0 else 0
+    slg = total_bases / ab if ab > 0 else 0
+
+    return {
+        "pa": int(counts["pa"] or 0),
+        "at_bats": ab,
+        "hits": h,
+        "doubles": doubles,
+        "triples": triples,
+        "home_runs": hr,
+        "walks": bb,
+        "hit_by_pitch": hbp,
+        "strikeouts": int(counts["so"] or 0),
+        "sacrifice_flies": sf,
+        "ba": round(ba, RATE_DECIMALS),
+        "obp": round(obp, RATE_DECIMALS),
+        "slg": round(slg, RATE_DECIMALS),
+        "ops": round(obp + slg, RATE_DECIMALS),
+    }
+
+
+def _versus_player(role):
+    """(NameEntry, None) for the batter/pitcher query args, or (None, error response)"""
+    playerid = request.args.get(f"{role}_id", "").strip()
+    name = request.args.get(role, "")
+
+    if playerid:
+        entry = get_player_entry(playerid)
+    elif " " in name:
+        entry, suggestions = resolve_player(name)
+        if entry is None and suggestions:
+            return None, ambiguous_player_response(name, suggestions, role=role)
+    else:
+        return None, (jsonify({"error": f"Enter the {role}'s full name or {role}_id"}), 400)
+
+    if entry is None:
+        return None, (jsonify({"error": f"{role.title()} not found", "role": role}), 404)
+    return entry, None
+
+
+@app.route("/versus")
+def versus():
+    """Career and season-by-season line for a batter against a pitcher"""
+    batter, error = _versus_player("batter")
+    if error:
+        return error
+    pitcher, error = _versus_player("pitcher")
+    if error:
+        return error
+
+    try:
+        seasons = fetch_records(sql("versus_seasons"), {"batter": batter.playerid, "pitcher": pitcher.playerid})
+    except Exception as e:
+        print(f"/versus error: {e}")
+        return jsonify({"error": "Matchup data unavailable"}), 503
+
+    return jsonify({
+        "batter": {"playerid": batter.playerid, "name": f"{batter.namefirst} {batter.namelast}"},
+        "pitcher": {"playerid": pitcher.playerid, "name": f"{pitcher.namefirst} {pitcher.namelast}"},
+        "totals": build_versus_line(_sum_columns(seasons, MATCHUP_COUNT_COLUMNS)),
+        "seasons": format_stat_table([
+            {"year": row["yearid"], **build_versus_line(row)} for row in seasons
+        ]),
+    })
+
+
+# ─── LOCAL DATABASE BUILD ───────────────────────────────────────────────────
+# `flask --app app build-local-db` turns the Lahman CSVs, the WAR file and
+# Retrosheet game logs into the embedded database read by DATA_BACKEND=sqlite
+# (or =duckdb when --out ends in .duckdb). Tables and columns match Postgres.
+
+# Retrosheet game log fields (GLyyyy.TXT, no header row)
+GAMELOG_DATE, GAMELOG_NUMBER, GAMELOG_VISITOR, GAMELOG_HOME = 0, 1, 3, 6
+GAMELOG_VISITOR_SCORE, GAMELOG_HOME_SCORE = 9, 10
+
+def _read_csv(path, **kwargs):
+    """Read a source CSV, falling back to latin-1 for older Lahman releases"""
+    try:
+        return pd.read_csv(path, low_memory=False, **kwargs)
+    except UnicodeDecodeError:
+        return pd.read_csv(path, low_memory=False, encoding="latin-1", **kwargs)
+
+
+def load_lahman_csvs(lahman_dir):
+    """{table: DataFrame} for every Lahman CSV, as lahman_<file> with lowercase columns"""
+    import glob
+
+    tables = {}
+    for path in sorted(glob.glob(os.path.join(lahman_dir, "*.csv"))):
+        df = _read_csv(path)
+        df.columns = [col.lower() for col in df.columns]
+        tables[f"lahman_{os.path.splitext(os.path.basename(path))[0].lower()}"] = df
+    return tables
+
+
+def gamelogs_to_teamstats(paths):
+    """Two retrosheet_teamstats rows (one per side) for every game in the game logs"""
+    frames = []
+    for path in paths:
+        logs = _read_csv(path, header=None, usecols=[
+            GAMELOG_DATE, GAMELOG_NUMBER, GAMELOG_VISITOR, GAMELOG_HOME,
+            GAMELOG_VISITOR_SCORE, GAMELOG_HOME_SCORE,
+        ])
+        home_runs, vis_runs = logs[GAMELOG_HOME_SCORE], logs[GAMELOG_VISITOR_SCORE]
+        gid = logs[GAMELOG_HOME] + logs[GAMELOG_DATE].astype(str) + logs[GAMELOG_NUMBER].astype(str)
+
+        for side, team, opp, runs, runs_against in (
+            ("h", GAMELOG_HOME, GAMELOG_VISITOR, home_runs, vis_runs),
+            ("v", GAMELOG_VISITOR, GAMELOG_HOME, vis_runs, home_runs),
+        ):
+            frames.append(pd.DataFrame({
+                "gid": gid,
+                "team": logs[team],
+                "opp": logs[opp],
+                "date": logs[GAMELOG_DATE].astype(int),
+                "number": logs[GAMELOG_NUMBER].astype(int),
+                "vishome": side,
+                "win": (runs > runs_against).astype(int),
+                "loss": (runs < runs_against).astype(int),
+                "tie": (runs == runs_against).astype(int),
+                "b_r": runs,
+                "p_r": runs_against,
+                "gametype": "regular",
+            }))
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True).sort_values(["date", "gid", "vishome"])
+
+
+def load_source_tables(lahman_dir, war_csv=None, gamelog_glob=None, events_glob=None):
+    """{table: DataFrame} for the Lahman CSVs plus the optional WAR file, game logs and event files"""
+    import glob
+
+    tables = load_lahman_csvs(lahman_dir)
+    if not tables:
+        raise click.ClickException(f"No Lahman CSVs found in {lahman_dir}")
+
+    if war_csv:
+        tables["jeffbagwell_war"] = _read_csv(war_csv)
+
+    if gamelog_glob:
+        teamstats = gamelogs_to_teamstats(sorted(glob.glob(gamelog_glob)))
+        if not teamstats.empty:
+            tables["retrosheet_teamstats"] = teamstats
+
+    if events_glob:
+        matchups = events_to_matchups(sorted(glob.glob(events_glob)), tables.get("lahman_people"))
+        if not matchups.empty:
+            tables["retrosheet_matchups"] = matchups
+
+    return tables
+
+
+def write_local_db(tables, out_path):
+    """Write {table: DataFrame} to a fresh SQLite or DuckDB file and index it"""
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp_path = f"{out_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    if out_path.endswith(".duckdb"):
+        import duckdb
+
+        conn = duckdb.connect(tmp_path)
+        for table, df in tables.items():
+            conn.register("source_df", df)
+            conn.execute(f"CREATE TABLE {table} AS SELECT * FROM source_df")
+            conn.unregister("source_df")
+    else:
+        import sqlite3
+
+        conn = sqlite3.connect(tmp_path)
+        for table, df in tables.items():
+            df.to_sql(table, conn, index=False, chunksize=10000)
+
+    for table, statement in index_statements("duckdb" if out_path.endswith(".duckdb") else "sqlite"):
+        if table in tables:
+            conn.execute(statement)
+
+    if not out_path.endswith(".duckdb"):
+        conn.commit()
+        conn.execute("ANALYZE")
+    conn.close()
+    os.replace(tmp_path, out_path)
+
+
+@app.cli.command("build-local-db")
+@click.option("--lahman", "lahman_dir", required=True, help="Directory of Lahman CSVs (People.csv, Batting.csv, ...)")
+@click.option("--war", "war_csv", help="JEFFBAGWELL WAR CSV (key_bbref, year_ID, team_ID, WAR162)")
+@click.option("--gamelogs", "gamelog_glob", help="Retrosheet game logs, e.g. 'retrosheet/GL*.TXT'")
+@click.option("--events", "events_glob", help="Retrosheet event files, e.g. 'retrosheet/*.EV?'")
+@click.option("--out", "out_path", default=LOCAL_DB_PATH, show_default=True, help="SQLite file (.duckdb for DuckDB)")
+def build_local_db(lahman_dir, war_csv, gamelog_glob, events_glob, out_path):
+    """Build the embedded read-only database from the source files"""
+    tables = load_source_tables(lahman_dir, war_csv, gamelog_glob, events_glob)
+
+    for table, df in tables.items():
+        click.echo(f"{table}: {len(df)} rows")
+
+    write_local_db(tables, out_path)
+    click.echo(f"Wrote {out_path}; run with DATA_BACKEND={'duckdb' if out_path.endswith('.duckdb') else 'sqlite'} LOCAL_DB_PATH={out_path}")
+
+
+# ─── PARQUET INGEST ─────────────────────────────────────────────────────────
+# `flask --app app ingest` checks the source files against the columns the
+# queries above read, then writes year-partitioned Parquet
+# (<table>/year=YYYY/part.parquet). Partitions whose content hash is unchanged
+# are skipped, so a yearly refresh only rewrites the new season. With
+# --load-postgres, partitions that differ from what was last loaded into that
+# database replace their rows via COPY. Parquet and Postgres keep separate
+# manifests, each saved only once its writes have landed, so a failed or
+# skipped load is retried on the next run instead of being recorded as done.
+
+INGEST_MANIFEST = "_ingest_manifest.json"
+POSTGRES_MANIFEST = "_postgres_manifest.json"  # database URL -> table -> partition hashes loaded
+
+# table -> (partition year column, columns the app's queries read)
+SOURCE_SCHEMAS = {
+    "lahman_people": (None, ["playerid", "namefirst", "namelast", "namegiven", "debut", "finalgame", "birthyear"]),
+    "lahman_batting": ("yearid", ["playerid", "yearid", "teamid", "g", "ab", "h", "2b", "3b", "hr", "rbi", "sb", "bb", "hbp", "sf", "sh"]),
+    "lahman_pitching": ("yearid", ["playerid", "yearid", "teamid", "w", "l", "g", "gs", "cg", "sho", "sv", "ipouts", "h", "er", "hr", "bb", "so", "era"]),
+    "lahman_fielding": ("yearid", ["playerid", "yearid", "pos", "g"]),
+    "lahman_awardsplayers": ("yearid", ["playerid", "awardid", "yearid", "lgid", "tie", "notes"]),
+    "lahman_allstarfull": ("yearid", ["playerid", "yearid"]),
+    "lahman_seriespost": ("yearid", ["yearid", "round", "teamidwinner", "teamidloser", "wins", "losses"]),
+    "lahman_teams": ("yearid", [
+        "yearid", "lgid", "teamid", "divid", "name", "g", "w", "l", "r", "ra",
+        "ab", "h", "2b", "3b", "hr", "bb", "so", "sb", "hbp", "sf",
+        "ipouts", "er", "cg", "sho", "sv", "ha", "hra", "bba", "soa", "teamidbr", "teamidretro",
+    ]),
+    "jeffbagwell_war": ("year_id", ["key_bbref", "year_id", "team_id", "war162"]),
+    "retrosheet_teamstats": ("date", ["team", "opp", "date", "number", "vishome", "win", "loss", "tie", "b_r", "p_r", "gametype"]),
+    "retrosheet_matchups": ("yearid", ["yearid", "batter", "pitcher", *MATCHUP_COUNT_COLUMNS]),
+}
+
+
+def normalize_source_tables(tables):
+    """Lowercase every column (Postgres folds unquoted names) and use nullable dtypes"""
+    for table, df in tables.items():
+        df.columns = [col.lower() for col in df.columns]
+        tables[table] = df.convert_dtypes()
+    return tables
+
+
+def validate_source_tables(tables):
+    """Problems found checking tables against SOURCE_SCHEMAS (empty list when valid)"""
+    problems = []
+
+    for table, (year_col, columns) in SOURCE_SCHEMAS.items():
+        if table not in tables:
+            if table.startswith("lahman_"):
+                problems.append(f"{table}: missing")
+            continue
+
+        df = tables[table]
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            problems.append(f"{table}: missing columns {', '.join(missing)}")
+        elif year_col and (
+            not pd.api.types.is_integer_dtype(df[year_col]) or df[year_col].isna().any()
+        ):
+            problems.append(f"{table}: {year_col} must be a non-null integer")
+
+    return problems
+
+
+def _partition_years(table, df):
+    """Season of every row ('date' columns are yyyymmdd ints)"""
+    year_col = SOURCE_SCHEMAS.get(table, (None,))[0]
+    if year_col is None:
+        return None
+    return df[year_col] // 10000 if year_col == "date" else df[year_col]
+
+
+def split_partitions(table, df):
+    """{partition: DataFrame}, keyed by season, or 'all' for unpartitioned tables"""
+    years = _partition_years(table, df)
+    if years is None:
+        return {"all": df}
+    return {str(int(year)): part.reset_index(drop=True) for year, part in df.groupby(years)}
+
+
+def _partition_path(out_dir, table, partition):
+    if partition == "all":
+        return os.path.join(out_dir, table, "part.parquet")
+    return os.path.join(out_dir, table, f"year={partition}", "part.parquet")
+
+
+def _partition_hash(df):
+    digest = hashlib.sha256("|".join(f"{col}:{df[col].dtype}" for col in df.columns).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def _read_manifest(out_dir, name):
+    try:
+        with open(os.path.join(out_dir, name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(out_dir, name, manifest):
+    path = os.path.join(out_dir, name)
+    os.makedirs(out_dir, exist_ok=True)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def partition_hashes(tables):
+    """{table: {partition: (DataFrame, content hash)}} for every source table"""
+    return {
+        table: {partition: (part_df, _partition_hash(part_df)) for partition, part_df in split_partitions(table, df).items()}
+        for table, df in tables.items()
+    }
+
+
+def changed_partitions(partitions, previous, is_current=lambda table, partition: True):
+    """{table: {"written": {partition: DataFrame}, "removed": [...]}} against a previous manifest"""
+    changes = {}
+    for table, parts in partitions.items():
+        before = previous.get(table, {})
+        written = {
+            partition: part_df for partition, (part_df, digest) in parts.items()
+            if before.get(partition) != digest or not is_current(table, partition)
+        }
+        removed = sorted(set(before) - set(parts))
+        if written or removed:
+            changes[table] = {"written": written, "removed": removed}
+    return changes
+
+
+def _manifest_of(partitions):
+    return {table: {partition: digest for partition, (_, digest) in parts.items()} for table, parts in partitions.items()}
+
+
+def write_parquet_partitions(partitions, out_dir):
+    """Write changed partitions, drop vanished ones, then record them; returns the changes"""
+    changes = changed_partitions(
+        partitions, _read_manifest(out_dir, INGEST_MANIFEST),
+        lambda table, partition: os.path.exists(_partition_path(out_dir, table, partition)),
+    )
+    for table, change in changes.items():
+        for partition, part_df in change["written"].items():
+            path = _partition_path(out_dir, table, partition)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            part_df.to_parquet(f"{path}.tmp", index=False)
+            os.replace(f"{path}.tmp", path)
+        for partition in change["removed"]:
+            path = _partition_path(out_dir, table, partition)
+            if os.path.exists(path):
+                os.remove(path)
+
+    _save_manifest(out_dir, INGEST_MANIFEST, _manifest_of(partitions))
+    return changes
+
+
+def load_postgres_partitions(tables, partitions, out_dir, engine):
+    """COPY partitions that differ from what this database last loaded; returns the changes"""
+    manifest = _read_manifest(out_dir, POSTGRES_MANIFEST)
+    database = engine.url.render_as_string(hide_password=True)
+    loaded = manifest.setdefault(database, {})
+    current = _manifest_of(partitions)
+
+    changes = changed_partitions(partitions, loaded)
+    for table, change in changes.items():
+        copy_partitions_to_postgres(tables[table], table, change, engine)
+        # Recorded per table once its transaction has committed, so a crash reloads only the rest
+        loaded[table] = current[table]
+        _save_manifest(out_dir, POSTGRES_MANIFEST, manifest)
+    return changes
+
+
+def copy_partitions_to_postgres(df, table, change, engine):
+    """Replace the rows of one table's changed partitions in one transaction, using COPY"""
+    import io
+    from sqlalchemy import text, inspect
+
+    year_col = SOURCE_SCHEMAS.get(table, (None,))[0]
+    year_expr = f"CAST({year_col} / 10000 AS INTEGER)" if year_col == "date" else year_col
+    columns = ", ".join(f'"{col}"' for col in df.columns)
+
+    with engine.begin() as conn:
+        if not inspect(conn).has_table(table):
+            df.head(0).to_sql(table, conn, index=False)
+
+        for partition in list(change["written"]) + change["removed"]:
+            if partition == "all":
+                conn.execute(text(f"TRUNCATE {table}"))
+            else:
+                conn.execute(text(f"DELETE FROM {table} WHERE {year_expr} = :year"), {"year": int(partition)})
+
+        copy_sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+        cursor = conn.connection.cursor()
+        for part_df in change["written"].values():
+            buffer = io.StringIO()
+            part_df.to_csv(buffer, index=False, header=False)
+            if conn.dialect.driver == "psycopg":
+                # psycopg 3 (the engine's driver whenever it is installed) streams through cursor.copy()
+                with cursor.copy(copy_sql) as copy:
+                    copy.write(buffer.getvalue())
+            else:
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+
+
+@app.cli.command("ingest")
+@click.option("--lahman", "lahman_dir", required=True, help="Directory of Lahman CSVs (People.csv, Batting.csv, ...)")
+@click.option("--war", "war_csv", help="JEFFBAGWELL WAR CSV (key_bbref, year_ID, team_ID, WAR162)")
+@click.option("--gamelogs", "gamelog_glob", help="Retrosheet game logs, e.g. 'retrosheet/GL*.TXT'")
+@click.option("--events", "events_glob", help="Retrosheet event files, e.g. 'retrosheet/*.EV?'")
+@click.option("--out", "out_dir", default="data/parquet", show_default=True, help="Parquet output directory")
+@click.option("--load-postgres", is_flag=True, help="Also COPY changed partitions into DATABASE_URL")
+def ingest(lahman_dir, war_csv, gamelog_glob, events_glob, out_dir, load_postgres):
+    """Validate the source files and refresh the year-partitioned Parquet store"""
+    tables = normalize_source_tables(load_source_tables(lahman_dir, war_csv, gamelog_glob, events_glob))
+
+    problems = validate_source_tables(tables)
+    if problems:
+        raise click.ClickException("Source files don't match the app's schema:\n  " + "\n  ".join(problems))
+    if load_postgres and db_engine.dialect.name != "postgresql":
+        raise click.ClickException("--load-postgres needs DATA_BACKEND=postgres and DATABASE_URL")
+
+    partitions = partition_hashes(tables)
+    changes = write_parquet_partitions(partitions, out_dir)
+    for table, change in sorted(changes.items()):
+        written = ", ".join(sorted(change["written"])) or "-"
+        removed = ", ".join(change["removed"]) or "-"
+        click.echo(f"{table}: wrote {written}; removed {removed}")
+    if not changes:
+        click.echo("No partitions changed")
+
+    if load_postgres:
+        loaded = load_postgres_partitions(tables, partitions, out_dir, db_engine)
+        if loaded:
+            click.echo(f"Loaded {len(loaded)} changed tables into Postgres")
+        else:
+            click.echo("Postgres is up to date")
+
+
+# ─── INDEXES ────────────────────────────────────────────────────────────────
+# Indexes the query patterns above depend on. `flask --app app ensure-indexes`
+# creates any that are missing; at startup the hot queries are EXPLAINed in the
+# background and a warning is printed for any that falls back to a full scan.
+
+# (table, columns) btree indexes, all backends
+BTREE_INDEXES = [
+    ("lahman_people", "playerid"),
+    ("lahman_batting", "playerid"),
+    ("lahman_batting", "yearid"),
+    ("lahman_pitching", "playerid"),
+    ("lahman_fielding", "playerid, pos"),
+    ("lahman_awardsplayers", "playerid"),
+    ("lahman_allstarfull", "playerid"),
+    # The seriespost lookups OR the winner and loser columns, so each side gets its own index
+    ("lahman_seriespost", "teamidwinner, yearid, round"),
+    ("lahman_seriespost", "teamidloser, yearid, round"),
+    ("lahman_teams", "teamid, yearid"),
+    ("jeffbagwell_war", "key_bbref"),
+    ("retrosheet_teamstats", "team, opp, date"),
+    ("retrosheet_matchups", "batter, pitcher"),
+]
+
+# (name, table, expressions) for the lowercase exact-name lookup, Postgres and SQLite
+EXPRESSION_INDEXES = [
+    ("idx_lahman_people_lower_name", "lahman_people", "LOWER(namefirst), LOWER(namelast)"),
+    ("idx_lahman_people_lower_namelast", "lahman_people", "LOWER(namelast)"),
+]
+
+# (name, table, expression) trigram indexes for search's '%term%' LIKEs, Postgres only
+TRIGRAM_INDEXES = [
+    ("idx_lahman_people_full_name_trgm", "lahman_people", "LOWER(namefirst || ' ' || namelast)"),
+    ("idx_lahman_people_namefirst_trgm", "lahman_people", "LOWER(namefirst)"),
+    ("idx_lahman_people_namelast_trgm", "lahman_people", "LOWER(namelast)"),
+]
+
+# (label, table that must not be scanned, query, params) for the hottest lookups
+HOT_QUERY_CHECKS = [
+    ("batting by player", "lahman_batting", "SELECT yearid FROM lahman_batting WHERE playerid = :playerid", {"playerid": "ruthba01"}),
+    ("pitching by player", "lahman_pitching", "SELECT yearid FROM lahman_pitching WHERE playerid = :playerid", {"playerid": "ruthba01"}),
+    ("fielding by player", "lahman_fielding", "SELECT pos FROM lahman_fielding WHERE playerid = :playerid GROUP BY pos", {"playerid": "ruthba01"}),
+    ("awards by player", "lahman_awardsplayers", "SELECT awardid FROM lahman_awardsplayers WHERE playerid = :playerid", {"playerid": "ruthba01"}),
+    ("all-star by player", "lahman_allstarfull", "SELECT COUNT(*) FROM lahman_allstarfull WHERE playerid = :playerid", {"playerid": "ruthba01"}),
+    ("WAR by player", "jeffbagwell_war", "SELECT WAR162 FROM jeffbagwell_war WHERE key_bbref = :playerid", {"playerid": "ruthba01"}),
+    ("name lookup", "lahman_people", "SELECT playerid FROM lahman_people WHERE LOWER(namefirst) = :first AND LOWER(namelast) = :last", {"first": "babe", "last": "ruth"}),
+    ("h2h games", "retrosheet_teamstats", "SELECT win FROM retrosheet_teamstats WHERE team = :team_a AND opp = :team_b", {"team_a": "NYA", "team_b": "BOS"}),
+    ("versus matchup", "retrosheet_matchups", "SELECT pa FROM retrosheet_matchups WHERE batter = :batter AND pitcher = :pitcher", {"batter": "troutmi01", "pitcher": "verlaju01"}),
+]
+
+
+def index_statements(dialect):
+    """[(table, CREATE INDEX statement)] for the given SQLAlchemy dialect name"""
+    statements = [
+        (table, f"CREATE INDEX IF NOT EXISTS idx_{table}_{columns.replace(', ', '_')} ON {table} ({columns})")
+        for table, columns in BTREE_INDEXES
+    ]
+
+    if dialect in ("postgresql", "sqlite"):
+        statements += [
+            (table, f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({expressions})")
+            for name, table, expressions in EXPRESSION_INDEXES
+        ]
+
+    if dialect == "postgresql":
+        statements.append(("lahman_people", "CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        statements += [
+            (table, f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (({expression}) gin_trgm_ops)")
+            for name, table, expression in TRIGRAM_INDEXES
+        ]
+
+    return statements
+
+
+def _scanned_tables(conn, query, params):
+    """Tables the planner reads with a full/sequential scan for this query"""
+    from sqlalchemy import text
+
+    dialect = conn.dialect.name
+
+    if dialect == "postgresql":
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        scanned, nodes = set(), [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node.get("Node Type") == "Seq Scan":
+                scanned.add(node.get("Relation Name"))
+            nodes.extend(node.get("Plans", []))
+        return scanned
+
+    if dialect == "sqlite":
+        details = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {query}"), params)]
+        return {detail.split()[1] for detail in details if detail.startswith("SCAN ") and "INDEX" not in detail}
+
+    return set()
+
+
+def check_query_plans():
+    """Warnings for hot queries whose plan falls back to a sequential scan"""
+    warnings = []
+
+    with db_engine.connect() as conn:
+        for label, table, query, params in HOT_QUERY_CHECKS:
+            try:
+                if table in _scanned_tables(conn, query, params):
+                    warnings.append(f"{label}: sequential scan on {table}")
+            except Exception as e:
+                conn.rollback()
+                warnings.append(f"{label}: could not EXPLAIN ({str(e).splitlines()[0]})")
+
+    return warnings
+
+
+# Verify the hot query plans at startup without delaying boot
+@background_task(os.environ.get("CHECK_QUERY_PLANS", "1") == "1")
+def _warn_on_slow_query_plans():
+    try:
+        for warning in check_query_plans():
+            print(f"[query plan] {warning} - run `flask --app app ensure-indexes`")
+    except Exception as e:
+        print(f"[query plan] check skipped: {e}")
+
+
+@app.cli.command("ensure-indexes")
+@click.option("--check-only", is_flag=True, help="Only EXPLAIN the hot queries")
+def ensure_indexes(check_only):
+    """Create the indexes the app's queries need, then verify the query plans"""
+    from sqlalchemy import text
+
+    if not check_only:
+        if DATA_BACKEND in ("sqlite", "duckdb"):
+            # The app's engine is read-only; open the file for writing
+            if DATA_BACKEND == "duckdb":
+                import duckdb
+                conn = duckdb.connect(LOCAL_DB_PATH)
+            else:
+                import sqlite3
+                conn = sqlite3.connect(LOCAL_DB_PATH)
+
+            for table, statement in index_statements(DATA_BACKEND):
+                try:
+                    conn.execute(statement)
+                except Exception as e:
+                    click.echo(f"skipped ({table}): {e}")
+            if DATA_BACKEND == "sqlite":
+                conn.commit()
+                conn.execute("ANALYZE")
+            conn.close()
+        else:
+            with db_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                for table, statement in index_statements(conn.dialect.name):
+                    try:
+                        conn.execute(text(statement))
+                    except Exception as e:
+                        click.echo(f"skipped ({table}): {str(e).splitlines()[0]}")
+                conn.execute(text("ANALYZE"))
+        click.echo("Indexes ensured")
+
+    warnings = check_query_plans()
+    for warning in warnings:
+        click.echo(f"WARNING {warning}")
+    if not warnings:
+        click.echo("All hot queries use an index")
+
+
+# Build the in-memory stat tables in the background so first requests don't wait on them
+@background_task(os.environ.get("WARM_STAT_TABLES", "1") == "1")
+def _warm_stat_tables():
+    try:
+        get_season_percentiles()
+        get_league_baselines()
+        get_awards_index()
+        get_team_analytics()
+    except Exception as e:
+        print(f"Stat table warm-up skipped: {e}")
+
+
 if __name__ == "__main__":
     port = int(os.environ.get('PORT', 5000))
+    start_background_tasks()
 
     app.run(host='0.0.0.0', port=port, debug=False)
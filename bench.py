@@ -0,0 +1,54 @@
+"""
+CPU time per request for the hot player and team endpoints.
+
+Runs the app in-process through Flask's test client, so only the handler
+work is measured (no network, no WSGI server). Point DATABASE_URL at the
+database to measure, e.g. a local copy built with `flask --app app build-local-db`:
+
+    DATABASE_URL=sqlite:///lahman.db python bench.py
+    DATABASE_URL=sqlite:///lahman.db python bench.py -n 500 "/player?name=Mike Trout&mode=season"
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+# Background work (plan check, table warm-up, live polling) would skew the timings
+os.environ.setdefault("CHECK_QUERY_PLANS", "0")
+os.environ.setdefault("WARM_STAT_TABLES", "0")
+
+from app import app
+
+DEFAULT_URLS = [
+    "/player-disambiguate?name=Shohei Ohtani&mode=season&player_type=hitter",
+    "/player-disambiguate?name=Shohei Ohtani&mode=season&player_type=pitcher",
+    "/player-disambiguate?name=Ken Griffey Jr.&mode=career",
+    "/team?team=2010 Dodgers",
+    "/team?team=Dodgers&mode=franchise",
+]
+
+
+def time_request(client, url, requests):
+    """Mean CPU milliseconds per request, after one warm-up request"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        client.get(url)
+        started = time.process_time()
+        for _ in range(requests):
+            client.get(url)
+    return (time.process_time() - started) / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("urls", nargs="*", default=DEFAULT_URLS, help="request paths to time")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="requests per path (default 200)")
+    args = parser.parse_args()
+
+    client = app.test_client()
+    for url in args.urls:
+        print(f"{time_request(client, url, args.requests):8.2f} ms  {url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# app.py builds its engine on import; the pure functions under test never query it
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("CHECK_QUERY_PLANS", "0")
+os.environ.setdefault("WARM_STAT_TABLES", "0")
+os.environ.pop("LIVE_STATS_PATH", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def use_game_log(monkeypatch):
+    """Install a TeamGameLog built from (team, opp, date, home, win, loss, tie, runs, runs_against) rows"""
+    import app
+
+    def install(games):
+        team, opp, date, home, win, loss, tie, runs, runs_against = zip(*games)
+        log = app.TeamGameLog(
+            team=np.array(team, dtype=object),
+            opp=np.array(opp, dtype=object),
+            date=np.array(date, dtype=np.int64),
+            number=np.zeros(len(games), dtype=np.int64),
+            home=np.array(home, dtype=bool),
+            win=np.array(win, dtype=np.int64),
+            loss=np.array(loss, dtype=np.int64),
+            tie=np.array(tie, dtype=np.int64),
+            runs=np.array(runs, dtype=np.int64),
+            runs_against=np.array(runs_against, dtype=np.int64),
+        )
+        monkeypatch.setattr(app, "_team_game_log", log)
+        monkeypatch.setattr(app, "_team_splits", None)
+        app.team_streaks.cache_clear()
+        return log
+
+    yield install
+    app.team_streaks.cache_clear()
@@ -0,0 +1,44 @@
+import pytest
+
+import app
+from app import build_awards_index, get_player_awards
+
+AWARD_ROWS = [
+    {"playerid": "jeterde01", "yearid": 2000, "awardid": "WSMVP", "lgid": "ML", "tie": None, "notes": None},
+    {"playerid": "jeterde01", "yearid": 2000, "awardid": "WS", "lgid": "ML", "tie": None, "notes": None},
+    {"playerid": "jeterde01", "yearid": 1996, "awardid": "ROY", "lgid": "AL", "tie": None, "notes": None},
+]
+ALLSTAR_ROWS = [{"playerid": "jeterde01", "yearid": 2000}]
+RING_ROWS = [("jeterde01", 2000, "NYA", "New York Yankees"), ("riverma01", 2000, "NYA", "New York Yankees")]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = build_awards_index(AWARD_ROWS, ALLSTAR_ROWS, RING_ROWS, {("jeterde01", 2000): "SS"})
+    monkeypatch.setattr(app, "_awards_index", index)
+    return index
+
+
+def test_rings_do_not_replace_ws_award_rows(index):
+    assert [winner.playerid for winner in index.by_award["WS"]] == ["jeterde01"]
+    assert [winner.playerid for winner in index.by_award["WSRING"]] == ["jeterde01", "riverma01"]
+    assert index.aliases["world series ring"] == "WSRING"
+    assert index.aliases["ws"] == "WS"
+
+
+def test_player_block(index):
+    block = get_player_awards("jeterde01")
+    assert block["mlbAllStar"] == 1
+    assert block["ws_count"] == 1
+    assert block["summary"]["ROY"]["years"] == [1996]
+    assert get_player_awards("nobody01") == app.empty_awards_block()
+
+
+def test_player_block_is_a_copy(index):
+    block = get_player_awards("jeterde01")
+    block["awards"][0]["year"] = 1900
+    block["summary"]["ROY"]["years"].append(1900)
+    block["world_series_championships"].clear()
+
+    assert get_player_awards("jeterde01") == dict(index.by_player["jeterde01"])
+    assert index.by_player["jeterde01"]["summary"]["ROY"]["years"] == [1996]
@@ -0,0 +1,33 @@
+import pytest
+
+import app
+
+GAMES = [
+    # team, opp, date, home, win, loss, tie, runs, runs_against
+    ("LAN", "SFN", 19580415, True, 0, 1, 0, 1, 8),
+    ("LAN", "SFN", 20250401, True, 1, 0, 0, 5, 2),
+]
+
+
+@pytest.fixture
+def client(monkeypatch, use_game_log):
+    monkeypatch.setattr(app, "_dataset_version", "test-version")
+    use_game_log(GAMES)
+    return app.app.test_client()
+
+
+def test_team_splits_default_year_is_not_cached_as_historical(client):
+    response = client.get("/team/splits?team=Dodgers")
+
+    assert response.status_code == 200
+    assert response.get_json()["year"] == 2025
+    assert response.headers["Cache-Control"] == app.CURRENT_CACHE_CONTROL
+    assert not response.headers["ETag"].strip('"').endswith(".h")
+
+
+def test_team_splits_named_past_season_is_historical(client):
+    response = client.get("/team/splits?team=1958 Dodgers")
+
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == app.HISTORICAL_CACHE_CONTROL
+    assert response.headers["ETag"].strip('"').endswith(".h")
@@ -0,0 +1,81 @@
+import pytest
+
+from app import (
+    DeleteIndex,
+    build_player_name_index,
+    damerau_levenshtein,
+    find_players_by_name,
+    name_edit_budget,
+)
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("griffey", "griffey", 0),
+    ("grifey", "griffey", 1),      # deletion
+    ("griffeyy", "griffey", 1),    # insertion
+    ("griffoy", "griffey", 1),     # substitution
+    ("grifefy", "griffey", 1),     # adjacent transposition counts once
+    ("jeter", "jetre", 1),
+    ("ca", "abc", 3),              # optimal string alignment, not full Damerau
+])
+def test_damerau_levenshtein(a, b, distance):
+    assert damerau_levenshtein(a, b, limit=5) == distance
+    assert damerau_levenshtein(b, a, limit=5) == distance
+
+
+def test_damerau_levenshtein_stops_past_limit():
+    assert damerau_levenshtein("ruth", "gehrig", limit=1) == 2
+    assert damerau_levenshtein("a", "abcd", limit=2) == 3
+
+
+def test_name_edit_budget():
+    assert name_edit_budget("cj") == 0
+    assert name_edit_budget("ruth") == 1
+    assert name_edit_budget("griffey") == 2
+
+
+def test_delete_index_lookup():
+    index = DeleteIndex(["griffey", "griffin", "ruth", "roth", "jd"])
+
+    assert index.lookup("griffey") == {"griffey": 0, "griffin": 2}
+    assert index.lookup("grifey") == {"griffey": 1}
+    assert index.lookup("rtuh") == {"ruth": 1}
+    assert index.lookup("ruth") == {"ruth": 0, "roth": 1}
+
+
+def test_delete_index_respects_candidate_budget():
+    # "jd" tolerates no typos, so "jdd" (one insertion away) must not match it
+    index = DeleteIndex(["jd"])
+    assert index.lookup("jdd") == {}
+    assert index.lookup("jd") == {"jd": 0}
+
+
+def test_delete_index_max_distance():
+    index = DeleteIndex(["griffey"], max_distance=1)
+    assert index.lookup("grifey") == {"griffey": 1}
+    assert index.lookup("grfey") == {}
+
+
+PEOPLE = [
+    # playerid, namefirst, namelast, namegiven, debut, finalgame, birthyear
+    ("griffke01", "Ken", "Griffey", "George Kenneth", "1973-08-25", "1991-06-25", 1950),
+    ("griffke02", "Ken", "Griffey", "George Kenneth", "1989-04-03", "2010-05-31", 1969),
+    ("acunaro01", "Ronald", "Acuña", "Ronald José", "2018-04-25", None, 1997),
+]
+
+
+def test_find_players_by_name():
+    index = build_player_name_index(PEOPLE)
+
+    exact = find_players_by_name("Ken", "Griffey", index)
+    assert [(d, v, e.playerid) for d, v, e in exact] == [(0, 0, "griffke01"), (0, 0, "griffke02")]
+
+    assert [e.playerid for _, _, e in find_players_by_name("ronald", "acuna", index)] == ["acunaro01"]
+    typo = find_players_by_name("Ronald", "Acnua", index)
+    assert [(d, e.playerid) for d, _, e in typo] == [(1, "acunaro01")]
+
+    # Given first name answers too, ranked as a variant rather than the listed name
+    given = find_players_by_name("George", "Griffey", index)
+    assert {(d, v) for d, v, _ in given} == {(0, 1)}
+
+    assert find_players_by_name("Ken", "Smith", index) == []
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+import app
+from app import build_league_baselines, neutralize_rows
+
+
+@pytest.fixture(autouse=True)
+def baselines(monkeypatch):
+    # 2000 is a league with twice 1990's hit and walk rates per PA (and per out)
+    batting = pd.DataFrame({
+        "yearid": [1990, 2000], "h": [200, 400], "hr": [0, 0], "bb": [100, 200], "rbi": [50, 50], "pa": [1000, 1000],
+    })
+    pitching = pd.DataFrame({
+        "yearid": [1990, 2000], "h": [100, 200], "hr": [10, 40], "bb": [50, 50], "er": [40, 40], "ipouts": [300, 300],
+    })
+    monkeypatch.setattr(app, "_league_baselines", build_league_baselines(batting, pitching))
+
+
+def batting_row(**counts):
+    row = {"yearid": 1990, "ab": 0, "h": 0, "2b": 0, "3b": 0, "hr": 0, "bb": 0, "rbi": 0, "hbp": 0, "sf": 0, "sh": 0}
+    row.update(counts)
+    return row
+
+
+def plate_appearances(row):
+    return row["ab"] + row["bb"] + row["hbp"] + row["sf"] + row["sh"]
+
+
+def test_neutralize_keeps_plate_appearances():
+    row = batting_row(ab=500, h=150, **{"2b": 30}, bb=50, hbp=5, sf=5)
+    (neutral,) = neutralize_rows([row], "hitter", 2000)
+
+    assert neutral["bb"] == 100
+    assert neutral["h"] == 300 and neutral["2b"] == 60
+    assert neutral["ab"] == 450  # the 50 extra walks came out of at-bats
+    assert plate_appearances(neutral) == plate_appearances(row)
+
+
+def test_neutralize_caps_hits_at_at_bats():
+    row = batting_row(ab=3, h=3, **{"2b": 1}, hr=0, bb=1)
+    (neutral,) = neutralize_rows([row], "hitter", 2000)
+
+    assert neutral["ab"] == 2
+    assert neutral["h"] == 2
+    assert neutral["2b"] == 2  # singles are trimmed before extra-base hits
+    assert plate_appearances(neutral) == plate_appearances(row)
+
+
+def test_neutralize_walks_cannot_use_up_more_than_the_at_bats():
+    row = batting_row(ab=1, h=0, bb=3)
+    (neutral,) = neutralize_rows([row], "hitter", 2000)
+
+    assert (neutral["ab"], neutral["bb"]) == (0, 4)
+
+
+def test_neutralize_pitcher_home_runs_stay_within_hits():
+    row = {"yearid": 1990, "h": 2, "hr": 2, "bb": 1, "er": 2, "era": 6.0, "ipouts": 9}
+    (neutral,) = neutralize_rows([row], "pitcher", 2000)
+
+    assert neutral["h"] == 4
+    assert neutral["hr"] == 4  # 8 by rate alone
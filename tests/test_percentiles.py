@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+
+import app
+from app import add_season_percentiles, build_pitcher_season_records, build_season_percentiles, percentile_rank
+
+
+def test_percentile_rank_ties_count_as_matched():
+    values = [0.250, 0.300, 0.300, 0.350]
+    assert percentile_rank(values, 0.300) == 75
+    assert percentile_rank(values, 0.350) == 100
+    assert percentile_rank(values, 0.200) == 0
+
+
+def test_percentile_rank_lower_is_better():
+    eras = [2.50, 3.00, 3.00, 4.50]
+    assert percentile_rank(eras, 2.50, higher_is_better=False) == 100
+    assert percentile_rank(eras, 3.00, higher_is_better=False) == 75
+    assert percentile_rank(eras, 5.00, higher_is_better=False) == 0
+
+
+def test_percentile_rank_without_values():
+    assert percentile_rank([], 0.300) is None
+    assert percentile_rank([0.300], None) is None
+
+
+def batting_season(playerid, yearid, ab, h, bb=0):
+    return {"playerid": playerid, "yearid": yearid, "g": 150, "ab": ab, "h": h, "hr": 0, "rbi": 0, "sb": 0,
+            "bb": bb, "hbp": 0, "sf": 0, "sh": 0, "2b": 0, "3b": 0}
+
+
+def pitching_season(playerid, yearid, ipouts, er, h=0, bb=0, teamid="BOS"):
+    return {"playerid": playerid, "yearid": yearid, "teamid": teamid, "w": 0, "l": 0, "g": 30, "gs": 30,
+            "cg": 0, "sho": 0, "sv": 0, "ipouts": ipouts, "h": h, "er": er, "hr": 0, "bb": bb, "so": 0, "era": 0}
+
+
+@pytest.fixture(autouse=True)
+def league_averages(monkeypatch):
+    for year in (1990, 1991):
+        monkeypatch.setitem(app._league_avg_cache, year, {"obp": 0.320, "slg": 0.400})
+
+
+def test_build_season_percentiles_keeps_qualified_players_only():
+    batting = pd.DataFrame([
+        batting_season("a", 1990, 550, 165),
+        batting_season("b", 1990, 600, 150),
+        batting_season("c", 1990, 100, 50),   # short of 3.1 PA per game
+        batting_season("d", 1991, 100, 50),   # nobody qualified in 1991
+    ])
+    pitching = pd.DataFrame([pitching_season("p", 1990, 600, 60), pitching_season("q", 1990, 300, 10)])
+
+    tables = build_season_percentiles(batting, pitching, {1990: 162, 1991: 162})
+
+    assert tables[("hitter", 1990)]["ba"] == [0.25, 0.3]
+    assert tables[("pitcher", 1990)]["era"] == [2.7]  # 100 IP falls short of 162
+    assert ("hitter", 1991) not in tables
+    assert ("pitcher", 1991) not in tables
+
+
+def test_add_season_percentiles_without_a_table(monkeypatch):
+    monkeypatch.setattr(app, "_season_percentiles", {})
+    records = add_season_percentiles([{"year": 1991, "era": 3.0, "whip": 1.2}], "pitcher")
+    assert records[0]["percentiles"] is None
+
+
+def test_traded_pitcher_stints_rank_on_the_season_total(monkeypatch):
+    # Qualified 1990 ERAs: 2.00, 3.00, 4.00, 5.00; WHIPs: 1.00, 1.20, 1.40, 1.60
+    monkeypatch.setattr(app, "_season_percentiles", {
+        ("pitcher", 1990): {"era": [2.0, 3.0, 4.0, 5.0], "whip": [1.0, 1.2, 1.4, 1.6]},
+    })
+    # 90 IP at 1.00 for one club, 90 IP at 5.00 for the next: a 3.00 season
+    rows = [
+        pitching_season("t", 1990, 270, 10, h=60, bb=30, teamid="BOS"),
+        pitching_season("t", 1990, 270, 50, h=120, bb=30, teamid="NYA"),
+    ]
+    records = add_season_percentiles(build_pitcher_season_records(rows, {}), "pitcher", rows)
+
+    assert [record["era"] for record in records] == [1.0, 5.0]  # the stint lines themselves are unchanged
+    assert [record["whip"] for record in records] == [1.0, 1.67]
+    assert [record["percentiles"]["era"] for record in records] == [75, 75]
+    assert [record["percentiles"]["whip"] for record in records] == [50, 50]  # 240 H+BB in 180 IP = 1.33
+
+
+def test_single_team_season_ranks_its_own_line(monkeypatch):
+    monkeypatch.setattr(app, "_season_percentiles", {
+        ("pitcher", 1990): {"era": [2.0, 3.0, 4.0, 5.0], "whip": [1.0, 1.1, 1.2, 1.3]},
+    })
+    rows = [pitching_season("s", 1990, 540, 80, h=150, bb=50)]
+    (record,) = add_season_percentiles(build_pitcher_season_records(rows, {}), "pitcher", rows)
+    assert record["percentiles"]["era"] == 50  # 4.00 ERA
@@ -0,0 +1,47 @@
+import pytest
+
+import app
+from app import games_back, get_season_standings
+
+GAMES = [
+    # team, opp, date, home, win, loss, tie, runs, runs_against
+    ("MIL", "BAL", 19820401, True, 1, 0, 0, 5, 2),
+    ("BAL", "MIL", 19820401, False, 0, 1, 0, 2, 5),
+    ("MIL", "BAL", 19820402, True, 1, 0, 0, 4, 3),
+    ("BAL", "MIL", 19820402, False, 0, 1, 0, 3, 4),
+]
+
+# Lahman calls the 1982 Brewers ML4; Retrosheet (and so the game log) calls them MIL
+TEAMS_1982 = [
+    {"teamid": "ML4", "teamidretro": "MIL", "lgid": "AL", "divid": "E", "name": "Milwaukee Brewers"},
+    {"teamid": "BAL", "teamidretro": "BAL", "lgid": "AL", "divid": "E", "name": "Baltimore Orioles"},
+]
+
+
+@pytest.fixture
+def standings(monkeypatch, use_game_log):
+    use_game_log(GAMES)
+    monkeypatch.setattr(app, "_season_standings", {})
+    monkeypatch.setattr(app, "fetch_records", lambda query, params=None, conn=None: TEAMS_1982)
+    return get_season_standings(1982)
+
+
+def test_standings_match_teams_by_retrosheet_code(standings):
+    assert list(standings.teams) == ["MIL", "BAL"]
+    assert standings.leagues == (("AL", "E"), ("AL", "E"))
+    assert standings.names == ("Milwaukee Brewers", "Baltimore Orioles")
+
+
+def test_standings_games_back_share_a_division(standings):
+    behind = games_back(standings, standings.wins[-1], standings.losses[-1])
+    assert behind.tolist() == [0.0, 2.0]
+    assert standings.wins[-1].tolist() == [2, 0]
+
+
+def test_standings_fall_back_to_lahman_code(monkeypatch, use_game_log):
+    use_game_log(GAMES)
+    monkeypatch.setattr(app, "_season_standings", {})
+    rows = [dict(row, teamidretro=None, teamid=row["teamidretro"]) for row in TEAMS_1982]
+    monkeypatch.setattr(app, "fetch_records", lambda query, params=None, conn=None: rows)
+
+    assert get_season_standings(1982).names == ("Milwaukee Brewers", "Baltimore Orioles")
@@ -0,0 +1,37 @@
+import pytest
+
+from app import _ALIAS_TO_CODE, _ALIASES, match_team_alias
+
+
+def scan_aliases(term):
+    """The straightforward scan the automaton replaces"""
+    for alias in _ALIASES:
+        if term in alias or alias in term:
+            return _ALIAS_TO_CODE[alias]
+    return None
+
+
+TERMS = [
+    "cubs", "chicago cubs", "the cubs", "2016 cubs", "cub",
+    "red sox", "boston red sox 2004", "sox", "white sox", "o's",
+    "angels", "los angeles angels of anaheim", "anaheim", "california",
+    "yankees", "bronx bombers", "mets", "amazin mets", "d-backs", "dbacks",
+    "zzz", "q", "",
+]
+
+
+@pytest.mark.parametrize("term", TERMS)
+def test_match_team_alias_agrees_with_scan(term):
+    assert match_team_alias(term) == scan_aliases(term)
+
+
+def test_match_team_alias_on_every_alias():
+    for alias in _ALIASES:
+        for term in (alias, alias[1:], alias[:-1], f"the {alias} 1999"):
+            assert match_team_alias(term) == scan_aliases(term), term
+
+
+def test_match_team_alias_examples():
+    assert match_team_alias("cubbies") == "CHN"
+    assert match_team_alias("1927 boston red sox") == "BOS"
+    assert match_team_alias("no such club") is None
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from app import build_team_analytics
+
+TEAMS = pd.DataFrame([
+    # A 1990 AL pair that mirror each other, and a 2000 AL team in a higher-scoring league
+    {"yearid": 1990, "lgid": "AL", "teamid": "BOS", "name": "Boston Red Sox", "g": 162, "w": 95, "l": 67, "r": 800, "ra": 600},
+    {"yearid": 1990, "lgid": "AL", "teamid": "NYA", "name": "New York Yankees", "g": 162, "w": 67, "l": 95, "r": 600, "ra": 800},
+    {"yearid": 2000, "lgid": "AL", "teamid": "BOS", "name": "Boston Red Sox", "g": 162, "w": 81, "l": 81, "r": 972, "ra": 972},
+])
+
+
+@pytest.fixture
+def analytics():
+    return build_team_analytics(TEAMS).set_index(["yearid", "teamid"])
+
+
+def test_pythagorean_wins_and_luck(analytics):
+    boston = analytics.loc[(1990, "BOS")]
+    assert boston["pythag_win_pct"] == pytest.approx(0.6287, abs=1e-4)
+    assert boston["pythag_wins"] == pytest.approx(101.84, abs=0.01)
+    assert boston["pythag_losses"] == pytest.approx(162 - 101.84, abs=0.01)
+    assert boston["luck"] == pytest.approx(-6.84, abs=0.01)
+
+    # Mirrored run totals give mirrored records and luck
+    new_york = analytics.loc[(1990, "NYA")]
+    assert new_york["pythag_wins"] == pytest.approx(boston["pythag_losses"])
+    assert new_york["luck"] == pytest.approx(-boston["luck"])
+
+    assert analytics.loc[(2000, "BOS"), "pythag_win_pct"] == pytest.approx(0.5)
+    assert analytics.loc[(2000, "BOS"), "luck"] == pytest.approx(0)
+
+
+def test_run_environment(analytics):
+    # 1990 AL: 1400 runs in 324 team-games; 2000 AL: 972 in 162; history: 2372 in 486
+    assert analytics.loc[(1990, "BOS"), "league_rpg"] == pytest.approx(1400 / 324)
+    assert analytics.loc[(1990, "BOS"), "runs_plus"] == pytest.approx(100 * 800 / 700)
+    assert analytics.loc[(2000, "BOS"), "run_environment"] == pytest.approx(100 * 6.0 / (2372 / 486))
+    assert analytics.loc[(1990, "BOS"), "franchise"] == "BOS"
+
+
+def test_team_without_runs_is_a_500_team():
+    frame = build_team_analytics(pd.DataFrame([
+        {"yearid": 1871, "lgid": "NA", "teamid": "XXX", "name": "Nobody", "g": 0, "w": 0, "l": 0, "r": 0, "ra": 0},
+    ]))
+    assert frame.loc[0, "pythag_win_pct"] == 0.5
+    assert frame.loc[0, "rpg"] == 0
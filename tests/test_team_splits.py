@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+import app
+from app import combine_team_splits, format_split_line, get_team_split_cube
+
+GAMES = [
+    # team, opp, date, home, win, loss, tie, runs, runs_against
+    ("BRO", "NY1", 19550412, True, 1, 0, 0, 6, 1),
+    ("BRO", "NY1", 19550413, False, 0, 1, 0, 2, 3),
+    ("BRO", "PHI", 19550501, True, 1, 0, 0, 4, 2),
+    ("BRO", "PHI", 19550502, True, 0, 0, 1, 3, 3),
+    ("BRO", "NY1", 19560420, False, 1, 0, 0, 5, 0),
+    ("LAN", "SFN", 19580415, True, 0, 1, 0, 1, 8),
+    ("LAN", "PHI", 19580610, False, 1, 0, 0, 7, 2),
+]
+
+
+@pytest.fixture
+def cube(use_game_log):
+    use_game_log(GAMES)
+    return get_team_split_cube()
+
+
+def test_grouped_totals_matches_a_row_loop(use_game_log):
+    log = use_game_log(GAMES)
+    groups, totals = app._grouped_totals(log, log.team, log.opp)
+
+    expected = {}
+    for team, opp, _, _, *values in GAMES:
+        expected[(team, opp)] = [a + b for a, b in zip(expected.get((team, opp), [0] * 5), values)]
+    assert {group: list(line) for group, line in zip(groups, totals)} == expected
+
+
+def test_split_cube_entry(cube):
+    assert set(cube) == {("BRO", 1955), ("BRO", 1956), ("LAN", 1958)}
+
+    season = cube[("BRO", 1955)]
+    assert list(season["total"]) == [2, 1, 1, 15, 9]
+    assert list(season["home"]) == [2, 0, 1, 13, 6]
+    assert list(season["away"]) == [0, 1, 0, 2, 3]
+    assert {opp: list(line) for opp, line in season["opponents"].items()} == {
+        "NY1": [1, 1, 0, 8, 4],
+        "PHI": [1, 0, 1, 7, 5],
+    }
+    assert sorted(season["months"]) == [4, 5]
+
+
+def test_split_cube_omits_missing_side(cube):
+    # Every 1956 game was on the road, so there is no home tally at all
+    assert "home" not in cube[("BRO", 1956)]
+    assert list(cube[("BRO", 1956)]["away"]) == [1, 0, 0, 5, 0]
+
+
+def test_combine_team_splits_groups_opponents(cube):
+    franchise_opponent = {"NY1": "SFN"}.get
+    combined = combine_team_splits(cube.values(), lambda opp: franchise_opponent(opp, opp))
+
+    assert list(combined["total"]) == [4, 2, 1, 28, 19]
+    assert list(combined["home"]) == [2, 1, 1, 14, 14]
+    assert list(combined["opponents"]["SFN"]) == [2, 2, 0, 14, 12]
+    assert list(combined["opponents"]["PHI"]) == [2, 0, 1, 14, 7]
+    assert list(combined["months"][4]) == [2, 2, 0, 14, 12]
+
+
+def test_format_split_line():
+    assert format_split_line(np.array([2, 1, 1, 15, 9])) == {
+        "wins": 2,
+        "losses": 1,
+        "ties": 1,
+        "win_pct": 0.667,
+        "runs": 15,
+        "runs_allowed": 9,
+        "run_differential": 6,
+    }
+    assert format_split_line(np.zeros(5, dtype=np.int64))["win_pct"] == 0
@@ -0,0 +1,47 @@
+import numpy as np
+
+from app import run_lengths, team_streaks
+
+
+def encode(results, breaks=None):
+    starts, lengths, values = run_lengths(np.array(results), None if breaks is None else np.array(breaks))
+    return list(zip(starts.tolist(), lengths.tolist(), values.tolist()))
+
+
+def test_run_lengths():
+    assert encode([1, 1, -1, -1, -1, 0, 1]) == [(0, 2, 1), (2, 3, -1), (5, 1, 0), (6, 1, 1)]
+    assert encode([1]) == [(0, 1, 1)]
+    assert encode([]) == []
+
+
+def test_run_lengths_breaks_between_seasons():
+    # breaks[i] marks a boundary between results[i] and results[i + 1]
+    assert encode([1, 1, 1, -1], breaks=[False, True, False]) == [(0, 2, 1), (2, 1, 1), (3, 1, -1)]
+
+
+def test_team_streaks(use_game_log):
+    games = [
+        ("BRO", "NY1", 19550412, True, 1, 0, 0, 6, 1),
+        ("BRO", "NY1", 19550413, True, 1, 0, 0, 2, 1),
+        ("BRO", "PHI", 19550501, True, 0, 1, 0, 1, 2),
+        ("BRO", "PHI", 19550928, True, 1, 0, 0, 4, 2),
+        ("BRO", "NY1", 19560420, False, 1, 0, 0, 5, 0),
+        ("BRO", "NY1", 19560421, False, 1, 0, 0, 3, 0),
+    ]
+    use_game_log(games)
+
+    by_season = team_streaks(("BRO",))
+    assert [s["length"] for s in by_season["win_streaks"]] == [2, 2, 1]
+    assert by_season["current_streak"]["type"] == "W"
+    assert by_season["current_streak"]["start_date"] == "1956-04-20"
+
+    across = team_streaks(("BRO",), across_seasons=True)
+    assert across["win_streaks"][0] == {
+        "length": 3,
+        "start_date": "1955-09-28",
+        "end_date": "1956-04-21",
+        "opponents": ["NY1", "PHI"],
+    }
+    assert [s["length"] for s in across["losing_streaks"]] == [1]
+
+    assert team_streaks(("BRO",), ("PHI",))["games"] == 2
@@ -0,0 +1,66 @@
+import pytest
+
+from app import classify_event, parse_event_file
+
+
+@pytest.mark.parametrize("event, counts", [
+    ("S8/G", {"ab": 1, "h": 1}),
+    ("D7/L", {"ab": 1, "h": 1, "2b": 1}),
+    ("DGR/L9LS", {"ab": 1, "h": 1, "2b": 1}),
+    ("T9/F", {"ab": 1, "h": 1, "3b": 1}),
+    ("HR/F78", {"ab": 1, "h": 1, "hr": 1}),
+    ("H/L7", {"ab": 1, "h": 1, "hr": 1}),
+    ("HP.1-2", {"hbp": 1}),
+    ("W", {"bb": 1}),
+    ("IW", {"bb": 1}),
+    ("K", {"ab": 1, "so": 1}),
+    ("K+WP.B-1", {"ab": 1, "so": 1}),
+    ("C/E2", {}),
+    ("8/SF.3-H", {"sf": 1}),
+    ("1/SH.1-2", {"sh": 1}),
+    ("63/G", {"ab": 1}),
+    ("E6/G.B-1", {"ab": 1}),
+    ("FC5/G.2X3(54)", {"ab": 1}),
+])
+def test_classify_event_ends_plate_appearance(event, counts):
+    assert classify_event(event) == counts
+
+
+@pytest.mark.parametrize("event", [
+    "NP", "SB2", "CS2(26)", "POCS2(1361)", "PO1(13)", "WP.1-2", "PB.2-3",
+    "BK.3-H", "DI.1-2", "OA.3-H", "FLE7", "",
+])
+def test_classify_event_without_plate_appearance(event):
+    assert classify_event(event) is None
+
+
+EVENT_FILE = """\
+id,NYA201004040
+info,visteam,BOS
+start,jeterd001,"Derek Jeter",1,1,6
+start,beckj002,"Josh Beckett",0,0,1
+start,sabac001,"CC Sabathia",1,0,1
+play,1,0,elllj001,22,CBFX,S8/G
+play,1,0,elllj001,01,C,SB2
+play,1,1,jeterd001,32,BBCBFB,W
+sub,papej001,"Jonathan Papelbon",0,0,1
+play,2,1,jeterd001,12,CSX,HR/F78
+play,2,1,jeterd001,02,CCS,K
+"""
+
+
+def test_parse_event_file_credits_the_pitcher_on_the_mound(tmp_path):
+    path = tmp_path / "2010NYA.EVA"
+    path.write_text(EVENT_FILE, encoding="latin-1")
+
+    matchups = parse_event_file(path)
+
+    assert set(matchups) == {
+        (2010, "elllj001", "sabac001"),
+        (2010, "jeterd001", "beckj002"),
+        (2010, "jeterd001", "papej001"),
+    }
+    assert matchups[(2010, "elllj001", "sabac001")]["pa"] == 1  # the steal is not a PA
+    assert matchups[(2010, "jeterd001", "beckj002")]["bb"] == 1
+    papelbon = matchups[(2010, "jeterd001", "papej001")]
+    assert (papelbon["pa"], papelbon["ab"], papelbon["hr"], papelbon["so"]) == (2, 2, 1, 1)